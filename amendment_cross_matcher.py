@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Amendment Cross Matcher
+Finds member amendment text adopted into bill sections with shingle indexes; writes amendment_cross_match_results.xlsx
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from section_matcher import TOKEN_PATTERN, _text, load_targets
+from tracing_db import open_db
+
+OUTPUT_FILE = 'amendment_cross_match_results.xlsx'
+# Word shingles: long enough that shared shingles mean shared drafting, not shared vocabulary
+SHINGLE_SIZE = 5
+# Share of an amendment's shingles that must appear in a section
+DEFAULT_MIN_CONTAINMENT = 0.5
+CHUNK_SIZE = 256
+
+_index = None
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Hashed word shingles of a text (crc32, so stable across runs and processes)"""
+    words = TOKEN_PATTERN.findall(text.lower())
+    return {zlib.crc32(' '.join(shingle).encode('utf-8')) for shingle in zip(*(words[i:] for i in range(size)))}
+
+
+class ShingleIndex:
+    """Sorted shingle postings (shingle -> sections containing it) for prefix-filtered candidate lookup"""
+
+    def __init__(self, section_texts):
+        self.sections = [frozenset(shingles(text)) for text in section_texts]
+        keys = np.fromiter((shingle for section in self.sections for shingle in section), dtype=np.int64)
+        owners = np.repeat(np.arange(len(self.sections)), [len(section) for section in self.sections])
+        order = np.argsort(keys, kind='stable')
+        self.owners = owners[order]
+        self.shingles, self.starts, self.frequencies = np.unique(keys[order], return_index=True,
+                                                                 return_counts=True)
+
+    def __len__(self):
+        return len(self.shingles)
+
+    def candidates(self, amendment_shingles, min_containment):
+        """Sections that can reach min_containment, by prefix filtering.
+
+        A section containing at least ceil(t·|A|) of the amendment's
+        shingles must contain one of its |P| - ceil(t·|A|) + 1 rarest
+        indexed shingles P, so only those postings are read: common
+        boilerplate shingles never generate candidates, and no section
+        above the threshold is missed.
+        """
+        # At least one shared shingle: a threshold of 0 still only proposes sections that overlap
+        needed = max(1, math.ceil(min_containment * len(amendment_shingles)))
+        if not len(self.shingles):
+            return np.empty(0, dtype=np.int64)
+        keys = np.fromiter(amendment_shingles, dtype=np.int64, count=len(amendment_shingles))
+        positions = np.minimum(np.searchsorted(self.shingles, keys), len(self.shingles) - 1)
+        present = positions[self.shingles[positions] == keys]
+        if len(present) < needed:
+            return np.empty(0, dtype=np.int64)
+        prefix = present[np.argsort(self.frequencies[present], kind='stable')[:len(present) - needed + 1]]
+        lengths = self.frequencies[prefix]
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return np.unique(self.owners[np.repeat(self.starts[prefix], lengths) + offsets])
+
+    def best_match(self, amendment_shingles, min_containment, blocking=True):
+        """(section, containment, candidates checked) for the section holding most of the amendment's shingles"""
+        if not amendment_shingles:
+            return None, 0.0, 0
+        sections = (self.candidates(amendment_shingles, min_containment) if blocking
+                    else range(len(self.sections)))
+        best, best_score, checked = None, 0.0, 0
+        for section in sections:
+            section = int(section)
+            checked += 1
+            score = len(amendment_shingles & self.sections[section]) / len(amendment_shingles)
+            if score >= min_containment and score > best_score:
+                best, best_score = section, score
+        return best, best_score, checked
+
+
+def amendment_label(number):
+    """Amendment number as the sheet shows it ('123', not the float 123.0 pandas reads)"""
+    if number is None:
+        return ''
+    if isinstance(number, float) and number.is_integer():
+        number = int(number)
+    return str(number).strip()
+
+
+def _init_worker(index):
+    global _index
+    _index = index
+
+
+def _match_chunk(chunk, min_containment):
+    return [_index.best_match(shingles(text), min_containment) for text in chunk]
+
+
+def cross_match(amendment_texts, index, min_containment=DEFAULT_MIN_CONTAINMENT, workers=None,
+                chunk_size=CHUNK_SIZE):
+    """best_match() for every amendment, computed in chunks across worker processes"""
+    chunks = [amendment_texts[i:i + chunk_size] for i in range(0, len(amendment_texts), chunk_size)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        _init_worker(index)
+        results = [_match_chunk(chunk, min_containment) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(index,)) as pool:
+            results = list(pool.map(_match_chunk, chunks, [min_containment] * len(chunks)))
+    return [match for chunk in results for match in chunk]
+
+
+def blocking_recall(amendment_texts, index, matches, min_containment, sample_size):
+    """Share of sampled amendments whose exhaustive best match the blocked search also found"""
+    sample = random.Random(0).sample(range(len(amendment_texts)), min(sample_size, len(amendment_texts)))
+    expected = found = 0
+    for position in sample:
+        section, _, _ = index.best_match(shingles(amendment_texts[position]), min_containment, blocking=False)
+        if section is not None:
+            expected += 1
+            found += matches[position][0] == section
+    return found / expected if expected else 1.0, len(sample)
+
+
+def write_cross_match_results(path, rows, report):
+    import pandas as pd
+
+    with pd.ExcelWriter(path) as writer:
+        # Results stay on the first sheet, which the tracing store reads
+        pd.DataFrame(rows, columns=['target_amendment_number', 'target_sponsor', 'source_section_title',
+                                    'similarity_score']).to_excel(writer, sheet_name='Results', index=False)
+        pd.DataFrame(list(report.items()), columns=['metric', 'value']).to_excel(writer, sheet_name='Report',
+                                                                                 index=False)
+
+
+def main(argv=None):
+    """Cross-match member amendments against adopted section text"""
+    parser = argparse.ArgumentParser(description="Find member amendments whose text was adopted into bill sections")
+    parser.add_argument('--target', choices=['ndaa', 'RH', 'IH'], default='ndaa',
+                        help="adopted sections to search (default: ndaa, the NDAA bill workbook)")
+    parser.add_argument('--min-containment', type=float, default=DEFAULT_MIN_CONTAINMENT,
+                        help="share of an amendment's shingles that must appear in the section "
+                             f"(default: {DEFAULT_MIN_CONTAINMENT})")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument('--verify-sample', type=int, default=50,
+                        help="amendments re-checked exhaustively to measure blocking recall (default: 50)")
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f"workbook to write (default: {OUTPUT_FILE})")
+    args = parser.parse_args(argv)
+
+    target_source = 'ndaa_sections' if args.target == 'ndaa' else f'{args.target.lower()}_sections'
+    with open_db(sources=('house_amendments', 'original_amendments', target_source)) as db:
+        amendments = db.amendments()
+        targets = load_targets(db, args.target)
+        # The previous results, kept as the reference for recall
+        reference = set(db.original_amendment_lookup())
+    if not amendments or not targets:
+        print(f"❌ Nothing to match: {len(amendments)} amendments, {len(targets)} {args.target} sections")
+        return
+
+    print(f"🔍 Cross-matching {len(amendments)} amendments against {len(targets)} {args.target} sections")
+    start = time.perf_counter()
+    index = ShingleIndex([text for _, _, text in targets])
+    index_time = time.perf_counter() - start
+
+    texts = [_text(amendment['hml_full_content']) for amendment in amendments]
+    start = time.perf_counter()
+    matches = cross_match(texts, index, args.min_containment, args.workers)
+    match_time = time.perf_counter() - start
+
+    rows = []
+    for amendment, (section, score, _) in zip(amendments, matches):
+        if section is not None:
+            designation, title, _ = targets[section]
+            rows.append({'target_amendment_number': amendment_label(amendment['amendment_number']),
+                         'target_sponsor': amendment['sponsor'],
+                         'source_section_title': f'SEC. {designation}. {title}',
+                         'similarity_score': round(score, 4)})
+
+    recall, sampled = blocking_recall(texts, index, matches, args.min_containment, args.verify_sample)
+    found = {row['target_amendment_number'] for row in rows}
+    checked = sum(candidates for _, _, candidates in matches)
+    report = {
+        'amendments': len(amendments),
+        'sections': len(targets),
+        'indexed_shingles': len(index),
+        'candidate_pairs_checked': checked,
+        'pair_reduction': round(1 - checked / (len(amendments) * len(targets)), 4),
+        'matched_amendments': len(rows),
+        'index_seconds': round(index_time, 3),
+        'match_seconds': round(match_time, 3),
+        'blocking_recall_sampled': round(recall, 4),
+        'blocking_recall_sample_size': sampled,
+        'previous_results_recall': round(len(reference & found) / len(reference), 4) if reference else '',
+    }
+    write_cross_match_results(args.output, rows, report)
+
+    print(f"✅ {len(rows)} of {len(amendments)} amendments found in adopted text "
+          f"(containment ≥{args.min_containment})")
+    print(f"⏱️  Index {index_time * 1000:.0f} ms, match {match_time * 1000:.0f} ms; "
+          f"{checked} of {len(amendments) * len(targets)} pairs checked ({report['pair_reduction']:.1%} pruned)")
+    print(f"🎯 Blocking recall {recall:.1%} on {sampled} exhaustively checked amendments"
+          + (f"; {report['previous_results_recall']:.1%} of the previous results reproduced" if reference else ""))
+    print(f"📄 Output file: {args.output} (Results and Report sheets)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Async Server
+asyncio preview server: keep-alive HTTP/1.1, zero-copy static files and the trace API
+"""
+
+import argparse
+import asyncio
+import email.utils
+import gzip
+import hashlib
+import mimetypes
+import os
+from urllib.parse import unquote, urlsplit
+
+from text_blob import BLOB_FILE, parse_range
+
+DEFAULT_PORT = 8016
+MAX_CONNECTIONS = 1024
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 15
+# Request line plus headers; larger requests are rejected
+MAX_HEADER_BYTES = 16 * 1024
+# Server-Sent Events stream that tells open pages to reload after a rebuild
+EVENTS_PATH = '/events'
+SSE_HEARTBEAT = 15
+LIVE_RELOAD_SCRIPT = (
+    "<script>new EventSource('" + EVENTS_PATH.lstrip('/') + "')"
+    ".addEventListener('reload', () => location.reload());</script>\n"
+)
+
+STATUS_TEXT = {200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+               405: 'Method Not Allowed', 416: 'Range Not Satisfiable', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+
+
+class Request:
+    __slots__ = ('method', 'target', 'version', 'headers')
+
+    def __init__(self, method, target, version, headers):
+        self.method = method
+        self.target = target
+        self.version = version
+        self.headers = headers
+
+    @property
+    def keep_alive(self):
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+
+async def read_request(reader):
+    """Parse one request head, or return None when the client closed the connection"""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError:
+        return None
+    request_line, *header_lines = head.decode('latin-1').split('\r\n')
+    method, target, version = request_line.split(' ', 2)
+    headers = {}
+    for line in header_lines:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+    return Request(method, target, version, headers)
+
+
+class StaticFile:
+    """Stat-derived metadata for one file, cached until the file changes"""
+
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'last_modified', 'content_type')
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+            content_type += '; charset=utf-8'
+        self.content_type = content_type
+
+
+class AsyncPreviewServer:
+    """Serves a built site directory, plus /api/ when given a TraceAPI"""
+
+    def __init__(self, root='.', api=None, max_connections=MAX_CONNECTIONS,
+                 page_path='/content_focused_diff_website.html', live_reload=False):
+        self.root = os.path.realpath(root)
+        self.page_path = page_path
+        self.max_connections = max_connections
+        self.live_reload = live_reload
+        self.active_connections = 0
+        self._files = {}
+        self._reload_queues = set()
+        self.set_api(api)
+
+    def set_api(self, api):
+        """Serve a new TraceAPI (e.g. after a rebuild) and re-render its page"""
+        # Requests run on the event loop, as does this, so none still uses the old API's connection
+        previous = getattr(self, 'api', None)
+        if previous is not None and previous is not api:
+            previous.close()
+        self.api = api
+        self._api_page = None
+        if api is not None:
+            from trace_api import render_api_page
+            page = self._with_reload_script(render_api_page())
+            self._api_page = (page, gzip.compress(page), '"' + hashlib.sha1(page).hexdigest()[:16] + '"')
+
+    def _with_reload_script(self, page):
+        if not self.live_reload:
+            return page
+        from html_splice import anchor_legacy_page, splice
+        try:
+            return splice(anchor_legacy_page(page.decode('utf-8')), {'body-end': LIVE_RELOAD_SCRIPT}).encode('utf-8')
+        except KeyError:
+            # Fragment without a </body>; serve it as is
+            return page
+
+    def notify_reload(self):
+        """Tell every open page to reload"""
+        for queue in self._reload_queues:
+            queue.put_nowait('reload')
+        return len(self._reload_queues)
+
+    async def handle_connection(self, reader, writer):
+        if self.active_connections >= self.max_connections:
+            # Bounded memory: refuse rather than queue unbounded connections
+            writer.write(self._head(503, {'Content-Length': '0', 'Connection': 'close'}))
+            await self._close(writer)
+            return
+
+        self.active_connections += 1
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.LimitOverrunError, ValueError):
+                    break
+                if request is None:
+                    break
+                keep_alive = request.keep_alive
+                await self.respond(request, writer, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.active_connections -= 1
+            await self._close(writer)
+
+    async def _close(self, writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    def _head(self, status, headers):
+        lines = [f'HTTP/1.1 {status} {STATUS_TEXT.get(status, "")}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+    async def respond(self, request, writer, keep_alive):
+        connection = {'Connection': 'keep-alive' if keep_alive else 'close'}
+        if request.method not in ('GET', 'HEAD'):
+            await self._send_bytes(writer, request, 405, b'', 'text/plain', connection)
+            return
+
+        url = urlsplit(request.target)
+        path = unquote(url.path)
+
+        if self.live_reload and path == EVENTS_PATH:
+            await self._stream_events(writer)
+            return
+
+        if self.api is not None and path.startswith('/api/'):
+            status, body, compressed, etag = self.api.response(url.path, url.query)
+            # While watching, rebuilt data must not be hidden behind browser caches
+            await self._send_cached(writer, request, status, body, compressed, etag, 'application/json',
+                                    'no-cache' if self.live_reload else 'max-age=300', connection)
+            return
+        if self._api_page is not None and path in (self.page_path, '/'):
+            page, compressed, etag = self._api_page
+            await self._send_cached(writer, request, 200, page, compressed, etag,
+                                    'text/html; charset=utf-8', 'no-cache', connection)
+            return
+        if path == '/' + BLOB_FILE and getattr(self.api, 'blob', None) is not None:
+            # The API's own mapping, so slices always match the spans it hands out
+            await self._send_blob(writer, request, self.api.blob, connection)
+            return
+
+        static = self._resolve(path)
+        if static is None:
+            await self._send_bytes(writer, request, 404, b'Not Found', 'text/plain', connection)
+            return
+        if self.live_reload and static.content_type.startswith('text/html'):
+            # Small, development-only pages: read them and add the reload listener
+            with open(static.path, 'rb') as f:
+                page = self._with_reload_script(f.read())
+            await self._send_bytes(writer, request, 200, page, static.content_type,
+                                   dict(connection, **{'Cache-Control': 'no-cache'}))
+            return
+        await self._send_file(writer, request, static, connection)
+
+    async def _stream_events(self, writer):
+        """Hold an SSE connection open and forward reload notifications"""
+        writer.write(self._head(200, {'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache',
+                                      'Connection': 'keep-alive'}))
+        await writer.drain()
+        queue = asyncio.Queue()
+        self._reload_queues.add(queue)
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SSE_HEARTBEAT)
+                    writer.write(f'event: {event}\ndata: {event}\n\n'.encode())
+                except asyncio.TimeoutError:
+                    # Comment line; a failed write tells us the page has gone
+                    writer.write(b': keep-alive\n\n')
+                await writer.drain()
+        finally:
+            self._reload_queues.discard(queue)
+
+    def _resolve(self, path):
+        """StaticFile for a URL path inside the root, or None"""
+        full_path = os.path.realpath(os.path.join(self.root, path.lstrip('/')))
+        if full_path != self.root and not full_path.startswith(self.root + os.sep):
+            return None
+        if os.path.isdir(full_path):
+            full_path = os.path.join(full_path, 'index.html')
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return None
+        cached = self._files.get(full_path)
+        if cached is None or cached.mtime != stat.st_mtime_ns or cached.size != stat.st_size:
+            cached = self._files[full_path] = StaticFile(full_path, stat)
+        return cached
+
+    async def _send_bytes(self, writer, request, status, body, content_type, headers):
+        headers = dict(headers, **{'Content-Type': content_type, 'Content-Length': str(len(body))})
+        writer.write(self._head(status, headers))
+        if request.method != 'HEAD':
+            writer.write(body)
+        await writer.drain()
+
+    async def _send_cached(self, writer, request, status, body, compressed, etag, content_type,
+                           cache_control, headers):
+        headers = dict(headers, Vary='Accept-Encoding')
+        if status == 200:
+            headers.update({'ETag': etag, 'Cache-Control': cache_control})
+            if request.headers.get('if-none-match') == etag:
+                writer.write(self._head(304, dict(headers, **{'Content-Length': '0'})))
+                await writer.drain()
+                return
+        if compressed is not None and 'gzip' in request.headers.get('accept-encoding', ''):
+            headers['Content-Encoding'] = 'gzip'
+            body = compressed
+        await self._send_bytes(writer, request, status, body, content_type, headers)
+
+    async def _send_blob(self, writer, request, blob, headers):
+        """The section text blob from its mapping; a Range request gets only its slice"""
+        try:
+            span = parse_range(request.headers.get('range'), len(blob))
+        except ValueError:
+            await self._send_bytes(writer, request, 416, b'', 'text/plain',
+                                   dict(headers, **{'Content-Range': f'bytes */{len(blob)}'}))
+            return
+        offset, length = span or (0, len(blob))
+        headers = dict(headers, **{'Accept-Ranges': 'bytes', 'Cache-Control': 'no-cache'})
+        if span:
+            headers['Content-Range'] = f'bytes {offset}-{offset + length - 1}/{len(blob)}'
+        # A memoryview of the mapping goes to the transport without a bytes copy
+        await self._send_bytes(writer, request, 206 if span else 200, blob.slice(offset, length),
+                               'application/octet-stream', headers)
+
+    async def _send_file(self, writer, request, static, headers):
+        headers = dict(headers, **{'ETag': static.etag, 'Last-Modified': static.last_modified,
+                                   'Cache-Control': 'no-cache'})
+        if request.headers.get('if-none-match') == static.etag:
+            writer.write(self._head(304, dict(headers, **{'Content-Length': '0'})))
+            await writer.drain()
+            return
+
+        headers.update({'Content-Type': static.content_type, 'Content-Length': str(static.size)})
+        writer.write(self._head(200, headers))
+        await writer.drain()
+        if request.method == 'HEAD' or not static.size:
+            return
+        with open(static.path, 'rb') as f:
+            # os.sendfile on plain sockets; asyncio falls back to chunked reads otherwise
+            await asyncio.get_running_loop().sendfile(writer.transport, f, 0, static.size)
+
+
+async def serve(root='.', host='', port=DEFAULT_PORT, api=None, max_connections=MAX_CONNECTIONS, ready=None,
+                watch=None):
+    """Run the server until cancelled.
+
+    watch, if given, is a coroutine function run alongside the server with
+    the server as its argument (it enables live reload on served pages).
+    """
+    server = AsyncPreviewServer(root, api, max_connections, live_reload=watch is not None)
+    async with await asyncio.start_server(server.handle_connection, host or None, port,
+                                          limit=MAX_HEADER_BYTES, backlog=max_connections) as listener:
+        if ready is not None:
+            ready()
+        if watch is None:
+            await listener.serve_forever()
+        else:
+            await asyncio.gather(listener.serve_forever(), watch(server))
+
+
+def run_async_server(root='.', host='', port=DEFAULT_PORT, api=None, max_connections=MAX_CONNECTIONS, ready=None,
+                     watch=None):
+    try:
+        asyncio.run(serve(root, host, port, api, max_connections, ready, watch))
+    except KeyboardInterrupt:
+        print("\n🛑 Server stopped")
+
+
+def main(argv=None):
+    """Serve a built site directory"""
+    parser = argparse.ArgumentParser(description="Serve the built tracing site with the asyncio preview server")
+    parser.add_argument('--root', default='.', help="site directory (default: current directory)")
+    parser.add_argument('--host', default='', help="interface to bind (default: all)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument('--max-connections', type=int, default=MAX_CONNECTIONS,
+                        help=f"concurrent connection limit (default: {MAX_CONNECTIONS})")
+    args = parser.parse_args(argv)
+
+    print(f"🚀 Async server for {os.path.abspath(args.root)} at http://localhost:{args.port}/", flush=True)
+    run_async_server(args.root, args.host, args.port, max_connections=args.max_connections)
+
+
+if __name__ == "__main__":
+    main()
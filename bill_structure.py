@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Bill Structure
+One section-designation parser and a division/title/subtitle/section index built in a single pass over headers
+"""
+
+import argparse
+import json
+import re
+from collections import namedtuple
+
+# Section designations: "SEC. 101.", "SEC. 101A.", "Sec 5", "Section 101", "§ 12",
+# or a header that is only a number ("101", "101A."). Written in the common
+# subset of Python and JavaScript regex syntax: the page compiles the same
+# source, so the scripts and the page cannot disagree on a format
+SECTION_PATTERN_SOURCE = (r'^\s*(\d+)([A-Z]?)\.?\s*$'
+                          r'|(?:^|[^A-Za-z])(?:SEC(?:TION)?|§)\.?\s*(\d+)([A-Z]{0,2})(?![0-9A-Za-z])')
+SECTION_PATTERN = re.compile(SECTION_PATTERN_SOURCE, re.IGNORECASE)
+# Leading designation of a section header, for its bare title
+LEADING_DESIGNATION_PATTERN = re.compile(r'^\s*(?:SEC(?:TION)?|§)\.?\s*\d+[A-Z]{0,2}\.?\s*', re.IGNORECASE)
+# Structural headings that open a division, title or subtitle
+HEADING_PATTERN = re.compile(r'^\s*(?:DIVISION\s+(?P<division>[A-Z]{1,2})|TITLE\s+(?P<title>[IVXLC]+)'
+                             r'|Subtitle\s+(?P<subtitle>[A-Z]{1,2}))(?![A-Za-z])')
+ROMAN_VALUES = {'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100}
+
+SectionDesignation = namedtuple('SectionDesignation', ['number', 'suffix', 'designation'])
+# One section: document position, designation and enclosing structure
+SectionEntry = namedtuple('SectionEntry', ['position', 'number', 'designation', 'division', 'title', 'subtitle',
+                                           'header'])
+
+
+def parse_section(header):
+    """SectionDesignation for the first section designation in a header, or None"""
+    match = SECTION_PATTERN.search(str(header))
+    if not match:
+        return None
+    digits = match.group(1) or match.group(3)
+    suffix = (match.group(2) or match.group(4) or '').upper()
+    return SectionDesignation(int(digits), suffix, str(int(digits)) + suffix)
+
+
+def section_number(header):
+    """Integer part of a header's section designation, or None"""
+    parsed = parse_section(header)
+    return parsed.number if parsed else None
+
+
+def section_designation(header):
+    """Full designation ("101A") of a header's section, or None"""
+    parsed = parse_section(header)
+    return parsed.designation if parsed else None
+
+
+def strip_designation(header):
+    """Header without its leading "SEC. 101." designation"""
+    return LEADING_DESIGNATION_PATTERN.sub('', str(header), count=1).strip()
+
+
+def roman_to_int(numeral):
+    total = 0
+    for value, following in zip([ROMAN_VALUES[c] for c in numeral],
+                                [ROMAN_VALUES[c] for c in numeral[1:]] + [0]):
+        total += -value if value < following else value
+    return total
+
+
+def default_title(number):
+    """Title implied by NDAA section numbering (SEC. 5xx is in title V; 1–99 precede the titles)"""
+    return number // 100
+
+
+class BillStructure:
+    """Division/title/subtitle/section index over a bill's headers, in document order.
+
+    Structural headings ("DIVISION A—", "TITLE V—", "Subtitle B—") set the
+    context for the sections after them. Bills listed as sections only get
+    their titles from the NDAA numbering convention instead.
+    """
+
+    def __init__(self, headers):
+        self.sections = []
+        self.by_designation = {}
+        self.by_title = {}
+        division = subtitle = None
+        title = None
+        explicit_titles = False
+
+        for header in headers:
+            header = str(header)
+            heading = HEADING_PATTERN.match(header)
+            if heading:
+                if heading.group('division'):
+                    division, title, subtitle = heading.group('division'), None, None
+                elif heading.group('title'):
+                    title, subtitle, explicit_titles = roman_to_int(heading.group('title')), None, True
+                else:
+                    subtitle = heading.group('subtitle')
+                continue
+
+            parsed = parse_section(header)
+            if parsed is None:
+                continue
+            section_title = title if explicit_titles else default_title(parsed.number)
+            entry = SectionEntry(len(self.sections), parsed.number, parsed.designation, division, section_title,
+                                 subtitle, header)
+            self.sections.append(entry)
+            self.by_designation.setdefault(parsed.designation, entry)
+            self.by_title.setdefault((division, section_title), []).append(entry)
+
+    def __len__(self):
+        return len(self.sections)
+
+    def section(self, designation):
+        """Entry for a designation ("101A") or any header naming one, or None"""
+        parsed = parse_section(designation)
+        return self.by_designation.get(parsed.designation) if parsed else None
+
+    def in_title(self, title, division=None):
+        """Sections of a title (an int or roman numeral), in document order"""
+        if isinstance(title, str):
+            title = roman_to_int(title.upper())
+        if division is not None:
+            return list(self.by_title.get((division, title), []))
+        return [entry for (_, entry_title), entries in self.by_title.items() if entry_title == title
+                for entry in entries]
+
+
+# Page-side counterpart of parse_section()
+PAGE_SCRIPT = '''
+        const SECTION_PATTERN = new RegExp(%s, 'i');
+
+        function parseSectionDesignation(header) {
+            const match = SECTION_PATTERN.exec(String(header));
+            if (!match) return null;
+            const digits = match[1] || match[3];
+            const suffix = (match[2] || match[4] || '').toUpperCase();
+            const number = parseInt(digits, 10);
+            return {number: number, designation: String(number) + suffix};
+        }
+''' % json.dumps(SECTION_PATTERN_SOURCE)
+
+
+def main(argv=None):
+    """Print the structure index for a bill stored in the tracing store"""
+    from tracing_db import open_db
+
+    parser = argparse.ArgumentParser(description="Show a bill's division/title/subtitle/section structure")
+    parser.add_argument('--bill', choices=['ndaa', 'IH', 'RH'], default='ndaa', help="bill (default: ndaa)")
+    parser.add_argument('--title', help="list the sections of one title (e.g. V or 5)")
+    args = parser.parse_args(argv)
+
+    source = 'ndaa_sections' if args.bill == 'ndaa' else f'{args.bill.lower()}_sections'
+    with open_db(sources=(source,)) as db:
+        headers = db.section_headers(args.bill)
+    structure = BillStructure(headers)
+
+    print(f"📚 {args.bill}: {len(structure)} sections in {len(structure.by_title)} titles")
+    if args.title:
+        title = int(args.title) if args.title.isdigit() else args.title
+        for entry in structure.in_title(title):
+            print(f"   {entry.designation:>6}  {strip_designation(entry.header)[:70]}")
+    else:
+        for (division, title), entries in structure.by_title.items():
+            label = (f"Division {division}, " if division else '') + f"Title {title}"
+            print(f"   {label:<22} {len(entries):>4} sections ({entries[0].designation}–{entries[-1].designation})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Build Cache
+Content-addressed cache of stage outputs, keyed by the hashes of each stage's inputs and code
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+CACHE_DIR = '.build_cache'
+# Least recently used entries are evicted beyond either limit
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+MAX_CACHE_ENTRIES = 64
+ENTRY_FILE = 'entry.json'
+
+_file_hashes = {}
+
+
+def file_hash(path):
+    """sha256 of a file or directory tree, or 'missing'; memoised by mtime and size"""
+    if os.path.isdir(path):
+        digest = hashlib.sha256()
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                full_path = os.path.join(root, name)
+                digest.update(os.path.relpath(full_path, path).encode('utf-8') + b'\0')
+                digest.update(file_hash(full_path).encode('ascii'))
+        return digest.hexdigest()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return 'missing'
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _file_hashes.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    _file_hashes[path] = (signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def stage_key(name, inputs, code, params=()):
+    """Key for one run of a stage: its name, parameters, input contents and code version"""
+    digest = hashlib.sha256(json.dumps([name, list(params)]).encode('utf-8'))
+    for group in (inputs, code):
+        for path in group:
+            digest.update(f'{path}\0{file_hash(path)}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _tree_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+class BuildCache:
+    """Directory of cache entries, one per stage key, each holding copies of the stage's outputs"""
+
+    def __init__(self, root=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, max_entries=MAX_CACHE_ENTRIES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def restore(self, key, outputs):
+        """Copy a cached entry's outputs into place; False when the key is not cached"""
+        entry_dir = self._entry_dir(key)
+        entry_file = os.path.join(entry_dir, ENTRY_FILE)
+        if not os.path.exists(entry_file):
+            return False
+        for index, path in enumerate(outputs):
+            cached = os.path.join(entry_dir, str(index))
+            if os.path.isdir(cached):
+                if os.path.isdir(path):
+                    shutil.rmtree(path)
+                shutil.copytree(cached, path)
+            else:
+                shutil.copyfile(cached, path)
+        # The entry file's mtime is the entry's last use, for LRU eviction
+        os.utime(entry_file)
+        return True
+
+    def store(self, key, stage, outputs):
+        """Copy a stage's outputs into the cache, then evict down to the limits"""
+        entry_dir = self._entry_dir(key)
+        staging_dir = entry_dir + '.tmp'
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+        for index, path in enumerate(outputs):
+            if os.path.isdir(path):
+                shutil.copytree(path, os.path.join(staging_dir, str(index)))
+            else:
+                shutil.copyfile(path, os.path.join(staging_dir, str(index)))
+        entry = {'stage': stage, 'outputs': list(outputs), 'created': time.time(),
+                 'bytes': _tree_size(staging_dir)}
+        with open(os.path.join(staging_dir, ENTRY_FILE), 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(staging_dir, entry_dir)
+        self.evict()
+
+    def entries(self):
+        """(last used, key, entry) for every cache entry, least recently used first"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for key in os.listdir(self.root):
+            entry_file = os.path.join(self.root, key, ENTRY_FILE)
+            try:
+                with open(entry_file, encoding='utf-8') as f:
+                    entries.append((os.path.getmtime(entry_file), key, json.load(f)))
+            except (OSError, ValueError):
+                continue
+        return sorted(entries, key=lambda item: item[0])
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits its limits; returns the number dropped"""
+        entries = self.entries()
+        total = sum(entry['bytes'] for _, _, entry in entries)
+        evicted = 0
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            _, key, entry = entries.pop(0)
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= entry['bytes']
+            evicted += 1
+        return evicted
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def run(self, stage, inputs, outputs, code, build, params=()):
+        """Restore the stage's outputs from the cache, or run build() and cache what it wrote.
+
+        Returns True when the stage was skipped.
+        """
+        key = stage_key(stage, inputs, code, params)
+        if self.restore(key, outputs):
+            print(f"♻️  {stage}: inputs unchanged, restored {len(outputs)} output(s) from cache ({key[:12]})")
+            return True
+        build()
+        missing = [path for path in outputs if not os.path.exists(path)]
+        if missing:
+            print(f"⚠️  {stage}: not cached, missing output(s): {', '.join(missing)}")
+        else:
+            self.store(key, stage, outputs)
+        return False
+
+
+def main(argv=None):
+    """List or clear the build cache"""
+    parser = argparse.ArgumentParser(description="Inspect the content-addressed build cache")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help=f"cache directory (default: {CACHE_DIR})")
+    parser.add_argument('--clear', action='store_true', help="delete every cache entry")
+    args = parser.parse_args(argv)
+
+    cache = BuildCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cleared {args.cache_dir}")
+        return
+
+    entries = cache.entries()
+    total = sum(entry['bytes'] for _, _, entry in entries)
+    print(f"📦 {len(entries)} entries, {total / 1024 / 1024:.1f} MB "
+          f"(limits: {cache.max_entries} entries, {cache.max_bytes / 1024 / 1024:.0f} MB)")
+    for last_used, key, entry in reversed(entries):
+        used = time.strftime('%Y-%m-%d %H:%M', time.localtime(last_used))
+        print(f"   {key[:12]}  {entry['stage']:<10} {entry['bytes'] / 1024:>8.0f} KB  last used {used}  "
+              f"{', '.join(entry['outputs'])}")
+
+
+if __name__ == "__main__":
+    main()
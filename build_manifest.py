@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Build Manifest
+Per-trace, per-diff and per-mapping hashes of a build, and the delta report between two builds
+"""
+
+import hashlib
+import html
+import json
+import os
+import time
+
+from build_cache import CACHE_DIR, file_hash
+from page_templates import write_page
+from provenance import RECORDS_FILE, load_provenance
+
+MANIFEST_FILE = 'build_manifest.json'
+REPORT_FILE = 'build_delta.json'
+SUMMARY_PAGE = 'build_delta.html'
+# Diffs of the last delta build, keyed by the hash of their inputs, under the version of the code that made them
+DIFF_STORE = os.path.join(CACHE_DIR, 'diff_results.json')
+STATS_FIELDS = ('similarity', 'change_volume', 'added', 'removed', 'modified', 'moved')
+
+
+def content_hash(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def diff_input_hash(trace, alignment):
+    """What a trace's diff depends on: both section bodies and the alignment"""
+    return content_hash(trace['ih_section']['text'], trace['rh_section']['text'], alignment)
+
+
+def code_version(paths):
+    """Hash of the files that compute the diffs; a change to any of them invalidates stored diffs"""
+    return content_hash(*(file_hash(path) for path in paths))
+
+
+def trace_entries(traces, alignment):
+    """trace id -> hashes of the trace, its diff inputs and its rendered diff, plus its stats"""
+    entries = {}
+    for trace in traces:
+        ih_section, rh_section = trace['ih_section'], trace['rh_section']
+        entries[trace['trace_id']] = {
+            'title': ih_section['title'],
+            'trace': content_hash(ih_section['title'], ih_section['text'], rh_section['title'], rh_section['text'],
+                                  rh_section['similarity_from_ih']),
+            'input': diff_input_hash(trace, alignment),
+            'diff': content_hash(trace['diff']['left_html'], trace['diff']['right_html']),
+            'stats': {field: trace['stats'][field] for field in STATS_FIELDS if field in trace['stats']},
+        }
+    return entries
+
+
+def mapping_entries(records):
+    """'source type:section' -> hash of the amendment mapped there"""
+    return {f'{record.source_type}:{record.section_number}': content_hash(record._asdict()) for record in records}
+
+
+def build_manifest(traces, alignment, records=()):
+    return {'created': time.time(), 'alignment': alignment,
+            'traces': trace_entries(traces, alignment), 'mappings': mapping_entries(records)}
+
+
+def load_manifest(path=MANIFEST_FILE):
+    """The previous build's manifest, or None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(data, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+
+
+def _keyed_delta(previous, current, changed):
+    """(added, removed, changed) keys of two dicts, in one pass over each"""
+    added = [key for key in current if key not in previous]
+    removed = [key for key in previous if key not in current]
+    modified = [key for key in current if key in previous and changed(previous[key], current[key])]
+    return added, removed, modified
+
+
+def compare_manifests(previous, current):
+    """Delta report between two manifests; linear in the number of traces and mappings"""
+    before = previous['traces'] if previous else {}
+    after = current['traces']
+    added, removed, changed = _keyed_delta(before, after, lambda old, new: old['trace'] != new['trace'])
+    touched = set(added) | set(removed) | set(changed)
+    stats_changed = [{'trace_id': trace_id, 'title': after[trace_id]['title'],
+                      'before': before[trace_id]['stats'], 'after': after[trace_id]['stats']}
+                     for trace_id in after
+                     if trace_id in before and before[trace_id]['stats'] != after[trace_id]['stats']]
+    mappings = _keyed_delta(previous['mappings'] if previous else {}, current['mappings'],
+                            lambda old, new: old != new)
+    return {
+        'previous_build': previous['created'] if previous else None,
+        'current_build': current['created'],
+        'alignment_changed': bool(previous) and previous['alignment'] != current['alignment'],
+        'traces': {'added': added, 'removed': removed, 'changed': changed,
+                   'unchanged': len(after) - len(added) - len(changed)},
+        'titles': {trace_id: entry['title'] for trace_id, entry in {**before, **after}.items() if trace_id in touched},
+        'diffs_changed': [trace_id for trace_id in after if trace_id in before
+                          and before[trace_id]['diff'] != after[trace_id]['diff']],
+        'stats_changed': stats_changed,
+        'mappings': dict(zip(('added', 'removed', 'changed'), mappings)),
+    }
+
+
+class DiffStore:
+    """Rendered diffs and stats of the last delta build, reused for traces whose inputs are unchanged"""
+
+    def __init__(self, path=DIFF_STORE, code=''):
+        self.path = path
+        self.code = code
+        try:
+            with open(path, encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            stored = {}
+        # Diffs rendered by other code are recomputed, not reused
+        self.diffs = stored.get('diffs', {}) if stored.get('code') == code else {}
+
+    def reuse(self, alignment):
+        """A reuse(trace) hook for attach_precomputed_diffs"""
+        def lookup(trace):
+            stored = self.diffs.get(diff_input_hash(trace, alignment))
+            return dict(stored['diff'], stats=stored['stats']) if stored else None
+        return lookup
+
+    def save(self, traces, alignment):
+        """Keep exactly the current build's diffs"""
+        self.diffs = {diff_input_hash(trace, alignment): {'diff': trace['diff'], 'stats': trace['stats']}
+                      for trace in traces}
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump({'code': self.code, 'diffs': self.diffs}, f, separators=(',', ':'))
+
+
+def _list_items(keys, titles=None):
+    if not keys:
+        return '<p class="empty">None</p>'
+    items = ''.join(f'<li><code>{html.escape(str(key))}</code>'
+                    + (f' {html.escape(titles[key])}' if titles and key in titles else '') + '</li>'
+                    for key in keys)
+    return f'<ul>{items}</ul>'
+
+
+def _stats_rows(stats_changed):
+    if not stats_changed:
+        return '<p class="empty">None</p>'
+    rows = []
+    for change in stats_changed:
+        cells = ''.join(f'<td>{change["before"].get(field, "")} → {change["after"].get(field, "")}</td>'
+                        if change['before'].get(field) != change['after'].get(field) else
+                        f'<td>{change["after"].get(field, "")}</td>' for field in STATS_FIELDS)
+        rows.append(f'<tr><td>{html.escape(change["title"])}</td>{cells}</tr>')
+    header = ''.join(f'<th>{field.replace("_", " ")}</th>' for field in STATS_FIELDS)
+    return f'<table><tr><th>Section</th>{header}</tr>{"".join(rows)}</table>'
+
+
+def write_summary_page(report, path=SUMMARY_PAGE):
+    """HTML summary of a delta report"""
+    traces, mappings = report['traces'], report['mappings']
+    previous = (time.strftime('%Y-%m-%d %H:%M', time.localtime(report['previous_build']))
+                if report['previous_build'] else 'none (baseline build)')
+    summary = (f'<tr><td>Previous build</td><td>{previous}</td></tr>'
+               f'<tr><td>Traces added / removed / changed / unchanged</td><td>{len(traces["added"])} / '
+               f'{len(traces["removed"])} / {len(traces["changed"])} / {traces["unchanged"]}</td></tr>'
+               f'<tr><td>Diffs changed</td><td>{len(report["diffs_changed"])}</td></tr>'
+               f'<tr><td>Amendment mappings added / removed / changed</td><td>{len(mappings["added"])} / '
+               f'{len(mappings["removed"])} / {len(mappings["changed"])}</td></tr>')
+    sections = [
+        ('Added traces', _list_items(traces['added'], report['titles'])),
+        ('Removed traces', _list_items(traces['removed'], report['titles'])),
+        ('Changed traces', _list_items(traces['changed'], report['titles'])),
+        ('Changed stats', _stats_rows(report['stats_changed'])),
+        ('Added amendment mappings', _list_items(mappings['added'])),
+        ('Removed amendment mappings', _list_items(mappings['removed'])),
+        ('Changed amendment mappings', _list_items(mappings['changed'])),
+    ]
+    write_page(path, 'build_delta.html', summary_rows=summary,
+               sections=''.join(f'<h2>{title}</h2>{body}' for title, body in sections))
+
+
+def build_with_delta(alignment='greedy', manifest_path=MANIFEST_FILE, code=()):
+    """Build the website, reusing unchanged diffs made by the same code, and report what changed since the last build"""
+    from content_focused_diff_website import build_website
+
+    previous = load_manifest(manifest_path)
+    store = DiffStore(code=code_version(code))
+    traces = build_website(alignment, reuse=store.reuse(alignment))
+    records = load_provenance(RECORDS_FILE) if os.path.exists(RECORDS_FILE) else []
+    current = build_manifest(traces, alignment, records)
+
+    start = time.perf_counter()
+    report = compare_manifests(previous, current)
+    elapsed = time.perf_counter() - start
+    write_json(report, REPORT_FILE)
+    write_summary_page(report)
+    write_json(current, manifest_path)
+    store.save(traces, alignment)
+
+    counts = report['traces']
+    print(f"\n🧮 Delta vs {'previous build' if previous else 'nothing (baseline recorded)'} "
+          f"in {elapsed * 1000:.1f} ms: {len(counts['added'])} added, {len(counts['removed'])} removed, "
+          f"{len(counts['changed'])} changed, {counts['unchanged']} unchanged traces; "
+          f"{len(report['stats_changed'])} stats and "
+          f"{sum(len(keys) for keys in report['mappings'].values())} amendment mappings changed")
+    print(f"📄 Report: {REPORT_FILE}, summary page: {SUMMARY_PAGE}")
+    return report
@@ -4,73 +4,47 @@ Script to create compact House Amendment badges that expand on click.
 Shows only "House Amendment Sec. xxx" initially, with details hidden until clicked.
 """
 
-import pandas as pd
 import re
 import json
 
+from bill_structure import section_designation
+from create_original_amendment_badges import replace_original_amendment_spans
+from html_splice import anchor_legacy_page, replace_marked, splice
+from page_templates import write_page
+from provenance import ProvenanceIndex, collect_provenance, write_provenance
+from tracing_db import open_db
+
+SOURCE_PAGE = 'ndaa_source_tracing_complete_enhanced.html'
+# A House RDS badge's label through the end of its element ("House RDS Sec. 101A</span>")
+HOUSE_RDS_MARKER = 'House RDS Sec.'
+HOUSE_RDS_BADGE = re.compile(r'House RDS Sec\.\s*(\d+[A-Z]{0,2})(?![0-9A-Za-z])[^<]*</[^>]+>', re.IGNORECASE)
+
 def load_data():
-    """Load and process the Excel data files."""
-    
-    # Load the header matching data from the 'Matched' sheet
-    matched_df = pd.read_excel('header_match_results_high_quality.xlsx', sheet_name='Matched')
+    """Load the matched headers and HR8070 amendments into the tracing store."""
     
-    # Load the HR8070 amendments data
-    hr8070_df = pd.read_excel('HR8070_amendments_with_sponsors_FINAL.xlsx')
+    # Workbooks are re-parsed only when they changed since the last run
+    db = open_db(sources=('house_matches', 'house_amendments', 'original_amendments'))
+    counts = db.counts()
     
-    print(f"Loaded {len(matched_df)} matched headers from header_match_results_high_quality.xlsx")
-    print(f"Loaded {len(hr8070_df)} HR8070 amendments")
+    print(f"Loaded {counts.get('house_matches', 0)} matched headers from header_match_results_high_quality.xlsx")
+    print(f"Loaded {counts.get('house_amendments', 0)} HR8070 amendments")
     
-    return matched_df, hr8070_df
+    return db
 
-def extract_section_number(text):
-    """Extract numeric section number from text like 'SEC. 723.'"""
-    if pd.isna(text):
-        return None
-    match = re.search(r'(\d+)', str(text))
-    return int(match.group(1)) if match else None
-
-def create_house_rds_mapping(matched_df, hr8070_df):
-    """Create mapping from House RDS section numbers to amendment information."""
+def create_provenance_records(db, html_content):
+    """Collect provenance records once and save them for the later stages."""
     
-    # Extract section numbers from the matched_bill_section_number column
-    matched_df['section_number'] = matched_df['matched_bill_section_number'].apply(extract_section_number)
+    records = collect_provenance(db, html_content)
+    write_provenance(records)
     
-    # Create mapping dictionary
-    house_rds_mapping = {}
+    print(f"Saved {len(records)} provenance records to provenance_records.json")
+    return ProvenanceIndex(records)
+
+def create_house_rds_mapping(provenance):
+    """Create mapping from House RDS section designations to amendment information."""
     
-    for _, row in matched_df.iterrows():
-        section_num = row['section_number']
-        if pd.isna(section_num):
-            continue
-            
-        amendment_num = row['amendment_number']
-        
-        # Find corresponding HR8070 data
-        hr8070_match = hr8070_df[hr8070_df['individual_amendment_number'] == amendment_num]
-        
-        if not hr8070_match.empty:
-            hr8070_row = hr8070_match.iloc[0]
-            
-            # Get sponsor information
-            sponsors = str(row.get('Sponsors', 'Unknown')).strip()
-            if sponsors in ['', 'nan', 'None']:
-                sponsors = str(hr8070_row.get('Sponsor', 'Unknown')).strip()
-            
-            mapping_info = {
-                'house_rds_section': section_num,
-                'amendment_number': amendment_num,
-                'hml_section_title': str(row['hml_section_title']).strip(),
-                'matched_bill_section_title': str(row['matched_bill_section_title']).strip(),
-                'sponsors': sponsors,
-                'vote_type': str(row.get('vote_type', '')).strip(),
-                'yea': str(row.get('yea', '')).strip(),
-                'nay': str(row.get('nay', '')).strip(),
-                'agreed_or_not': str(row.get('agrred_or_not', '')).strip(),
-                'similarity_score': float(row.get('similarity_score', 0)),
-                'hml_full_content': str(hr8070_row.get('hml_full_content', '')).strip()
-            }
-            
-            house_rds_mapping[section_num] = mapping_info
+    # Keyed by House RDS section designation ("101A"), from the provenance records
+    house_rds_mapping = provenance.house_rds_mapping()
     
     print(f"Created mapping for {len(house_rds_mapping)} House RDS sections")
     return house_rds_mapping
@@ -79,7 +53,6 @@ def create_house_amendment_details_page(house_rds_mapping):
     """Create a details page that shows House Amendment information based on URL parameters."""
     
     # Convert mapping to JSON for JavaScript
-    import json
     amendments_data = {}
     for section_num, mapping_info in house_rds_mapping.items():
         amendments_data[mapping_info['amendment_number']] = {
@@ -93,182 +66,12 @@ def create_house_amendment_details_page(house_rds_mapping):
             'hml_full_content': mapping_info['hml_full_content']
         }
     
-    details_html = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>House Amendment Details</title>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            margin: 0;
-            padding: 2rem;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-        }}
-        .container {{
-            max-width: 800px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #8e44ad, #3498db);
-            color: white;
-            padding: 2rem;
-            text-align: center;
-        }}
-        .content {{
-            padding: 2rem;
-        }}
-        .info-section {{
-            margin-bottom: 1.5rem;
-            padding: 1rem;
-            background: #f8f9fa;
-            border-radius: 8px;
-            border-left: 4px solid #3498db;
-        }}
-        .info-label {{
-            font-weight: bold;
-            color: #2c3e50;
-            margin-bottom: 0.5rem;
-        }}
-        .full-text {{
-            background: #f1f2f6;
-            padding: 1.5rem;
-            border-radius: 8px;
-            white-space: pre-wrap;
-            font-family: 'Courier New', monospace;
-            font-size: 0.9em;
-            line-height: 1.5;
-            max-height: 400px;
-            overflow-y: auto;
-            border: 1px solid #ddd;
-        }}
-        .back-button {{
-            display: inline-block;
-            background: linear-gradient(135deg, #3498db, #8e44ad);
-            color: white;
-            padding: 0.75rem 1.5rem;
-            border-radius: 8px;
-            text-decoration: none;
-            font-weight: bold;
-            margin-bottom: 1rem;
-            transition: all 0.3s ease;
-        }}
-        .back-button:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.2);
-        }}
-        .error {{
-            text-align: center;
-            padding: 2rem;
-            color: #e74c3c;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1><i class="fas fa-code-branch"></i> House Amendment Details</h1>
-        </div>
-        <div class="content">
-                         <a href="ndaa_source_tracing_complete_enhanced_with_compact_house_rds.html" class="back-button">
-                 <i class="fas fa-arrow-left"></i> Back to NDAA Source Tracing
-             </a>
-            <div id="amendment-details">
-                <div class="error">
-                    <h2>Loading Amendment Details...</h2>
-                    <p>Please wait while we load the amendment information.</p>
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        const amendmentsData = {json.dumps(amendments_data, indent=2)};
-        
-        function getUrlParameter(name) {{
-            const urlParams = new URLSearchParams(window.location.search);
-            return urlParams.get(name);
-        }}
-        
-        function displayAmendmentDetails() {{
-            const amendmentNumber = getUrlParameter('amendment');
-            const detailsContainer = document.getElementById('amendment-details');
-            
-            if (!amendmentNumber || !amendmentsData[amendmentNumber]) {{
-                detailsContainer.innerHTML = `
-                    <div class="error">
-                        <h2>Amendment Not Found</h2>
-                        <p>The requested House Amendment ${{amendmentNumber || 'N/A'}} could not be found.</p>
-                    </div>
-                `;
-                return;
-            }}
-            
-            const amendment = amendmentsData[amendmentNumber];
-            
-            let sponsorsSection = '';
-            if (amendment.sponsors && amendment.sponsors !== 'Unknown' && amendment.sponsors !== '') {{
-                sponsorsSection = `
-                    <div class="info-section">
-                        <div class="info-label">Sponsors:</div>
-                        <div>${{amendment.sponsors}}</div>
-                    </div>
-                `;
-            }}
-            
-            let voteSection = '';
-            if (amendment.vote_type && amendment.vote_type !== '') {{
-                voteSection = `
-                    <div class="info-section">
-                        <div class="info-label">Vote Information:</div>
-                        <div><strong>Type:</strong> ${{amendment.vote_type}}</div>
-                        <div><strong>Yea:</strong> ${{amendment.yea || 'N/A'}}, <strong>Nay:</strong> ${{amendment.nay || 'N/A'}}</div>
-                        <div><strong>Result:</strong> ${{amendment.agreed_or_not || 'N/A'}}</div>
-                    </div>
-                `;
-            }}
-            
-            let fullTextSection = '';
-            if (amendment.hml_full_content && amendment.hml_full_content !== '') {{
-                fullTextSection = `
-                    <div class="info-section">
-                        <div class="info-label">Full Amendment Text:</div>
-                        <div class="full-text">${{amendment.hml_full_content}}</div>
-                    </div>
-                `;
-            }}
-            
-            detailsContainer.innerHTML = `
-                <h2><i class="fas fa-file-alt"></i> House Amendment ${{amendmentNumber}}</h2>
-                
-                <div class="info-section">
-                    <div class="info-label">Amendment Title:</div>
-                    <div>${{amendment.hml_section_title}}</div>
-                </div>
-                
-                ${{sponsorsSection}}
-                ${{voteSection}}
-                ${{fullTextSection}}
-            `;
-        }}
-        
-        // Load amendment details when page loads
-        document.addEventListener('DOMContentLoaded', displayAmendmentDetails);
-    </script>
-</body>
-</html>
-    """
-    
-    with open('house_amendment_details.html', 'w', encoding='utf-8') as f:
-        f.write(details_html)
+    write_page('house_amendment_details.html', 'amendment_details.html',
+               page_title='House Amendment Details',
+               theme='house',
+               icon='fa-code-branch',
+               back_link='ndaa_source_tracing_complete_enhanced_with_compact_house_rds.html',
+               amendments_data=json.dumps(amendments_data, indent=2))
     
     print("📄 Created house_amendment_details.html for viewing amendment details")
 
@@ -306,11 +109,10 @@ def create_compact_branching_house_rds_badge(mapping_info):
     
     return badge_html
 
-def enhance_static_html_with_compact_branching(house_rds_mapping):
-    """Enhance the static HTML file with compact branching House RDS information."""
+def enhance_static_html_with_compact_branching(html_content, provenance):
+    """Render House RDS and Original Amendment badges into the source page and write it once."""
     
-    with open('ndaa_source_tracing_complete_enhanced.html', 'r', encoding='utf-8') as f:
-        html_content = f.read()
+    house_rds_mapping = provenance.house_rds_mapping()
     
     # No JavaScript functions needed for simple links
     toggle_functions = """
@@ -326,46 +128,26 @@ def enhance_static_html_with_compact_branching(house_rds_mapping):
     </script>"""
     
     # Add the toggle functions before closing body tag
-    html_content = html_content.replace('</body>', toggle_functions + '\n</body>')
+    html_content = anchor_legacy_page(html_content)
+    html_content = splice(html_content, {'body-end': toggle_functions + '\n'})
     
-    # Find and enhance sections with House RDS references
+    # Insert a branching badge after each House RDS badge whose section has a match
     enhanced_count = 0
     
-    # Enhanced pattern to specifically target House RDS badges and insert branching content after them
-    def enhance_house_rds_section(match):
+    def add_branch(rds_match):
         nonlocal enhanced_count
         
-        full_match = match.group(0)
-        
-        # Look for House RDS section number in the content
-        section_num_matches = re.findall(r'House RDS Sec\.\s*(\d+)', full_match)
-        
-        if section_num_matches:
-            for section_num_str in section_num_matches:
-                section_num = int(section_num_str)
-                
-                if section_num in house_rds_mapping:
-                    mapping_info = house_rds_mapping[section_num]
-                    house_rds_badge = create_compact_branching_house_rds_badge(mapping_info)
-                    
-                    # Insert the branching badge right after the House RDS badge
-                    # Look for the House RDS badge specifically and add after it
-                    house_rds_pattern = f'(House RDS Sec\\. {section_num}[^<]*</[^>]+>)'
-                    
-                    def add_branch(rds_match):
-                        return rds_match.group(0) + house_rds_badge
-                    
-                    full_match = re.sub(house_rds_pattern, add_branch, full_match, flags=re.IGNORECASE)
-                    enhanced_count += 1
-                    break  # Only enhance once per section
-        
-        return full_match
+        designation = section_designation(rds_match.group(1))
+        if designation not in house_rds_mapping:
+            return rds_match.group(0)
+        enhanced_count += 1
+        return rds_match.group(0) + create_compact_branching_house_rds_badge(house_rds_mapping[designation])
     
-    # Pattern to match larger blocks that might contain House RDS sections
-    # This pattern captures trace cards or similar containers
-    pattern = r'(<div[^>]*>.*?House RDS Sec\.\s*\d+.*?</div>(?:\s*<div[^>]*>.*?</div>)*)'
+    # Badges are found at each "House RDS Sec." label, not by a pattern run over the whole page
+    html_content = replace_marked(html_content, HOUSE_RDS_MARKER, HOUSE_RDS_BADGE, add_branch)
     
-    html_content = re.sub(pattern, enhance_house_rds_section, html_content, flags=re.DOTALL | re.IGNORECASE)
+    # Original Amendment references become pill badges (keyed lookup over the records)
+    html_content = replace_original_amendment_spans(html_content, provenance.original_amendments())
     
     # Save the enhanced HTML
     output_file = 'ndaa_source_tracing_complete_enhanced_with_compact_house_rds.html'
@@ -382,24 +164,29 @@ def main():
     print("🔍 Using header_match_results_high_quality.xlsx 'Matched' sheet for matching")
     print("📦 Creating simple clickable House Amendment badges")
     
-    # Load data
-    matched_df, hr8070_df = load_data()
+    with open(SOURCE_PAGE, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    
+    # Load data and record provenance for this and the later stages
+    with load_data() as db:
+        provenance = create_provenance_records(db, html_content)
     
     # Create House RDS mapping
-    house_rds_mapping = create_house_rds_mapping(matched_df, hr8070_df)
+    house_rds_mapping = create_house_rds_mapping(provenance)
     
     # Create the House Amendment details page
     create_house_amendment_details_page(house_rds_mapping)
     
     # Enhance static HTML with compact branching layout
-    output_file = enhance_static_html_with_compact_branching(house_rds_mapping)
+    output_file = enhance_static_html_with_compact_branching(html_content, provenance)
     
-    print(f"\n✅ Simple clickable House RDS enhancement complete!")
+    print("\n✅ Simple clickable House RDS enhancement complete!")
     print(f"📄 Output file: {output_file}")
     print(f"🔗 View at: http://localhost:8020/{output_file}")
-    print(f"📊 Data source: header_match_results_high_quality.xlsx (Matched sheet)")
-    print(f"💡 Click on House Amendment badges to open details in new page!")
-    print(f"📋 Details page: house_amendment_details.html")
+    print("📊 Data source: header_match_results_high_quality.xlsx (Matched sheet)")
+    print("💡 Click on House Amendment badges to open details in new page!")
+    print("📋 Details page: house_amendment_details.html")
+    print("🧾 Provenance records: provenance_records.json (used by create_original_amendment_badges.py)")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
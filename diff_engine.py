@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+Content Diff Engine
+Build-time port of the page's content-focused diff with word-level highlights
+"""
+
+import bisect
+import html
+import math
+from functools import lru_cache
+
+from text_normalization import normalized
+
+MATCH_THRESHOLD = 0.7
+UNCHANGED_THRESHOLD = 0.95
+
+
+def _jaccard(set1, set2):
+    union = len(set1 | set2)
+    if not union:
+        return 0.0
+    return len(set1 & set2) / union
+
+
+def _token_sets(chunks):
+    return [frozenset(chunk.lower().split()) for chunk in chunks]
+
+
+def _bisect(a, a0, a1, b, b0, b1):
+    """Find the split point of the middle snake for a[a0:a1] vs b[b0:b1].
+
+    Forward and reverse Myers searches run in lock-step over two arrays of
+    size O(N + M), so memory stays linear regardless of the edit distance.
+    Returns the split (x, y) relative to the region start, or None.
+    """
+    len1 = a1 - a0
+    len2 = b1 - b0
+    max_d = (len1 + len2 + 1) // 2
+    v_offset = max_d
+    v_length = 2 * max_d + 2
+    v1 = [-1] * v_length
+    v2 = [-1] * v_length
+    v1[v_offset + 1] = 0
+    v2[v_offset + 1] = 0
+    delta = len1 - len2
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = v_offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < len1 and y1 < len2 and a[a0 + x1] == b[b0 + y1]:
+                x1 += 1
+                y1 += 1
+            v1[k1_offset] = x1
+            if x1 > len1:
+                k1end += 2
+            elif y1 > len2:
+                k1start += 2
+            elif front:
+                k2_offset = v_offset + delta - k1
+                if 0 <= k2_offset < v_length and v2[k2_offset] != -1:
+                    if x1 >= len1 - v2[k2_offset]:
+                        return x1, y1
+
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = v_offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < len1 and y2 < len2 and a[a1 - 1 - x2] == b[b1 - 1 - y2]:
+                x2 += 1
+                y2 += 1
+            v2[k2_offset] = x2
+            if x2 > len1:
+                k2end += 2
+            elif y2 > len2:
+                k2start += 2
+            elif not front:
+                k1_offset = v_offset + delta - k2
+                if 0 <= k1_offset < v_length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    y1 = v_offset + x1 - k1_offset
+                    if x1 >= len1 - x2:
+                        return x1, y1
+    return None
+
+
+def myers_diff(a, b):
+    """Linear-space Myers diff of two token sequences.
+
+    Returns a list of (op, token) pairs where op is '=', '-' or '+'.
+    Regions are processed with an explicit stack so very long clauses
+    never hit the recursion limit.
+    """
+    ops = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        item = stack.pop()
+        if item[0] == '=':
+            ops.extend(('=', token) for token in a[item[1]:item[2]])
+            continue
+
+        a0, a1, b0, b1 = item
+
+        # Common prefix is emitted now, common suffix after the middle
+        while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+            ops.append(('=', a[a0]))
+            a0 += 1
+            b0 += 1
+        suffix_end = a1
+        while a1 > a0 and b1 > b0 and a[a1 - 1] == b[b1 - 1]:
+            a1 -= 1
+            b1 -= 1
+        if suffix_end > a1:
+            stack.append(('=', a1, suffix_end))
+
+        if a0 == a1:
+            ops.extend(('+', token) for token in b[b0:b1])
+            continue
+        if b0 == b1:
+            ops.extend(('-', token) for token in a[a0:a1])
+            continue
+
+        split = _bisect(a, a0, a1, b, b0, b1)
+        if split is None or split in ((0, 0), (a1 - a0, b1 - b0)):
+            ops.extend(('-', token) for token in a[a0:a1])
+            ops.extend(('+', token) for token in b[b0:b1])
+            continue
+
+        x, y = split
+        stack.append((a0 + x, a1, b0 + y, b1))
+        stack.append((a0, a0 + x, b0, b0 + y))
+    return ops
+
+
+@lru_cache(maxsize=8192)
+def word_diff(chunk1, chunk2):
+    """Word-level diff of a modified chunk pair, cached across traces"""
+    return tuple(myers_diff(chunk1.split(), chunk2.split()))
+
+
+def _render_word_ops(ops, keep_op, css_class):
+    """Render one side of a word diff, wrapping changed runs in a span"""
+    parts = []
+    run = []
+    for op, token in ops:
+        if op == '=':
+            if run:
+                parts.append(f'<span class="{css_class}">{html.escape(" ".join(run), quote=False)}</span>')
+                run = []
+            parts.append(html.escape(token, quote=False))
+        elif op == keep_op:
+            run.append(token)
+    if run:
+        parts.append(f'<span class="{css_class}">{html.escape(" ".join(run), quote=False)}</span>')
+    return ' '.join(parts)
+
+
+def _chunk_span(css_class, content_html):
+    return f'<span class="{css_class}">{content_html}.</span> '
+
+
+def _similarity_percent(matched, total_chunks):
+    """Percentage of matched chunks, rounded like Math.round"""
+    return math.floor(matched / total_chunks * 100 + 0.5) if total_chunks else 100
+
+
+def compute_content_diff(chunks1, chunks2, tokens1=None, tokens2=None):
+    """Greedy similarity matching of chunks (mirrors computeContentDiff).
+
+    Modified pairs get word-level highlights instead of a wholesale
+    content-modified block. tokens1/tokens2 are the per-chunk word sets
+    when the caller already has them from normalization.
+    """
+    tokens1 = tokens1 or _token_sets(chunks1)
+    tokens2 = tokens2 or _token_sets(chunks2)
+    left_html = []
+    right_html = []
+    stats = {'added': 0, 'removed': 0, 'unchanged': 0, 'modified': 0}
+    used2 = set()
+
+    for i, chunk1 in enumerate(chunks1):
+        best_match = -1
+        best_similarity = 0
+
+        for j in range(len(chunks2)):
+            if j in used2:
+                continue
+            similarity = _jaccard(tokens1[i], tokens2[j])
+            if similarity > best_similarity and similarity > MATCH_THRESHOLD:
+                best_similarity = similarity
+                best_match = j
+
+        if best_match != -1:
+            used2.add(best_match)
+            chunk2 = chunks2[best_match]
+            # Modified pairs still count towards unchanged, as in the page
+            stats['unchanged'] += 1
+
+            if best_similarity > UNCHANGED_THRESHOLD:
+                left_html.append(_chunk_span('content-unchanged', html.escape(chunk1, quote=False)))
+                right_html.append(_chunk_span('content-unchanged', html.escape(chunk2, quote=False)))
+            else:
+                ops = word_diff(chunk1, chunk2)
+                left_html.append(_chunk_span('content-modified', _render_word_ops(ops, '-', 'word-removed')))
+                right_html.append(_chunk_span('content-modified', _render_word_ops(ops, '+', 'word-added')))
+                stats['modified'] += 1
+        else:
+            left_html.append(_chunk_span('content-removed', html.escape(chunk1, quote=False)))
+            stats['removed'] += 1
+
+    for j, chunk2 in enumerate(chunks2):
+        if j not in used2:
+            right_html.append(_chunk_span('content-added', html.escape(chunk2, quote=False)))
+            stats['added'] += 1
+
+    stats['similarity'] = _similarity_percent(stats['unchanged'], max(len(chunks1), len(chunks2)))
+    stats['change_volume'] = stats['added'] + stats['removed'] + stats['modified']
+
+    return {
+        'left_html': ''.join(left_html),
+        'right_html': ''.join(right_html),
+        'stats': stats
+    }
+
+
+def _unique_exact_pairs(chunks1, lo1, hi1, chunks2, lo2, hi2, taken1, taken2):
+    """Index pairs of chunks that occur exactly once on each side of a region"""
+    seen = {}
+    for i in range(lo1, hi1):
+        if i not in taken1:
+            entry = seen.setdefault(chunks1[i].lower(), [0, 0, i, -1])
+            entry[0] += 1
+    for j in range(lo2, hi2):
+        if j not in taken2:
+            entry = seen.get(chunks2[j].lower())
+            if entry is not None:
+                entry[1] += 1
+                entry[3] = j
+    return sorted((i, j) for count1, count2, i, j in seen.values() if count1 == 1 and count2 == 1)
+
+
+def _longest_increasing_run(pairs):
+    """Longest subsequence of (i, j) pairs increasing in j (patience sorting)"""
+    tails = []
+    tail_indexes = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        position = bisect.bisect_left(tails, j)
+        if position > 0:
+            previous[index] = tail_indexes[position - 1]
+        if position == len(tails):
+            tails.append(j)
+            tail_indexes.append(index)
+        else:
+            tails[position] = j
+            tail_indexes[position] = index
+
+    run = []
+    index = tail_indexes[-1] if tail_indexes else -1
+    while index != -1:
+        run.append(pairs[index])
+        index = previous[index]
+    run.reverse()
+    return run
+
+
+def _fill_gap(tokens1, lo1, hi1, tokens2, lo2, hi2, matches, taken1, taken2):
+    """In-order similarity matching inside a gap between anchors"""
+    start = lo2
+    for i in range(lo1, hi1):
+        if i in taken1:
+            continue
+        best_match = -1
+        best_similarity = 0
+        for j in range(start, hi2):
+            if j in taken2:
+                continue
+            similarity = _jaccard(tokens1[i], tokens2[j])
+            if similarity > best_similarity and similarity > MATCH_THRESHOLD:
+                best_similarity = similarity
+                best_match = j
+                if similarity == 1.0:
+                    break
+        if best_match != -1:
+            matches[i] = best_match
+            taken1.add(i)
+            taken2.add(best_match)
+            start = best_match + 1
+
+
+def compute_ordered_content_diff(chunks1, chunks2, tokens1=None, tokens2=None):
+    """Order-preserving alignment of chunks.
+
+    Chunks that occur exactly once on both sides anchor the alignment
+    (patience diff); the longest in-order run of anchors is kept and the
+    gaps between them are aligned recursively, falling back to in-order
+    similarity matching when a gap has no unique anchors. Unique exact
+    matches that fall out of order, and similar chunks left unpaired after
+    alignment, are reported as moved rather than unchanged, so repeated
+    boilerplate can only pair up within its gap.
+    """
+    tokens1 = tokens1 or _token_sets(chunks1)
+    tokens2 = tokens2 or _token_sets(chunks2)
+    matches = {}
+    moved = {}
+    taken1 = set()
+    taken2 = set()
+
+    regions = [(0, len(chunks1), 0, len(chunks2))]
+    while regions:
+        lo1, hi1, lo2, hi2 = regions.pop()
+        if lo1 >= hi1 or lo2 >= hi2:
+            continue
+
+        pairs = _unique_exact_pairs(chunks1, lo1, hi1, chunks2, lo2, hi2, taken1, taken2)
+        anchors = _longest_increasing_run(pairs)
+        if not anchors:
+            _fill_gap(tokens1, lo1, hi1, tokens2, lo2, hi2, matches, taken1, taken2)
+            continue
+
+        anchored = set(anchors)
+        for i, j in pairs:
+            taken1.add(i)
+            taken2.add(j)
+            if (i, j) in anchored:
+                matches[i] = j
+            else:
+                moved[i] = j
+
+        prev1, prev2 = lo1, lo2
+        for i, j in anchors:
+            regions.append((prev1, i, prev2, j))
+            prev1, prev2 = i + 1, j + 1
+        regions.append((prev1, hi1, prev2, hi2))
+
+    # Chunks still unpaired on both sides matched out of order: moved
+    leftovers2 = [j for j in range(len(chunks2)) if j not in taken2]
+    for i in range(len(chunks1)):
+        if i in taken1:
+            continue
+        best_match = -1
+        best_similarity = 0
+        for j in leftovers2:
+            if j in taken2:
+                continue
+            similarity = _jaccard(tokens1[i], tokens2[j])
+            if similarity > best_similarity and similarity > MATCH_THRESHOLD:
+                best_similarity = similarity
+                best_match = j
+        if best_match != -1:
+            moved[i] = best_match
+            taken1.add(i)
+            taken2.add(best_match)
+
+    stats = {'added': 0, 'removed': 0, 'unchanged': 0, 'modified': 0, 'moved': len(moved)}
+    right_spans = {}
+    left_html = []
+    for i, chunk1 in enumerate(chunks1):
+        if i in matches:
+            j = matches[i]
+            chunk2 = chunks2[j]
+            stats['unchanged'] += 1
+            if _jaccard(tokens1[i], tokens2[j]) > UNCHANGED_THRESHOLD:
+                left_html.append(_chunk_span('content-unchanged', html.escape(chunk1, quote=False)))
+                right_spans[j] = _chunk_span('content-unchanged', html.escape(chunk2, quote=False))
+            else:
+                ops = word_diff(chunk1, chunk2)
+                left_html.append(_chunk_span('content-modified', _render_word_ops(ops, '-', 'word-removed')))
+                right_spans[j] = _chunk_span('content-modified', _render_word_ops(ops, '+', 'word-added'))
+                stats['modified'] += 1
+        elif i in moved:
+            j = moved[i]
+            chunk2 = chunks2[j]
+            if _jaccard(tokens1[i], tokens2[j]) > UNCHANGED_THRESHOLD:
+                left_html.append(_chunk_span('content-moved', html.escape(chunk1, quote=False)))
+                right_spans[j] = _chunk_span('content-moved', html.escape(chunk2, quote=False))
+            else:
+                ops = word_diff(chunk1, chunk2)
+                left_html.append(_chunk_span('content-moved', _render_word_ops(ops, '-', 'word-removed')))
+                right_spans[j] = _chunk_span('content-moved', _render_word_ops(ops, '+', 'word-added'))
+        else:
+            left_html.append(_chunk_span('content-removed', html.escape(chunk1, quote=False)))
+            stats['removed'] += 1
+
+    right_html = []
+    for j, chunk2 in enumerate(chunks2):
+        if j in right_spans:
+            right_html.append(right_spans[j])
+        else:
+            right_html.append(_chunk_span('content-added', html.escape(chunk2, quote=False)))
+            stats['added'] += 1
+
+    # Moved text is still present, so it counts towards similarity
+    stats['similarity'] = _similarity_percent(stats['unchanged'] + stats['moved'], max(len(chunks1), len(chunks2)))
+    stats['change_volume'] = stats['added'] + stats['removed'] + stats['modified'] + stats['moved']
+
+    return {
+        'left_html': ''.join(left_html),
+        'right_html': ''.join(right_html),
+        'stats': stats
+    }
+
+
+ALIGNMENT_MODES = {
+    'greedy': compute_content_diff,
+    'ordered': compute_ordered_content_diff,
+}
+
+
+@lru_cache(maxsize=1024)
+def diff_texts(text1, text2, alignment='greedy'):
+    """Diff two section bodies, reusing their shared normalized form"""
+    section1 = normalized(text1)
+    section2 = normalized(text2)
+    return ALIGNMENT_MODES[alignment](section1.chunks, section2.chunks,
+                                      section1.chunk_tokens, section2.chunk_tokens)
+
+
+def attach_precomputed_diffs(traces, alignment='greedy', reuse=None):
+    """Store the rendered diff and its change stats on every trace.
+
+    The stats live at the top level of each trace so the page can sort and
+    filter the whole index without touching the diff HTML. reuse(trace)
+    may return a previous build's result for an unchanged trace, which is
+    attached instead of diffing again.
+    """
+    modified_pairs = reused = 0
+    for trace in traces:
+        diff = reuse(trace) if reuse else None
+        if diff is None:
+            diff = diff_texts(trace['ih_section']['text'], trace['rh_section']['text'], alignment)
+        else:
+            reused += 1
+        trace['diff'] = {'left_html': diff['left_html'], 'right_html': diff['right_html']}
+        trace['stats'] = diff['stats']
+        modified_pairs += diff['stats']['modified']
+
+    cache = word_diff.cache_info()
+    print(f"✅ Precomputed {alignment} diffs for {len(traces)} traces "
+          f"({modified_pairs} modified chunk pairs, {cache.currsize} cached word diffs)")
+    if reuse:
+        print(f"♻️  {reused} unchanged traces reused their previous diffs")
+    return traces
+
+
+def most_changed(traces, limit=5):
+    """Traces ordered by change volume, then by lowest similarity"""
+    ranked = sorted(traces, key=lambda trace: (-trace['stats']['change_volume'], trace['stats']['similarity']))
+    return ranked[:limit]
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+HR5009 Tracing Tool
+Single entry point for building, enhancing, serving and benchmarking the tracing pages
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+from diff_engine import ALIGNMENT_MODES
+
+SCRIPT = os.path.abspath(__file__)
+# Modules behind each subcommand, imported only when that subcommand runs
+COMMAND_MODULES = {
+    'build': 'content_focused_diff_website',
+    'serve': 'content_focused_diff_website',
+    'layout': 'create_compact_branching_layout',
+    'badges': 'create_original_amendment_badges',
+    'fulltext': 'integrate_ndaa_bill_full_text',
+    'match': 'section_matcher',
+    'crossmatch': 'amendment_cross_matcher',
+    'structure': 'bill_structure',
+    'graph': 'provenance_graph',
+    'budgets': 'performance_budgets',
+}
+# Subcommands that hand unrecognised options to the underlying script
+PASSTHROUGH_COMMANDS = ('match', 'crossmatch', 'structure', 'graph', 'budgets', 'bench')
+HEAVY_MODULES = ('pandas', 'openpyxl', 'numpy', 'asyncio')
+BENCH_PORT = 8765
+
+# What each cacheable stage reads and writes. sources are tracing store
+# sources (resolved to their workbooks); code paths are relative to this
+# script and version the stage, so editing a stage invalidates its cache.
+Stage = namedtuple('Stage', ['sources', 'inputs', 'outputs', 'code'])
+STAGES = {
+    'build': Stage(('ih_sections', 'rh_sections', 'title_matches'), (),
+                   ('content_focused_diff_website.html', 'section_texts.bin', 'section_texts.json'),
+                   ('content_focused_diff_website.py', 'diff_engine.py', 'text_normalization.py', 'trace_store.py',
+                    'text_blob.py', 'tracing_db.py', 'bill_structure.py', 'page_templates.py',
+                    'templates/content_focused_diff_website.html')),
+    # Writes the page with both badge kinds, and the provenance records the badges stage reads
+    'layout': Stage(('house_matches', 'house_amendments', 'original_amendments'),
+                    ('ndaa_source_tracing_complete_enhanced.html',),
+                    ('ndaa_source_tracing_complete_enhanced_with_compact_house_rds.html',
+                     'house_amendment_details.html', 'provenance_records.json'),
+                    ('create_compact_branching_layout.py', 'create_original_amendment_badges.py', 'provenance.py',
+                     'html_splice.py', 'tracing_db.py', 'bill_structure.py', 'page_templates.py',
+                     'templates/amendment_details.html')),
+    'badges': Stage((), ('provenance_records.json',), ('original_amendment_details.html',),
+                    ('create_original_amendment_badges.py', 'provenance.py', 'page_templates.py',
+                     'templates/amendment_details.html')),
+    'fulltext': Stage(('ndaa_sections',), ('ndaa_source_tracing_WITH_ORIGINAL_AMENDMENT_BADGES.html',),
+                      ('ndaa_source_tracing_WITH_DYNAMIC_FULL_TEXT.html', 'ndaa_full_text'),
+                      ('integrate_ndaa_bill_full_text.py', 'html_splice.py', 'tracing_db.py', 'bill_structure.py',
+                       'service_worker.py')),
+}
+
+
+def stage_code(name):
+    """Paths of the code files that version a stage"""
+    return [os.path.join(os.path.dirname(SCRIPT), path) for path in STAGES[name].code]
+
+
+def run_stage(name, build, args, params=()):
+    """Run a stage, or restore its outputs when its inputs and code are unchanged"""
+    from performance_budgets import record_stage_time
+    start = time.perf_counter()
+    if args.no_cache:
+        build()
+        record_stage_time(name, time.perf_counter() - start)
+        refresh_service_worker()
+        return
+    from build_cache import BuildCache
+    from tracing_db import SOURCES
+    stage = STAGES[name]
+    workbooks = [source.workbook for source in SOURCES if source.name in stage.sources]
+    cached = BuildCache().run(name, workbooks + list(stage.inputs), stage.outputs, stage_code(name), build, params)
+    record_stage_time(name, time.perf_counter() - start, cached)
+    refresh_service_worker()
+
+
+def refresh_service_worker():
+    """Re-version sw.js after a stage changed the site's files"""
+    from service_worker import SERVICE_WORKER_FILE, write_service_worker
+    version, files = write_service_worker()
+    print(f"📴 {SERVICE_WORKER_FILE}: build {version}, {len(files)} cached files")
+
+
+def cmd_build(args):
+    if args.delta:
+        # The report needs this build's traces, so the stage always runs; unchanged diffs are reused instead
+        from build_manifest import build_with_delta
+        from performance_budgets import record_stage_time
+        start = time.perf_counter()
+        build_with_delta(args.alignment, code=stage_code('build'))
+        record_stage_time('build', time.perf_counter() - start)
+        refresh_service_worker()
+    else:
+        from content_focused_diff_website import build_website
+        run_stage('build', lambda: build_website(args.alignment), args, params=(args.alignment,))
+    print("\n🎉 Content-focused website ready: content_focused_diff_website.html")
+
+
+def cmd_serve(args):
+    from content_focused_diff_website import build_website, make_watch, start_content_focused_server
+    # A built site is served as is; only the API and watch modes need the traces (and the workbooks)
+    traces = build_website(args.alignment) if args.api or args.watch else None
+    watch = make_watch(args.alignment, args.api) if args.watch else None
+    start_content_focused_server(traces, api=args.api, server='async' if args.watch else args.server,
+                                 watch=watch, port=args.port, browser=not args.no_browser)
+
+
+def cmd_layout(args):
+    from create_compact_branching_layout import main
+    run_stage('layout', main, args)
+
+
+def cmd_badges(args):
+    from create_original_amendment_badges import main
+    run_stage('badges', main, args)
+
+
+def cmd_fulltext(args):
+    from integrate_ndaa_bill_full_text import main
+    run_stage('fulltext', main, args)
+
+
+def cmd_match(args):
+    from section_matcher import main
+    main(args.extra)
+
+
+def cmd_crossmatch(args):
+    from amendment_cross_matcher import main
+    main(args.extra)
+
+
+def cmd_structure(args):
+    from bill_structure import main
+    main(args.extra)
+
+
+def cmd_graph(args):
+    from provenance_graph import main
+    main(args.extra)
+
+
+def cmd_budgets(args):
+    from performance_budgets import main
+    return main(args.extra)
+
+
+def _best_time(command, runs):
+    """Fastest of several runs, in seconds"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def _time_to_listen(command, port):
+    """Seconds from process start until the server accepts connections"""
+    from load_test import wait_for_port
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ready = wait_for_port('localhost', port)
+        return time.perf_counter() - start if ready else None
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure_startup(runs=5):
+    """Startup time of the CLI and of each subcommand's modules, against importing pandas"""
+    python = [sys.executable]
+    baseline = _best_time(python + ['-c', 'pass'], runs)
+    print(f"⏱️  Startup times (best of {runs}; interpreter alone {baseline * 1000:.0f} ms)")
+
+    rows = [('hr5009.py --help', python + [SCRIPT, '--help']),
+            ('hr5009.py serve --help', python + [SCRIPT, 'serve', '--help'])]
+    for label, command in rows:
+        print(f"   {label:<32} {_best_time(command, runs) * 1000:>6.0f} ms")
+
+    check = "import sys, {0}; print(','.join(m for m in {1!r} if m in sys.modules))"
+    for name, module in COMMAND_MODULES.items():
+        command = python + ['-c', check.format(module, HEAVY_MODULES)]
+        elapsed = _best_time(command, runs)
+        loaded = subprocess.run(command, capture_output=True, text=True).stdout.strip() or 'none'
+        print(f"   import for {name:<21} {elapsed * 1000:>6.0f} ms  (heavy modules: {loaded})")
+
+    print(f"   {'import pandas (for reference)':<32} {_best_time(python + ['-c', 'import pandas'], runs) * 1000:>6.0f} ms")
+
+    for server in ('simple', 'async'):
+        elapsed = _time_to_listen(python + [SCRIPT, 'serve', '--server', server, '--port', str(BENCH_PORT),
+                                            '--no-browser'], BENCH_PORT)
+        result = f"{elapsed * 1000:>6.0f} ms" if elapsed is not None else "   did not start"
+        print(f"   {'serve --server ' + server + ' (listening)':<32} {result}")
+
+
+def cmd_bench(args):
+    if args.target == 'startup':
+        measure_startup(args.runs)
+    elif args.target == 'templates':
+        from page_templates import main
+        main()
+    elif args.target == 'memory':
+        from trace_store import main
+        main()
+    elif args.target == 'load':
+        from load_test import main
+        return main(args.extra)
+
+
+def parse_args(argv=None):
+    """Parse the subcommand and its options"""
+    parser = argparse.ArgumentParser(description="Build, enhance, serve and benchmark the HR5009 tracing pages")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    build = subcommands.add_parser('build', help="build content_focused_diff_website.html from the workbooks")
+    build.add_argument('--delta', action='store_true',
+                       help="reuse unchanged diffs and report what changed since the last build "
+                            "(writes build_delta.json and build_delta.html)")
+    build.set_defaults(handler=cmd_build)
+
+    serve = subcommands.add_parser('serve', help="serve the built site (no workbooks are read unless --api/--watch)")
+    serve.add_argument('--server', choices=['simple', 'async'], default='simple',
+                       help="'simple' single-threaded server or the asyncio 'async' server (default: simple)")
+    serve.add_argument('--port', type=int, default=8016, help="port (default: 8016)")
+    serve.add_argument('--api', action='store_true', help="build the traces and serve JSON endpoints under /api/")
+    serve.add_argument('--watch', action='store_true',
+                       help="rebuild when the workbooks or templates change and reload open pages")
+    serve.add_argument('--no-browser', action='store_true', help="do not open a browser window")
+    serve.set_defaults(handler=cmd_serve)
+
+    for command in (build, serve):
+        command.add_argument('--alignment', choices=sorted(ALIGNMENT_MODES), default='greedy',
+                             help="chunk alignment used when building (default: greedy)")
+
+    layout = subcommands.add_parser('layout', help="add House amendment badges to the NDAA tracing page")
+    layout.set_defaults(handler=cmd_layout)
+    badges = subcommands.add_parser('badges', help="write the Original amendment details page from the provenance records")
+    badges.set_defaults(handler=cmd_badges)
+    fulltext = subcommands.add_parser('fulltext', help="add NDAA section full text to the diff note")
+    fulltext.set_defaults(handler=cmd_fulltext)
+
+    # Options (including --help) go to the underlying script
+    subcommands.add_parser('match', add_help=False, help="match House amendments to bill sections "
+                           "(writes header_match_results_high_quality.xlsx)").set_defaults(handler=cmd_match)
+    subcommands.add_parser('crossmatch', add_help=False, help="find member amendment text adopted into sections "
+                           "(writes amendment_cross_match_results.xlsx)").set_defaults(handler=cmd_crossmatch)
+    subcommands.add_parser('structure', add_help=False, help="show a bill's division/title/subtitle/section "
+                           "index").set_defaults(handler=cmd_structure)
+    subcommands.add_parser('graph', add_help=False, help="link amendments, sponsors, sections and traces "
+                           "(writes provenance_graph.json)").set_defaults(handler=cmd_graph)
+    subcommands.add_parser('budgets', add_help=False, help="check generated artifact sizes and stage times "
+                           "against performance_budgets.json").set_defaults(handler=cmd_budgets)
+
+    for command in (build, layout, badges, fulltext):
+        command.add_argument('--no-cache', action='store_true',
+                             help="always run the stage instead of restoring unchanged outputs from .build_cache/")
+
+    bench = subcommands.add_parser('bench', help="measure startup time, page generation, trace memory or "
+                                                 "server load (other options go to load_test.py)")
+    bench.add_argument('target', choices=['startup', 'templates', 'memory', 'load'])
+    bench.add_argument('--runs', type=int, default=5, help="repetitions per startup measurement (default: 5)")
+    bench.set_defaults(handler=cmd_bench)
+
+    # Unrecognised options are only accepted where a script receives them (`bench load` hands them to load_test.py)
+    args, extra = parser.parse_known_args(argv)
+    if extra and not (args.command in PASSTHROUGH_COMMANDS and getattr(args, 'target', 'load') == 'load'):
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    args.extra = extra
+    return args
+
+
+def main(argv=None):
+    """Run one subcommand"""
+    args = parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+HTML Splice
+Named injection anchors for generated pages and offset-based splicing
+"""
+
+import json
+import re
+
+# Anchors are comments so pages render the same with or without them:
+#   <!-- @anchor:name -->  or  /* @anchor:name */   insertion point
+#   <!-- @begin:name --> ... <!-- @end:name -->     replaceable region
+ANCHOR_PATTERN = re.compile(r'(?:<!--|/\*) @(anchor|begin|end):([\w-]+) (?:-->|\*/)')
+
+TRACES_DATA_MARKER = 'let tracesData = '
+OPEN_MODAL_MARKER = 'function openTraceModal(trace) {'
+ACTIVATE_MODAL_MARKER = "document.getElementById('trace-modal').classList.add('active');"
+DIFF_NOTE_MARKER = '<div class="diff-note">'
+
+
+def html_anchor(name):
+    return f'<!-- @anchor:{name} -->'
+
+
+def js_anchor(name):
+    return f'/* @anchor:{name} */'
+
+
+def html_region(name, content):
+    return f'<!-- @begin:{name} -->{content}<!-- @end:{name} -->'
+
+
+def find_anchors(content):
+    """Locate every anchor in one pass.
+
+    Returns name -> (start, end) offsets of the text a payload replaces:
+    an empty span just after an insertion point, or the body of a region.
+    """
+    anchors = {}
+    open_regions = {}
+    for match in ANCHOR_PATTERN.finditer(content):
+        kind, name = match.groups()
+        if kind == 'anchor':
+            anchors[name] = (match.end(), match.end())
+        elif kind == 'begin':
+            open_regions[name] = match.end()
+        elif name in open_regions:
+            anchors[name] = (open_regions.pop(name), match.start())
+    return anchors
+
+
+def splice(content, payloads, anchors=None):
+    """Insert or replace payloads at named anchors, building the result once.
+
+    Anchors are kept in the output so later stages can splice again.
+    Raises KeyError naming any anchors the page does not have.
+    """
+    anchors = find_anchors(content) if anchors is None else anchors
+    missing = sorted(set(payloads) - set(anchors))
+    if missing:
+        raise KeyError(f"Page has no anchors for: {', '.join(missing)}")
+
+    parts = []
+    position = 0
+    for start, end, payload in sorted((*anchors[name], payload) for name, payload in payloads.items()):
+        parts.append(content[position:start])
+        parts.append(payload)
+        position = end
+    parts.append(content[position:])
+    return ''.join(parts)
+
+
+def find_marked(content, marker, pattern):
+    """Matches of pattern at each occurrence of a literal marker.
+
+    The page is searched for the marker string only; the regex runs at
+    those offsets and never scans the rest of the page.
+    """
+    start = content.find(marker)
+    while start != -1:
+        match = pattern.match(content, start)
+        if match:
+            yield match
+        start = content.find(marker, match.end() if match else start + len(marker))
+
+
+def replace_marked(content, marker, pattern, replace):
+    """Replace each marked match with replace(match), building the result once"""
+    parts = []
+    position = 0
+    for match in find_marked(content, marker, pattern):
+        parts.append(content[position:match.start()])
+        parts.append(replace(match))
+        position = match.end()
+    parts.append(content[position:])
+    return ''.join(parts)
+
+
+def _insert(content, insertions):
+    parts = []
+    position = 0
+    for offset, text in sorted(insertions):
+        parts.append(content[position:offset])
+        parts.append(text)
+        position = offset
+    parts.append(content[position:])
+    return ''.join(parts)
+
+
+def anchor_legacy_page(content):
+    """Add anchors to a page generated before anchors existed.
+
+    Insertion points are found with plain string searches; the embedded
+    tracesData literal is skipped by decoding it, never scanned by regex.
+    """
+    anchors = find_anchors(content)
+    insertions = []
+
+    if 'after-traces-data' not in anchors:
+        start = content.find(TRACES_DATA_MARKER)
+        if start != -1:
+            try:
+                _, end = json.JSONDecoder().raw_decode(content, start + len(TRACES_DATA_MARKER))
+            except json.JSONDecodeError:
+                end = -1
+            if end != -1 and content.startswith(';', end):
+                insertions.append((end + 1, js_anchor('after-traces-data')))
+
+    if 'open-trace-modal' not in anchors:
+        start = content.find(OPEN_MODAL_MARKER)
+        activate = content.find(ACTIVATE_MODAL_MARKER, start) if start != -1 else -1
+        if activate != -1:
+            line_start = content.rfind('\n', start, activate)
+            insertions.append((line_start if line_start != -1 else activate, '\n            ' + js_anchor('open-trace-modal')))
+
+    if 'diff-note' not in anchors:
+        start = content.find(DIFF_NOTE_MARKER)
+        end = content.find('</div>', start) if start != -1 else -1
+        if end != -1:
+            insertions.append((start, '<!-- @begin:diff-note -->'))
+            insertions.append((end + len('</div>'), '<!-- @end:diff-note -->'))
+
+    body_end = content.rfind('</body>')
+    if body_end != -1:
+        if 'scripts-end' not in anchors:
+            script_end = content.rfind('</script>', 0, body_end)
+            if script_end != -1:
+                insertions.append((script_end, js_anchor('scripts-end') + '\n    '))
+        if 'body-end' not in anchors:
+            insertions.append((body_end, html_anchor('body-end') + '\n'))
+
+    return _insert(content, insertions) if insertions else content
@@ -1,104 +1,175 @@
 #!/usr/bin/env python3
 
-import pandas as pd
-import re
 import json
+import os
+import re
+
+from bill_structure import PAGE_SCRIPT as BILL_STRUCTURE_SCRIPT, parse_section, strip_designation
+from html_splice import TRACES_DATA_MARKER, anchor_legacy_page, splice
+from service_worker import REGISTER_SCRIPT
+from tracing_db import open_db
+
+# Header keys are compared on their first 30 characters, as the page used to.
+# Shorter headers are looked up whole, so every word-boundary prefix under 30
+# characters is indexed too
+HEADER_PREFIX_LENGTH = 30
+HEADER_KEY_PATTERN = re.compile(r'[^a-z0-9]+')
+# Complete section texts are fetched from here on demand instead of inlined
+FULL_TEXT_DIR = 'ndaa_full_text'
 
 def load_ndaa_bill_data():
-    """Load the NDAA Bill References Excel file with full_text column"""
+    """Load the NDAA Bill References workbook (header/full_text columns) into the tracing store"""
     try:
-        df = pd.read_excel('NDAA_Bill_References_V5_with_text (6).xlsx')
-        print(f"Loaded NDAA Bill data with {len(df)} rows")
-        print(f"Columns: {df.columns.tolist()}")
-        return df
+        db = open_db(sources=('ndaa_sections',))
+        print(f"Loaded NDAA Bill data with {db.counts().get('ndaa_sections', 0)} rows")
+        return db
     except Exception as e:
         print(f"Error loading NDAA Bill data: {e}")
         return None
 
-def extract_section_number(header):
-    """Extract section number from header text"""
-    # Look for patterns like "Sec. 101", "SEC. 101", "Section 101"
-    patterns = [
-        r'SEC?\.\s*(\d+)',
-        r'Section\s+(\d+)',
-        r'Sec\s+(\d+)'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, header, re.IGNORECASE)
-        if match:
-            return int(match.group(1))
-    return None
-
-def create_section_mapping(df):
-    """Create mapping from section numbers to full_text content"""
-    section_mapping = {}
-    
-    for _, row in df.iterrows():
-        header = str(row.get('header', ''))
-        full_text = str(row.get('full_text', ''))
-        section_index = row.get('section_index', '')
-        
-        # Extract section number from header
-        section_num = extract_section_number(header)
-        
-        if section_num and full_text and full_text != 'nan':
-            # Clean up the full_text for display
-            clean_text = full_text.strip()
-            if len(clean_text) > 500:
-                # Truncate very long text but keep it meaningful
-                clean_text = clean_text[:500] + "..."
-            
-            section_mapping[section_num] = {
-                'header': header,
-                'full_text': clean_text,
-                'section_index': section_index
-            }
-            print(f"Mapped Section {section_num}: {header[:50]}...")
+def create_section_mapping(db):
+    """Create mapping from section designations ("101", "101A") to full_text content"""
+    section_mapping = db.ndaa_section_mapping()
+    
+    for section_num, data in section_mapping.items():
+        print(f"Mapped Section {section_num}: {data['header'][:50]}...")
     
     print(f"Created mapping for {len(section_mapping)} sections")
     return section_mapping
 
+def write_full_text_fragments(section_mapping, directory=FULL_TEXT_DIR):
+    """Write each section's complete text to its own fetchable file.
+
+    Returns the mapping to inline in the page: headers and fragment sizes
+    only, so page size no longer grows with the bill text.
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Remove fragments from a previous build so dropped sections disappear
+    for name in os.listdir(directory):
+        if name.endswith('.txt'):
+            os.remove(os.path.join(directory, name))
+    
+    inline_mapping = {}
+    total_bytes = 0
+    for designation, data in section_mapping.items():
+        encoded = data['full_text'].encode('utf-8')
+        # Named by the full designation, so "SEC. 101A" never overwrites "SEC. 101"
+        with open(os.path.join(directory, f"{designation}.txt"), 'wb') as f:
+            f.write(encoded)
+        total_bytes += len(encoded)
+        inline_mapping[designation] = {
+            'header': data['header'],
+            'section_index': data['section_index'],
+            'length': len(data['full_text'])
+        }
+    
+    print(f"Wrote {len(section_mapping)} full-text fragments ({total_bytes / 1024:.1f} KB) to {directory}/")
+    return inline_mapping
+
+def normalize_header_key(header):
+    """Lower-case alphanumeric words of a header (same as normalizeHeaderKey in the page)"""
+    return HEADER_KEY_PATTERN.sub(' ', str(header).lower()).strip()
+
+def header_prefixes(key):
+    """The prefixes a shorter or longer trace header can be looked up by: the first
+    HEADER_PREFIX_LENGTH characters, and each whole-word prefix shorter than that"""
+    prefixes = [key[:index] for index, char in enumerate(key[:HEADER_PREFIX_LENGTH]) if char == ' ']
+    prefixes.append(key[:HEADER_PREFIX_LENGTH])
+    return prefixes
+
+def build_header_index(section_mapping):
+    """Precompute exact and prefix lookups from normalized headers to section designations"""
+    exact = {}
+    prefix = {}
+    
+    for section_num, data in section_mapping.items():
+        header_key = normalize_header_key(data['header'])
+        # Title without the leading "SEC. 123." designation
+        title_key = normalize_header_key(strip_designation(data['header']))
+        
+        for key in (header_key, title_key):
+            if key:
+                exact.setdefault(key, section_num)
+                for key_prefix in header_prefixes(key):
+                    prefix.setdefault(key_prefix, section_num)
+    
+    print(f"Indexed {len(exact)} normalized headers and {len(prefix)} header prefixes")
+    return {'exact': exact, 'prefix': prefix}
+
+def lookup_section_by_header(header, header_index):
+    """Resolve a header without a section number through the header index"""
+    header_key = normalize_header_key(header)
+    section_num = header_index['exact'].get(header_key)
+    if section_num is None:
+        section_num = header_index['prefix'].get(header_key[:HEADER_PREFIX_LENGTH])
+    return section_num
+
+def extract_traces_data(content):
+    """Decode the tracesData array embedded in a generated page"""
+    start = content.find(TRACES_DATA_MARKER)
+    if start == -1:
+        return []
+    try:
+        traces, _ = json.JSONDecoder().raw_decode(content, start + len(TRACES_DATA_MARKER))
+    except json.JSONDecodeError as e:
+        print(f"Could not decode tracesData: {e}")
+        return []
+    return traces
+
+def report_unmatched_traces(traces, section_mapping, header_index):
+    """Report traces whose diff note will find no section content"""
+    unmatched = []
+    
+    for trace in traces:
+        header = str(trace.get('section_header', ''))
+        # Same parser the page's updateDiffNote uses
+        designation = parse_section(header)
+        if designation:
+            section_num = designation.designation
+        else:
+            section_num = lookup_section_by_header(header, header_index)
+        
+        if section_num is None or section_num not in section_mapping:
+            unmatched.append((trace.get('trace_id', '?'), header, section_num))
+    
+    print(f"{len(traces) - len(unmatched)} of {len(traces)} traces resolve to section full text")
+    if unmatched:
+        print(f"⚠️  {len(unmatched)} traces will show no section content:")
+        for trace_id, header, section_num in unmatched:
+            reason = f"no mapping for Section {section_num}" if section_num is not None else "no header match"
+            print(f"   {trace_id}: {header[:60]} ({reason})")
+    return unmatched
+
 def update_html_with_dynamic_diff_note(input_file, output_file, section_mapping):
     """Update HTML to use dynamic diff-note content"""
     with open(input_file, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # First, embed the section mapping data in the JavaScript
-    mapping_js = f"const sectionFullTextMapping = {json.dumps(section_mapping, indent=2)};"
+    # Pages from older generators get their injection anchors added once
+    content = anchor_legacy_page(content)
+    
+    header_index = build_header_index(section_mapping)
+    report_unmatched_traces(extract_traces_data(content), section_mapping, header_index)
+    inline_mapping = write_full_text_fragments(section_mapping)
     
-    # Find where to insert the mapping data (after tracesData declaration)
-    traces_pattern = r'(let tracesData = \[.*?\];)'
-    if re.search(traces_pattern, content, re.DOTALL):
-        content = re.sub(
-            traces_pattern,
-            r'\1\n\n        // Section full text mapping from NDAA_Bill xlsx\n        ' + mapping_js,
-            content,
-            flags=re.DOTALL
-        )
+    # First, embed the section headers and header index in the JavaScript;
+    # full texts stay in their fragment files until a modal asks for them
+    mapping_js = (
+        f"const sectionFullTextMapping = {json.dumps(inline_mapping, indent=2)};\n"
+        f"        const sectionHeaderIndex = {json.dumps(header_index)};\n"
+        f"        const HEADER_PREFIX_LENGTH = {HEADER_PREFIX_LENGTH};\n"
+        f"        const FULL_TEXT_DIR = {json.dumps(FULL_TEXT_DIR)};"
+    )
     
     # Replace the static diff-note with a dynamic one
-    old_diff_note = r'<div class="diff-note">\s*<strong>Compare:</strong>[^<]*</div>'
     new_diff_note = '''<div class="diff-note" id="dynamic-diff-note">
-                    <strong>Section Content:</strong> <span id="section-full-text">Loading section content...</span>
+                    <strong>Section Content:</strong> <span id="section-full-text" style="display: block; max-height: 300px; overflow-y: auto; white-space: pre-wrap;">Loading section content...</span>
                 </div>'''
     
-    content = re.sub(old_diff_note, new_diff_note, content, flags=re.DOTALL)
-    
     # Update the openTraceModal function to populate the diff-note
-    open_modal_pattern = r'(function openTraceModal\(trace\) \{[^}]*?)(\s*document\.getElementById\(\'trace-modal\'\)\.classList\.add\(\'active\'\);)'
-    
     update_diff_note_code = '''
             // Update diff-note with section-specific content
-            updateDiffNote(trace);
-'''
-    
-    content = re.sub(
-        open_modal_pattern,
-        r'\1' + update_diff_note_code + r'\2',
-        content,
-        flags=re.DOTALL
-    )
+            updateDiffNote(trace);'''
     
     # Add the updateDiffNote function
     update_function = '''
@@ -106,45 +177,80 @@ def update_html_with_dynamic_diff_note(input_file, output_file, section_mapping)
             const diffNoteElement = document.getElementById('section-full-text');
             if (!diffNoteElement) return;
             
-            // Extract section number from trace header
-            const sectionPattern = new RegExp('SEC?\\\\\.\\\\s+(\\\\d+)', 'i');
-            const sectionMatch = trace.section_header.match(sectionPattern);
+            // Extract section number from trace header (shared bill_structure.py pattern)
+            const sectionMatch = parseSectionDesignation(trace.section_header);
             if (sectionMatch) {
-                const sectionNum = parseInt(sectionMatch[1]);
+                const sectionNum = sectionMatch.designation;
                 const sectionData = sectionFullTextMapping[sectionNum];
                 
-                if (sectionData && sectionData.full_text) {
-                    diffNoteElement.textContent = sectionData.full_text;
+                if (sectionData) {
+                    showSectionFullText(diffNoteElement, trace, sectionNum);
                 } else {
                     diffNoteElement.textContent = "No detailed content available for Section " + sectionNum + ".";
                 }
             } else {
-                // If no section number found, try to match by header
-                const headerText = trace.section_header.toLowerCase();
-                let foundContent = null;
-                
-                for (const [sectionNum, data] of Object.entries(sectionFullTextMapping)) {
-                    if (data.header.toLowerCase().includes(headerText.substring(0, 30))) {
-                        foundContent = data.full_text;
-                        break;
-                    }
+                // If no section number found, look the header up in the precomputed index
+                const headerKey = normalizeHeaderKey(trace.section_header);
+                let sectionNum = sectionHeaderIndex.exact[headerKey];
+                if (sectionNum === undefined) {
+                    sectionNum = sectionHeaderIndex.prefix[headerKey.substring(0, HEADER_PREFIX_LENGTH)];
                 }
+                const sectionData = sectionNum === undefined ? null : sectionFullTextMapping[sectionNum];
                 
-                if (foundContent) {
-                    diffNoteElement.textContent = foundContent;
+                if (sectionData) {
+                    showSectionFullText(diffNoteElement, trace, sectionNum);
                 } else {
                     diffNoteElement.textContent = "This shows the referenced source text compared with the final NDAA H.R. 5009 ENR text.";
                 }
             }
         }
+        
+        function normalizeHeaderKey(header) {
+            return String(header).toLowerCase().replace(/[^a-z0-9]+/g, ' ').trim();
+        }
+        
+        // Fetched section texts, shared by every modal that shows them
+        const sectionFullTextCache = {};
+        let diffNoteTrace = null;
+        
+        function loadSectionFullText(sectionNum) {
+            if (!sectionFullTextCache[sectionNum]) {
+                sectionFullTextCache[sectionNum] = fetch(FULL_TEXT_DIR + '/' + sectionNum + '.txt')
+                    .then(response => {
+                        if (!response.ok) throw new Error('HTTP ' + response.status);
+                        return response.text();
+                    })
+                    .catch(error => {
+                        delete sectionFullTextCache[sectionNum];
+                        throw error;
+                    });
+            }
+            return sectionFullTextCache[sectionNum];
+        }
+        
+        function showSectionFullText(diffNoteElement, trace, sectionNum) {
+            diffNoteTrace = trace;
+            diffNoteElement.textContent = "Loading section content...";
+            loadSectionFullText(sectionNum)
+                .then(text => {
+                    // Ignore responses for a modal that has since changed
+                    if (diffNoteTrace === trace) diffNoteElement.textContent = text;
+                })
+                .catch(() => {
+                    if (diffNoteTrace === trace) {
+                        diffNoteElement.textContent = "Could not load content for Section " + sectionNum + ".";
+                    }
+                });
+        }
 '''
     
-    # Insert the function before the closing script tag
-    content = re.sub(
-        r'(\s*</script>\s*</body>)',
-        update_function + r'\1',
-        content
-    )
+    # Splice every payload in at the page's anchors in a single pass
+    content = splice(content, {
+        'after-traces-data': '\n\n        // Section full text mapping from NDAA_Bill xlsx\n        ' + mapping_js,
+        'diff-note': new_diff_note,
+        'open-trace-modal': update_diff_note_code,
+        'scripts-end': BILL_STRUCTURE_SCRIPT + update_function + REGISTER_SCRIPT
+    })
     
     # Write the updated content
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -154,12 +260,13 @@ def update_html_with_dynamic_diff_note(input_file, output_file, section_mapping)
 
 def main():
     # Load the NDAA Bill data
-    df = load_ndaa_bill_data()
-    if df is None:
+    db = load_ndaa_bill_data()
+    if db is None:
         return
     
     # Create section mapping
-    section_mapping = create_section_mapping(df)
+    with db:
+        section_mapping = create_section_mapping(db)
     
     if not section_mapping:
         print("No section mapping created. Check the data structure.")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Load Test
+Simulated concurrent viewers against a preview server, reporting latency percentiles and throughput
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+# What a viewer fetches when opening the site
+DEFAULT_PATHS = (
+    '/content_focused_diff_website.html',
+    '/static/content_focused.css',
+    '/static/content_focused.js',
+)
+
+
+class Connection:
+    """One client connection, reused across requests while the server keeps it alive"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, path):
+        """GET path and return (status, body bytes)"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f'GET {path} HTTP/1.1\r\nHost: {self.host}\r\nAccept-Encoding: gzip\r\n\r\n'.encode())
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        status = int(status_line.split(' ', 2)[1])
+        headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            # HTTP/1.0-style response: body runs to the end of the connection
+            body = await self.reader.read()
+        connection = headers.get('connection', '').lower()
+        if status_line.startswith('HTTP/1.0'):
+            keep_alive = connection == 'keep-alive'
+        else:
+            keep_alive = connection != 'close'
+        if not keep_alive or 'content-length' not in headers:
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self.reader = self.writer = None
+
+
+async def simulated_client(host, port, paths, requests, latencies, errors, timeout):
+    connection = Connection(host, port)
+    try:
+        for index in range(requests):
+            path = paths[index % len(paths)]
+            start = time.perf_counter()
+            try:
+                status, _ = await asyncio.wait_for(connection.get(path), timeout)
+            except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                errors.append(f"{path}: {e.__class__.__name__}")
+                await connection.close()
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(f"{path}: HTTP {status}")
+    finally:
+        await connection.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(host, port, clients, requests, paths, timeout):
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(simulated_client(host, port, paths, requests, latencies, errors, timeout)
+                           for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    return sorted(latencies), errors, elapsed
+
+
+def wait_for_port(host, port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def spawn_server(kind, root, port):
+    """Start a server in a child process so it does not share the clients' event loop"""
+    if kind == 'async':
+        command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'async_server.py'),
+                   '--root', root, '--port', str(port)]
+    else:
+        command = [sys.executable, '-m', 'http.server', str(port), '--directory', root]
+    return subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main(argv=None):
+    """Run N simulated viewers and report p50/p99 latency and throughput"""
+    parser = argparse.ArgumentParser(description="Load-test a preview server with simulated concurrent viewers")
+    parser.add_argument('--url', default='http://localhost:8016',
+                        help="server to test (default: http://localhost:8016)")
+    parser.add_argument('--spawn', choices=['async', 'simple'],
+                        help="start this server on the --url port for the duration of the test")
+    parser.add_argument('--root', default='.', help="site directory for --spawn (default: current directory)")
+    parser.add_argument('--clients', type=int, default=200, help="concurrent simulated clients (default: 200)")
+    parser.add_argument('--requests', type=int, default=20, help="requests per client (default: 20)")
+    parser.add_argument('--timeout', type=float, default=10.0,
+                        help="seconds before a request counts as failed (default: 10)")
+    parser.add_argument('--path', action='append', dest='paths',
+                        help="path to request (repeatable; default: the page and its static assets)")
+    args = parser.parse_args(argv)
+
+    url = urlsplit(args.url)
+    host, port = url.hostname or 'localhost', url.port or 80
+    paths = args.paths or list(DEFAULT_PATHS)
+
+    process = spawn_server(args.spawn, args.root, port) if args.spawn else None
+    try:
+        if not wait_for_port(host, port):
+            print(f"❌ No server listening on {host}:{port}")
+            return 1
+
+        print(f"🔥 {args.clients} clients × {args.requests} requests against {args.url}"
+              + (f" ({args.spawn} server)" if args.spawn else ""))
+        latencies, errors, elapsed = asyncio.run(run_load(host, port, args.clients, args.requests, paths,
+                                                               args.timeout))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print(f"   ✅ {len(latencies)} responses in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)")
+    print(f"   ⏱️  p50 {percentile(latencies, 0.50) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, "
+          f"max {(latencies[-1] if latencies else 0) * 1000:.1f} ms")
+    if errors:
+        print(f"   ⚠️  {len(errors)} errors, e.g. {errors[0]}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Page Templates
+Precompiled page skeletons with named slots, streamed straight to the output file
+"""
+
+import io
+import os
+import re
+import shutil
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Slots are written {{ name }}; everything else in a skeleton is literal text,
+# so CSS and JS braces need no escaping
+SLOT_PATTERN = re.compile(r'\{\{ (\w+) \}\}')
+
+_templates = {}
+
+
+class Template:
+    """A skeleton split once into literal text and slot names"""
+
+    __slots__ = ('name', 'segments', 'slots')
+
+    def __init__(self, source, name='<string>'):
+        self.name = name
+        parts = SLOT_PATTERN.split(source)
+        # Even positions are literal text, odd positions are slot names
+        self.segments = tuple((index % 2 == 1, part) for index, part in enumerate(parts) if part)
+        self.slots = frozenset(parts[1::2])
+
+    def render_to(self, fh, **values):
+        """Write the page to an open file, piece by piece.
+
+        A slot value is either a string or an iterable of strings (e.g. a
+        generator), so large payloads are never joined into one document.
+        """
+        missing = sorted(self.slots - set(values))
+        if missing:
+            raise KeyError(f"Template {self.name} is missing slots: {', '.join(missing)}")
+
+        for is_slot, text in self.segments:
+            if not is_slot:
+                fh.write(text)
+                continue
+            value = values[text]
+            if isinstance(value, str):
+                fh.write(value)
+            else:
+                for piece in value:
+                    fh.write(piece)
+
+    def render(self, **values):
+        """Render to a string (for small pages and comparisons)"""
+        buffer = io.StringIO()
+        self.render_to(buffer, **values)
+        return buffer.getvalue()
+
+
+def load_template(name):
+    """Return the compiled skeleton for templates/<name>, reparsing only when the file changes"""
+    path = os.path.join(TEMPLATE_DIR, name)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _templates.get(name)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'r', encoding='utf-8') as f:
+            cached = _templates[name] = (mtime, Template(f.read(), name))
+    return cached[1]
+
+
+def publish_static_assets(output_dir='.'):
+    """Make sure static/ sits next to pages written outside the repository"""
+    target_dir = os.path.join(output_dir, 'static')
+    if os.path.realpath(target_dir) == os.path.realpath(STATIC_DIR):
+        return
+    os.makedirs(target_dir, exist_ok=True)
+    for filename in os.listdir(STATIC_DIR):
+        source = os.path.join(STATIC_DIR, filename)
+        target = os.path.join(target_dir, filename)
+        if not os.path.exists(target) or os.stat(target).st_mtime < os.stat(source).st_mtime:
+            shutil.copy2(source, target)
+
+
+def write_page(path, template_name, **values):
+    """Stream a template to path and publish the static assets it links to"""
+    template = load_template(template_name)
+    with open(path, 'w', encoding='utf-8') as f:
+        template.render_to(f, **values)
+    publish_static_assets(os.path.dirname(path) or '.')
+
+
+def main():
+    """Compare the old whole-document build with streamed template output"""
+    import time
+    import tracemalloc
+
+    from content_focused_diff_website import load_ih_to_rh_traces
+    from diff_engine import attach_precomputed_diffs
+    from trace_store import iter_traces_json, traces_json
+
+    traces = load_ih_to_rh_traces()
+    attach_precomputed_diffs(traces)
+    template = load_template('content_focused_diff_website.html')
+    output = os.devnull
+
+    def inline_build():
+        # Previous approach: one f-string holding CSS, JS and data, then one write
+        with open(os.path.join(STATIC_DIR, 'content_focused.css'), encoding='utf-8') as f:
+            css = f.read()
+        with open(os.path.join(STATIC_DIR, 'content_focused.js'), encoding='utf-8') as f:
+            js = f.read()
+        page = template.render(prerendered_cards='', traces_api='null', traces_data=traces_json(traces))
+        page = page.replace('<link href="static/content_focused.css" rel="stylesheet">', f'<style>\n{css}</style>')
+        page = page.replace('<script src="static/content_focused.js"></script>', f'<script>\n{js}</script>')
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(page)
+        return len(page)
+
+    def streamed_build():
+        with open(output, 'w', encoding='utf-8') as f:
+            template.render_to(f, prerendered_cards='', traces_api='null', traces_data=iter_traces_json(traces))
+
+    print(f"\n📊 Page generation for {len(traces)} traces:")
+    for label, build in (('whole-document f-string', inline_build), ('streamed template', streamed_build)):
+        build()
+        runs = 20
+        start = time.perf_counter()
+        for _ in range(runs):
+            build()
+        elapsed = (time.perf_counter() - start) / runs
+        tracemalloc.start()
+        build()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"   {label:<25} {elapsed * 1000:7.2f} ms, peak {peak / 1024:8.1f} KB")
+
+    static_size = sum(os.path.getsize(os.path.join(STATIC_DIR, name)) for name in os.listdir(STATIC_DIR))
+    print(f"   📦 {static_size / 1024:.1f} KB of CSS/JS now served from static/ and cached across builds")
+
+
+if __name__ == "__main__":
+    main()
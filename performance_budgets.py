@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Performance Budgets
+Measures the generated artifacts and stage times against performance_budgets.json; exits non-zero over budget
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+from build_cache import CACHE_DIR
+
+BUDGET_FILE = 'performance_budgets.json'
+# Seconds each stage took on its last run, written by hr5009.py
+TIMINGS_FILE = os.path.join(CACHE_DIR, 'stage_times.json')
+# Measured per artifact, in the units the budget file uses
+METRICS = ('raw_kb', 'gzip_kb', 'json_kb', 'nodes')
+DATA_ASSIGNMENT = re.compile(r'\b(?:const|let|var)\s+\w+\s*=\s*(?=[\[{])')
+SCRIPT_BLOCK = re.compile(r'<script\b[^>]*>.*?</script>', re.S | re.I)
+START_TAG = re.compile(r'<[a-zA-Z]')
+
+
+def embedded_json_size(text):
+    """Characters of JSON literals assigned in the page's scripts (tracesData, amendmentsData, ...)"""
+    decoder = json.JSONDecoder()
+    size = 0
+    position = 0
+    while True:
+        match = DATA_ASSIGNMENT.search(text, position)
+        if match is None:
+            return size
+        try:
+            _, end = decoder.raw_decode(text, match.end())
+        except ValueError:
+            # A JS object literal, not data
+            position = match.end()
+            continue
+        size += end - match.end()
+        position = end
+
+
+def node_count(text):
+    """Elements in the static markup (scripts excluded); cards the scripts render are not counted"""
+    return len(START_TAG.findall(SCRIPT_BLOCK.sub('', text)))
+
+
+def measure_file(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    measurement = {'raw_kb': len(data) / 1024, 'gzip_kb': len(gzip.compress(data, compresslevel=6)) / 1024,
+                   'json_kb': 0, 'nodes': 0}
+    if path.endswith('.json'):
+        measurement['json_kb'] = measurement['raw_kb']
+    elif path.endswith(('.html', '.js')):
+        text = data.decode('utf-8', errors='replace')
+        measurement['json_kb'] = embedded_json_size(text) / 1024
+        if path.endswith('.html'):
+            measurement['nodes'] = node_count(text)
+    return measurement
+
+
+def measure(path):
+    """Metrics of a file, or the totals of a directory's files (each is served on its own); None if not built"""
+    if os.path.isfile(path):
+        return measure_file(path)
+    if not os.path.isdir(path):
+        return None
+    totals = dict.fromkeys(METRICS, 0)
+    for name in sorted(os.listdir(path)):
+        if os.path.isfile(os.path.join(path, name)):
+            for metric, value in measure_file(os.path.join(path, name)).items():
+                totals[metric] += value
+    return totals
+
+
+def load_json(path, default=None):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def record_stage_time(stage, seconds, cached=False):
+    """Keep the duration of a stage's last run for the budget check"""
+    timings = load_json(TIMINGS_FILE, {})
+    timings[stage] = {'seconds': round(seconds, 3), 'cached': cached, 'recorded': time.time()}
+    os.makedirs(os.path.dirname(TIMINGS_FILE), exist_ok=True)
+    with open(TIMINGS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(timings, f, indent=1)
+
+
+def check_budgets(budgets, root='.', timings=None):
+    """(rows, skipped) where each row is (subject, metric, value, limit); a row is over when value > limit"""
+    rows = []
+    skipped = []
+    for artifact, limits in budgets.get('artifacts', {}).items():
+        measurement = measure(os.path.join(root, artifact))
+        if measurement is None:
+            skipped.append(f'{artifact}: not built')
+            continue
+        rows.extend((artifact, metric, measurement[metric], limits[metric]) for metric in METRICS if metric in limits)
+    for stage, limits in budgets.get('stages', {}).items():
+        timing = (timings or {}).get(stage)
+        if timing is None:
+            skipped.append(f'{stage} stage: no recorded run')
+        else:
+            rows.append((f'{stage} stage', 'seconds', timing['seconds'], limits['seconds']))
+    return rows, skipped
+
+
+def format_report(rows, skipped):
+    width = max([len('artifact / stage')] + [len(row[0]) for row in rows])
+    lines = [f"{'':2} {'artifact / stage':<{width}} {'metric':<8} {'actual':>10} {'budget':>10}"]
+    for subject, metric, value, limit in rows:
+        mark = '❌' if value > limit else '✅'
+        lines.append(f"{mark} {subject:<{width}} {metric:<8} {value:>10.1f} {limit:>10.1f}"
+                     + (f"  (+{(value - limit) * 100 / limit:.0f}%)" if value > limit and limit else ''))
+    lines.extend(f"⏭️  {reason}, skipped" for reason in skipped)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    """Check every generated artifact and stage time against the budget file; returns the exit code"""
+    parser = argparse.ArgumentParser(description="Check generated artifacts and stage times against their budgets")
+    parser.add_argument('--budgets', default=BUDGET_FILE, help=f"budget file (default: {BUDGET_FILE})")
+    parser.add_argument('--root', default='.', help="directory holding the generated site (default: .)")
+    args = parser.parse_args(argv)
+
+    budgets = load_json(args.budgets)
+    if budgets is None:
+        print(f"❌ No budgets: could not read {args.budgets}")
+        return 2
+    rows, skipped = check_budgets(budgets, args.root, load_json(TIMINGS_FILE, {}))
+    print(format_report(rows, skipped))
+
+    over = [row for row in rows if row[2] > row[3]]
+    if over:
+        print(f"\n❌ {len(over)} of {len(rows)} budgets exceeded; raise the limit in {args.budgets} "
+              f"only if the growth is intended")
+        return 1
+    print(f"\n✅ All {len(rows)} budgets met")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Provenance
+Structured provenance records (source type, amendment, sponsor, section) shared by the enhancement stages
+"""
+
+import json
+import re
+from collections import namedtuple
+
+from html_splice import find_marked
+
+RECORDS_FILE = 'provenance_records.json'
+HOUSE_RDS = 'house_rds'
+ORIGINAL_AMENDMENT = 'original_amendment'
+
+# "Original Amendment Sec. 55 proposed by Rep. Smith" references in the source page,
+# matched only where their opening tag occurs
+ORIGINAL_AMENDMENT_MARKER = '<span class="source-indicator source-original-amendment">'
+ORIGINAL_AMENDMENT_SPAN = re.compile(
+    r'<span class="source-indicator source-original-amendment">Original Amendment Sec\. (\d+) proposed by (.+?)</span>')
+
+# One piece of provenance: where a section's text came from. details holds
+# the source-specific fields the badges and details pages render
+ProvenanceRecord = namedtuple('ProvenanceRecord',
+                              ['source_type', 'amendment_number', 'sponsor', 'section_number', 'details'])
+
+
+def collect_provenance(db, source_html):
+    """Records for every House RDS match and Original Amendment reference.
+
+    House RDS records come from the tracing store. Original Amendment
+    references exist only in the source page; they are read at the
+    occurrences of their span's opening tag, not by a regex over the
+    page (the first reference per number wins). Cross-match details are
+    attached when the store has them.
+    """
+    records = []
+    for designation, mapping_info in db.house_rds_mapping().items():
+        records.append(ProvenanceRecord(HOUSE_RDS, mapping_info['amendment_number'], mapping_info['sponsors'],
+                                        designation, mapping_info))
+
+    cross_matches = db.original_amendment_lookup()
+    seen = set()
+    for match in find_marked(source_html, ORIGINAL_AMENDMENT_MARKER, ORIGINAL_AMENDMENT_SPAN):
+        number, sponsor = match.groups()
+        if number in seen:
+            continue
+        seen.add(number)
+        details = {'title': f"Original Amendment Sec. {number}"}
+        if number in cross_matches:
+            details['source_section_title'] = cross_matches[number]['source_section_title']
+            details['similarity_score'] = cross_matches[number]['similarity_score']
+        records.append(ProvenanceRecord(ORIGINAL_AMENDMENT, number, sponsor, number, details))
+    return records
+
+
+def write_provenance(records, path=RECORDS_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump([record._asdict() for record in records], f, indent=1)
+
+
+def load_provenance(path=RECORDS_FILE):
+    with open(path, encoding='utf-8') as f:
+        return [ProvenanceRecord(**record) for record in json.load(f)]
+
+
+class ProvenanceIndex:
+    """Keyed lookups over provenance records"""
+
+    def __init__(self, records):
+        self.records = list(records)
+        self._by_key = {}
+        for record in self.records:
+            self._by_key.setdefault((record.source_type, record.section_number), record)
+
+    def lookup(self, source_type, section_number):
+        """The record for a source type and section number, or None"""
+        return self._by_key.get((source_type, section_number))
+
+    def of_type(self, source_type):
+        return [record for record in self.records if record.source_type == source_type]
+
+    def house_rds_mapping(self):
+        """House RDS section designation ("101A") -> matched amendment details"""
+        return {record.section_number: record.details for record in self.of_type(HOUSE_RDS)}
+
+    def original_amendments(self):
+        """Original amendment number -> badge and details-page fields"""
+        return {record.amendment_number: {'amendment_number': record.amendment_number,
+                                          'section_number': record.section_number,
+                                          'sponsor': record.sponsor,
+                                          'title': record.details['title']}
+                for record in self.of_type(ORIGINAL_AMENDMENT)}
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Provenance Graph
+Amendments, sponsors, bill sections across stages and IH→RH traces as one graph of adjacency arrays
+"""
+
+import argparse
+import json
+import os
+from array import array
+from collections import deque
+
+from bill_structure import BillStructure, default_title, parse_section, roman_to_int, strip_designation
+from provenance import HOUSE_RDS, RECORDS_FILE, load_provenance
+from trace_store import StringPool
+
+GRAPH_FILE = 'provenance_graph.json'
+GRAPH_SOURCES = ('ih_sections', 'rh_sections', 'title_matches', 'ndaa_sections')
+# Bill stages in legislative order; section-to-section edges only point forward
+STAGES = ('IH', 'RH', 'RDS', 'NDAA')
+# House vote results that mean the amendment was adopted
+ADOPTED_RESULTS = ('agreed', 'adopted')
+MISSING_SPONSORS = ('', 'nan', 'None', 'Unknown')
+
+SPONSOR = 'sponsor'
+AMENDMENT = 'amendment'
+SECTION = 'section'
+TRACE = 'trace'
+
+
+def node_key(kind, *parts):
+    """Interned key of a node: 'sponsor:Rep. Smith', 'amendment:house:12', 'section:RH:501A', 'trace:ih_rh_3'"""
+    return ':'.join((kind,) + tuple(str(part) for part in parts))
+
+
+def title_key(header):
+    """Bare section title for matching one section across stages"""
+    return ' '.join(strip_designation(header).lower().rstrip('.').split())
+
+
+def _csr(count, edges):
+    """(offsets, targets) adjacency arrays: node n's neighbours are targets[offsets[n]:offsets[n + 1]]"""
+    edges = sorted(set(edges))
+    offsets = array('I', bytes(4 * (count + 1)))
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for node in range(count):
+        offsets[node + 1] += offsets[node]
+    return offsets, array('I', (target for _, target in edges))
+
+
+class ProvenanceGraph:
+    """Directed provenance graph over interned node ids, stored as CSR adjacency arrays.
+
+    Edges run sponsor → amendment → section, from a section to the same
+    section in the next later stage that has it, and IH section → trace →
+    RH section. Reverse adjacency is built alongside, so both directions
+    are slice lookups.
+    """
+
+    def __init__(self, keys, edges, titles=None, adopted=()):
+        self.nodes = StringPool()
+        for key in keys:
+            self.nodes.add(key)
+        # Section node -> title number, and the reverse for title queries
+        self.titles = dict(titles or {})
+        self.adopted = frozenset(adopted)
+        edges = list(edges)
+        self.offsets, self.targets = _csr(len(self.nodes), edges)
+        self.reverse_offsets, self.reverse_targets = _csr(len(self.nodes), [(b, a) for a, b in edges])
+        self.by_title = {}
+        for node, title in self.titles.items():
+            self.by_title.setdefault(title, []).append(node)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def node(self, key):
+        """Id of a node key, or None"""
+        return self.nodes.get(key)
+
+    def kind(self, node):
+        return self.nodes[node].split(':', 1)[0]
+
+    def successors(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def predecessors(self, node):
+        return self.reverse_targets[self.reverse_offsets[node]:self.reverse_offsets[node + 1]]
+
+    def reachable(self, node):
+        """Every node reachable from node along edges, in breadth-first order"""
+        seen = {node}
+        queue = deque([node])
+        order = []
+        while queue:
+            for successor in self.successors(queue.popleft()):
+                if successor not in seen:
+                    seen.add(successor)
+                    order.append(successor)
+                    queue.append(successor)
+        return order
+
+    def passed_through(self, key):
+        """Stage -> section designations a sponsor's or amendment's text reached, in stage order"""
+        start = self.node(key)
+        if start is None:
+            return {}
+        stages = {}
+        for node in self.reachable(start):
+            key = self.nodes[node]
+            if key.startswith(SECTION + ':'):
+                _, stage, designation = key.split(':', 2)
+                stages.setdefault(stage, []).append(designation)
+        return {stage: stages[stage] for stage in STAGES if stage in stages}
+
+    def sponsor_stages(self, sponsor):
+        return self.passed_through(node_key(SPONSOR, sponsor))
+
+    def adopted_amendments_in_title(self, title, stage=None):
+        """Keys of adopted amendments touching any section of a title (int or roman numeral)"""
+        if isinstance(title, str):
+            title = roman_to_int(title.upper())
+        found = set()
+        for section in self.by_title.get(title, ()):
+            if stage is not None and not self.nodes[section].startswith(node_key(SECTION, stage, '')):
+                continue
+            found.update(node for node in self.predecessors(section) if node in self.adopted)
+        return sorted(self.nodes[node] for node in found)
+
+    def to_page_data(self):
+        """Compact form for the site: node keys plus forward adjacency arrays (the page rebuilds the reverse)"""
+        return {
+            'nodes': [self.nodes[node] for node in range(len(self.nodes))],
+            'offsets': self.offsets.tolist(),
+            'targets': self.targets.tolist(),
+            'titles': sorted([node, title] for node, title in self.titles.items()),
+            'adopted': sorted(self.adopted),
+        }
+
+    @classmethod
+    def from_page_data(cls, data):
+        offsets = data['offsets']
+        edges = [(node, target) for node in range(len(data['nodes']))
+                 for target in data['targets'][offsets[node]:offsets[node + 1]]]
+        return cls(data['nodes'], edges, {node: title for node, title in data['titles']}, data['adopted'])
+
+
+def build_provenance_graph(db, records, traces):
+    """Link the tracing store's bill sections, the provenance records and the IH→RH traces"""
+    keys = StringPool()
+    edges = []
+    titles = {}
+    adopted = set()
+    # Per stage: bare title -> section node, for cross-stage edges
+    by_title_key = {stage: {} for stage in STAGES}
+
+    def section(stage, designation, title, header=''):
+        node = keys.add(node_key(SECTION, stage, designation))
+        titles.setdefault(node, title)
+        if header:
+            by_title_key[stage].setdefault(title_key(header), node)
+        return node
+
+    for stage, bill in (('IH', 'IH'), ('RH', 'RH'), ('NDAA', 'ndaa')):
+        for entry in BillStructure(db.section_headers(bill)).sections:
+            section(stage, entry.designation, entry.title, entry.header)
+
+    for record in records:
+        if record.source_type == HOUSE_RDS:
+            amendment = keys.add(node_key(AMENDMENT, 'house', record.amendment_number))
+            parsed = parse_section(record.section_number)
+            target = (section('RDS', parsed.designation, default_title(parsed.number),
+                              record.details.get('matched_bill_section_title', '')) if parsed else None)
+            if str(record.details.get('agreed_or_not', '')).lower().startswith(ADOPTED_RESULTS):
+                adopted.add(amendment)
+        else:
+            amendment = keys.add(node_key(AMENDMENT, 'original', record.amendment_number))
+            # Original amendments are identified by their text in the enacted bill
+            adopted.add(amendment)
+            parsed = parse_section(record.details.get('source_section_title', ''))
+            target = section('NDAA', parsed.designation, default_title(parsed.number)) if parsed else None
+        if target is not None:
+            edges.append((amendment, target))
+        if str(record.sponsor) not in MISSING_SPONSORS:
+            edges.append((keys.add(node_key(SPONSOR, record.sponsor)), amendment))
+
+    for trace in traces:
+        trace_node = keys.add(node_key(TRACE, trace['trace_id']))
+        ih = parse_section(trace['ih_section']['title'])
+        rh = parse_section(trace['rh_section']['title'])
+        if ih:
+            edges.append((section('IH', ih.designation, default_title(ih.number)), trace_node))
+        if rh:
+            edges.append((trace_node, section('RH', rh.designation, default_title(rh.number))))
+
+    for position, stage in enumerate(STAGES):
+        for key, source in by_title_key[stage].items():
+            later = next((by_title_key[other][key] for other in STAGES[position + 1:]
+                          if key in by_title_key[other]), None)
+            if key and later is not None:
+                edges.append((source, later))
+
+    return ProvenanceGraph((keys[node] for node in range(len(keys))), edges, titles, adopted)
+
+
+def write_graph(graph, path=GRAPH_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(graph.to_page_data(), f, separators=(',', ':'))
+
+
+def load_graph(path=GRAPH_FILE):
+    with open(path, encoding='utf-8') as f:
+        return ProvenanceGraph.from_page_data(json.load(f))
+
+
+def main(argv=None):
+    """Build provenance_graph.json and answer queries against it"""
+    parser = argparse.ArgumentParser(description="Build the amendment/sponsor/section/trace provenance graph")
+    parser.add_argument('--output', default=GRAPH_FILE, help=f"graph file to write (default: {GRAPH_FILE})")
+    parser.add_argument('--title', help="list adopted amendments touching a title (e.g. V or 5)")
+    parser.add_argument('--sponsor', help="list every stage a sponsor's text passed through")
+    args = parser.parse_args(argv)
+
+    from content_focused_diff_website import load_ih_to_rh_traces
+    from tracing_db import open_db
+
+    if os.path.exists(RECORDS_FILE):
+        records = load_provenance(RECORDS_FILE)
+    else:
+        print(f"⚠️  {RECORDS_FILE} not found (run the layout stage first); building without amendments")
+        records = []
+    traces = load_ih_to_rh_traces()
+    with open_db(sources=GRAPH_SOURCES) as db:
+        graph = build_provenance_graph(db, records, traces)
+    write_graph(graph, args.output)
+
+    kinds = {}
+    for node in range(len(graph)):
+        kinds[graph.kind(node)] = kinds.get(graph.kind(node), 0) + 1
+    print(f"\n🕸️  {len(graph)} nodes ({', '.join(f'{count} {kind}s' for kind, count in sorted(kinds.items()))}), "
+          f"{graph.edge_count()} edges")
+    print(f"📄 Output file: {args.output} ({os.path.getsize(args.output) / 1024:.1f} KB)")
+
+    if args.title:
+        title = int(args.title) if args.title.isdigit() else args.title
+        amendments = graph.adopted_amendments_in_title(title)
+        print(f"\n📜 {len(amendments)} adopted amendments touch title {args.title}")
+        for key in amendments:
+            print(f"   {key.split(':', 1)[1]}")
+    if args.sponsor:
+        stages = graph.sponsor_stages(args.sponsor)
+        print(f"\n👤 {args.sponsor}: " + (' → '.join(f"{stage} Sec. {', '.join(designations)}"
+                                                   for stage, designations in stages.items()) or "no sections"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Section Matcher
+TF-IDF matching of House amendments to bill sections, written as header_match_results_high_quality.xlsx
+"""
+
+import argparse
+import re
+import time
+from collections import Counter
+
+import numpy as np
+
+from bill_structure import section_designation, strip_designation
+from tracing_db import open_db
+
+OUTPUT_FILE = 'header_match_results_high_quality.xlsx'
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset("""
+    a an and are as at be by for from in into is it its of on or such that the this to under with
+    sec section shall may any other each which
+""".split())
+# Title similarity dominates; amendment text breaks ties between similarly titled sections
+TITLE_WEIGHT = 0.7
+# Terms in more than this share of sections carry no signal and would blow up the products
+MAX_DOCUMENT_FREQUENCY = 0.5
+MIN_DOCUMENTS_FOR_MAX_DF = 20
+# Amendments scored per matrix product; bounds the dense score block to BATCH_SIZE × sections
+BATCH_SIZE = 512
+DEFAULT_TOP_K = 5
+DEFAULT_MIN_SCORE = 0.5
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+
+class TfidfIndex:
+    """L2-normalised TF-IDF vectors for a corpus, stored by term (CSC) for batched sparse products"""
+
+    def __init__(self, documents):
+        tokenized = [Counter(tokenize(document)) for document in documents]
+        self.size = len(documents)
+        document_frequency = Counter(term for counts in tokenized for term in counts)
+        max_df = self.size * MAX_DOCUMENT_FREQUENCY if self.size >= MIN_DOCUMENTS_FOR_MAX_DF else self.size
+        terms = sorted(term for term, df in document_frequency.items() if df <= max_df)
+        self.vocabulary = {term: index for index, term in enumerate(terms)}
+        df = np.array([document_frequency[term] for term in terms], dtype=np.float64)
+        self.idf = np.log((self.size + 1) / (df + 1)) + 1
+
+        rows, columns, weights = self._coo(tokenized)
+        # Sort postings by term so each term's documents are one contiguous slice
+        order = np.argsort(columns, kind='stable')
+        self.documents = rows[order]
+        self.weights = weights[order]
+        self.indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=len(terms)), out=self.indptr[1:])
+
+    def _coo(self, tokenized):
+        """(row, term, weight) arrays with sublinear tf, idf and per-row L2 normalisation"""
+        rows, columns, counts = [], [], []
+        for row, term_counts in enumerate(tokenized):
+            for term, count in term_counts.items():
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    counts.append(count)
+        rows = np.array(rows, dtype=np.int64)
+        columns = np.array(columns, dtype=np.int64)
+        weights = (1 + np.log(np.array(counts, dtype=np.float64))) * self.idf[columns]
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=len(tokenized)))
+        if len(rows):
+            weights /= norms[rows]
+        return rows, columns, weights
+
+    def vectorize(self, documents):
+        """Query vectors in the index's vocabulary, as COO arrays"""
+        return self._coo([Counter(tokenize(document)) for document in documents])
+
+    def scores(self, queries, count):
+        """Dense (count × corpus) cosine similarities for COO query vectors.
+
+        A sparse × sparse product in NumPy: every query nonzero is joined
+        with its term's postings, and the products are summed per
+        (query, document) cell with one bincount.
+        """
+        rows, columns, weights = queries
+        starts = self.indptr[columns]
+        lengths = self.indptr[columns + 1] - starts
+        total = int(lengths.sum())
+        if not total:
+            return np.zeros((count, self.size))
+        nonzero = np.repeat(np.arange(len(columns)), lengths)
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        postings = starts[nonzero] + offsets
+        cells = rows[nonzero] * self.size + self.documents[postings]
+        products = weights[nonzero] * self.weights[postings]
+        return np.bincount(cells, weights=products, minlength=count * self.size).reshape(count, self.size)
+
+
+def _batch(queries, start, stop):
+    rows, columns, weights = queries
+    selected = (rows >= start) & (rows < stop)
+    return rows[selected] - start, columns[selected], weights[selected]
+
+
+def match_amendments(amendments, sections, top_k=DEFAULT_TOP_K, title_weight=TITLE_WEIGHT, batch_size=BATCH_SIZE):
+    """Top-k (section index, score) candidates for each amendment.
+
+    amendments and sections are lists of (title, text). Titles and texts
+    are scored separately and blended; amendments without text are scored
+    on their title alone.
+    """
+    title_index = TfidfIndex([title for title, _ in sections])
+    text_index = TfidfIndex([text for _, text in sections])
+    title_queries = title_index.vectorize([title for title, _ in amendments])
+    text_queries = text_index.vectorize([text for _, text in amendments])
+    has_text = np.bincount(text_queries[0], minlength=len(amendments)) > 0
+    top_k = min(top_k, len(sections))
+
+    candidates = []
+    for start in range(0, len(amendments), batch_size):
+        stop = min(start + batch_size, len(amendments))
+        count = stop - start
+        weight = np.where(has_text[start:stop], title_weight, 1.0)[:, None]
+        scores = (weight * title_index.scores(_batch(title_queries, start, stop), count)
+                  + (1 - weight) * text_index.scores(_batch(text_queries, start, stop), count))
+        best = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(scores, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind='stable')
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        candidates.extend([(int(section), float(score)) for section, score in zip(row, row_scores) if score > 0]
+                          for row, row_scores in zip(best, best_scores))
+    return candidates
+
+
+def _text(value):
+    return '' if value in ('nan', 'None') else value
+
+
+def load_targets(db, target):
+    """(section designation, title, text) for the bill sections amendments are matched against.
+
+    Designations keep their letter suffix, so a match against "SEC. 101A" is written as 101A, not 101.
+    """
+    if target == 'ndaa':
+        return [(designation, strip_designation(section['header']), section['full_text'])
+                for designation, section in db.ndaa_section_mapping().items()]
+    return [(section_designation(title), strip_designation(title), body)
+            for _, title, body in db.sections(target) if section_designation(title) is not None]
+
+
+def build_match_rows(amendments, targets, candidates, min_score=DEFAULT_MIN_SCORE):
+    """Rows for the Matched sheet (best candidate at or above min_score) and the Candidates sheet"""
+    matched, candidate_rows = [], []
+    for amendment, amendment_candidates in zip(amendments, candidates):
+        for rank, (section, score) in enumerate(amendment_candidates, 1):
+            designation, title, _ = targets[section]
+            candidate_rows.append({'amendment_number': amendment['amendment_number'], 'rank': rank,
+                                   'hml_section_title': amendment['hml_section_title'],
+                                   'matched_bill_section_number': f'SEC. {designation}.',
+                                   'matched_bill_section_title': title, 'similarity_score': round(score, 4)})
+        if amendment_candidates and amendment_candidates[0][1] >= min_score:
+            section, score = amendment_candidates[0]
+            designation, title, _ = targets[section]
+            # Same columns as the externally produced sheet; vote details are not known to the matcher
+            matched.append({'hml_section_title': amendment['hml_section_title'],
+                            'matched_bill_section_number': f'SEC. {designation}.',
+                            'matched_bill_section_title': title,
+                            'similarity_score': round(score, 4),
+                            'amendment_number': amendment['amendment_number'],
+                            'Sponsors': amendment['sponsor'],
+                            'vote_type': '', 'yea': '', 'nay': '', 'agrred_or_not': ''})
+    return matched, candidate_rows
+
+
+def write_match_results(path, matched, candidate_rows):
+    import pandas as pd
+
+    columns = ['hml_section_title', 'matched_bill_section_number', 'matched_bill_section_title', 'similarity_score',
+               'amendment_number', 'Sponsors', 'vote_type', 'yea', 'nay', 'agrred_or_not']
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(matched, columns=columns).to_excel(writer, sheet_name='Matched', index=False)
+        pd.DataFrame(candidate_rows).to_excel(writer, sheet_name='Candidates', index=False)
+
+
+def main(argv=None):
+    """Match amendments to bill sections and write the header match workbook"""
+    parser = argparse.ArgumentParser(description="Match House amendments to bill sections with TF-IDF")
+    parser.add_argument('--target', choices=['ndaa', 'RH', 'IH'], default='ndaa',
+                        help="bill sections to match against (default: ndaa, the NDAA bill workbook)")
+    parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K,
+                        help=f"candidates kept per amendment (default: {DEFAULT_TOP_K})")
+    parser.add_argument('--min-score', type=float, default=DEFAULT_MIN_SCORE,
+                        help=f"similarity needed for the Matched sheet (default: {DEFAULT_MIN_SCORE})")
+    parser.add_argument('--output', default=OUTPUT_FILE, help=f"workbook to write (default: {OUTPUT_FILE})")
+    args = parser.parse_args(argv)
+
+    target_source = 'ndaa_sections' if args.target == 'ndaa' else f'{args.target.lower()}_sections'
+    with open_db(sources=('house_amendments', target_source)) as db:
+        amendments = db.amendments()
+        targets = load_targets(db, args.target)
+    if not amendments or not targets:
+        print(f"❌ Nothing to match: {len(amendments)} amendments, {len(targets)} {args.target} sections")
+        return
+
+    print(f"🔍 Matching {len(amendments)} amendments against {len(targets)} {args.target} sections")
+    start = time.perf_counter()
+    candidates = match_amendments([(_text(a['hml_section_title']), _text(a['hml_full_content'])) for a in amendments],
+                                  [(title, text) for _, title, text in targets], args.top_k)
+    elapsed = time.perf_counter() - start
+    matched, candidate_rows = build_match_rows(amendments, targets, candidates, args.min_score)
+    write_match_results(args.output, matched, candidate_rows)
+
+    print(f"✅ {len(matched)} of {len(amendments)} amendments matched at ≥{args.min_score} in {elapsed * 1000:.0f} ms")
+    print(f"📄 Output file: {args.output} (Matched and Candidates sheets)")
+
+
+if __name__ == "__main__":
+    main()
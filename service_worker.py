@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Service Worker
+Writes sw.js: a build-hash-versioned offline cache of the published site's pages, shards and data
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+
+from build_cache import file_hash
+from page_templates import write_page
+
+SERVICE_WORKER_FILE = 'sw.js'
+# Files published with the site, relative to its root
+SITE_PATTERNS = ('*.html', 'static/*', 'ndaa_full_text/*', 'provenance_graph.json')
+# Local reports that are never published
+EXCLUDED_FILES = ('build_delta.html',)
+# Registration for generated pages that do not load the shared static scripts.
+# Skipped on the preview servers, whose API-mode and live-reload pages must never come from a cache
+REGISTER_SCRIPT = '''
+        if ('serviceWorker' in navigator && !['localhost', '127.0.0.1', '[::1]'].includes(location.hostname)) {
+            navigator.serviceWorker.register('sw.js')
+                .catch(error => console.warn('Service worker not registered:', error));
+        }
+'''
+
+
+def site_files(root='.'):
+    """Site path -> short content hash, for every published file under root"""
+    files = {}
+    for pattern in SITE_PATTERNS:
+        for path in glob.glob(os.path.join(root, pattern)):
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            if os.path.isfile(path) and relative not in EXCLUDED_FILES:
+                files[relative] = file_hash(path)[:12]
+    return dict(sorted(files.items()))
+
+
+def build_hash(files):
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def write_service_worker(root='.'):
+    """Write sw.js for the site under root; returns (build hash, site files)"""
+    files = site_files(root)
+    version = build_hash(files)
+    write_page(os.path.join(root, SERVICE_WORKER_FILE), 'service_worker.js', build_hash=version,
+               site_files=json.dumps(files, indent=1))
+    return version, files
+
+
+def main(argv=None):
+    """Regenerate sw.js for the current site files"""
+    parser = argparse.ArgumentParser(description="Write the site's service worker (sw.js)")
+    parser.add_argument('--root', default='.', help="site directory (default: current directory)")
+    args = parser.parse_args(argv)
+
+    version, files = write_service_worker(args.root)
+    print(f"📴 {SERVICE_WORKER_FILE}: build {version}, {len(files)} cached files")
+
+
+if __name__ == "__main__":
+    main()
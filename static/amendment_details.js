@@ -0,0 +1,126 @@
+// Amendment details page behaviour. amendmentsData is defined inline by each
+// generated page; the page's body class picks the House or Original layout.
+
+function getUrlParameter(name) {
+    const urlParams = new URLSearchParams(window.location.search);
+    return urlParams.get(name);
+}
+
+function renderHouseAmendment(amendment, amendmentNumber) {
+    let sponsorsSection = '';
+    if (amendment.sponsors && amendment.sponsors !== 'Unknown' && amendment.sponsors !== '') {
+        sponsorsSection = `
+            <div class="info-section">
+                <div class="info-label">Sponsors:</div>
+                <div>${amendment.sponsors}</div>
+            </div>
+        `;
+    }
+    
+    let voteSection = '';
+    if (amendment.vote_type && amendment.vote_type !== '') {
+        voteSection = `
+            <div class="info-section">
+                <div class="info-label">Vote Information:</div>
+                <div><strong>Type:</strong> ${amendment.vote_type}</div>
+                <div><strong>Yea:</strong> ${amendment.yea || 'N/A'}, <strong>Nay:</strong> ${amendment.nay || 'N/A'}</div>
+                <div><strong>Result:</strong> ${amendment.agreed_or_not || 'N/A'}</div>
+            </div>
+        `;
+    }
+    
+    let fullTextSection = '';
+    if (amendment.hml_full_content && amendment.hml_full_content !== '') {
+        fullTextSection = `
+            <div class="info-section">
+                <div class="info-label">Full Amendment Text:</div>
+                <div class="full-text">${amendment.hml_full_content}</div>
+            </div>
+        `;
+    }
+    
+    return `
+        <h2><i class="fas fa-file-alt"></i> House Amendment ${amendmentNumber}</h2>
+        
+        <div class="info-section">
+            <div class="info-label">Amendment Title:</div>
+            <div>${amendment.hml_section_title}</div>
+        </div>
+        
+        ${sponsorsSection}
+        ${voteSection}
+        ${fullTextSection}
+    `;
+}
+
+function renderOriginalAmendment(amendment, amendmentNumber) {
+    return `
+        <h2><i class="fas fa-file-alt"></i> Original Amendment Sec. ${amendmentNumber}</h2>
+        
+        <div class="info-section">
+            <div class="info-label">Amendment Section:</div>
+            <div>Section ${amendment.section_number}</div>
+        </div>
+        
+        <div class="info-section">
+            <div class="info-label">Sponsor:</div>
+            <div>${amendment.sponsor}</div>
+        </div>
+        
+        <div class="info-section">
+            <div class="info-label">Amendment Title:</div>
+            <div>${amendment.title}</div>
+        </div>
+        
+        <div class="info-section">
+            <div class="info-label">Description:</div>
+            <div>This section originated from an original Senate amendment proposed by ${amendment.sponsor}.</div>
+        </div>
+    `;
+}
+
+function displayAmendmentDetails() {
+    const isHouse = document.body.classList.contains('theme-house');
+    const amendmentNumber = getUrlParameter('amendment');
+    const detailsContainer = document.getElementById('amendment-details');
+    
+    if (!amendmentNumber || !amendmentsData[amendmentNumber]) {
+        detailsContainer.innerHTML = `
+            <div class="error">
+                <h2>Amendment Not Found</h2>
+                <p>The requested ${isHouse ? 'House' : 'Original'} Amendment ${amendmentNumber || 'N/A'} could not be found.</p>
+            </div>
+        `;
+        return;
+    }
+    
+    const render = isHouse ? renderHouseAmendment : renderOriginalAmendment;
+    detailsContainer.innerHTML = render(amendmentsData[amendmentNumber], amendmentNumber);
+    showProvenancePath(`amendment:${isHouse ? 'house' : 'original'}:${amendmentNumber}`, detailsContainer);
+}
+
+// Stages the amendment's text reached, from the provenance graph; the
+// page works unchanged when the graph file has not been built
+function showProvenancePath(key, container) {
+    if (typeof loadProvenanceGraph !== 'function') return;
+    loadProvenanceGraph().then(graph => {
+        const stages = Object.entries(graph.passedThrough(key));
+        if (!stages.length) return;
+        container.insertAdjacentHTML('beforeend', `
+            <div class="info-section">
+                <div class="info-label">Passed Through:</div>
+                <div>${stages.map(([stage, sections]) => `${stage} Sec. ${sections.join(', ')}`).join(' → ')}</div>
+            </div>
+        `);
+    }).catch(() => {});
+}
+
+// Load amendment details when page loads
+document.addEventListener('DOMContentLoaded', displayAmendmentDetails);
+
+// Offline cache for the published site (sw.js is generated by service_worker.py).
+// Not on the preview servers, whose API-mode and live-reload pages must never come from a cache
+if ('serviceWorker' in navigator && !['localhost', '127.0.0.1', '[::1]'].includes(location.hostname)) {
+    navigator.serviceWorker.register('sw.js')
+        .catch(error => console.warn('Service worker not registered:', error));
+}
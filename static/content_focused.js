@@ -0,0 +1,493 @@
+// Content-focused diff page behaviour. tracesData and TRACES_API are defined
+// inline by each generated page; everything here is shared and cached by the
+// browser. Static builds inline every trace. Pages served in API mode start
+// empty and fetch summaries, search results and full traces from TRACES_API.
+
+// Global variables
+let currentTrace = null;
+let filteredTraces = [];
+let currentFilter = 'all';
+let currentQuery = '';
+let currentSort = { key: 'document', dir: 1 };
+let currentView = 'cards';
+let matchingTraceIds = null;
+const TRACE_PAGE_SIZE = 100;
+// Section bodies of API-mode traces, fetched by byte range
+const SECTION_TEXTS = 'section_texts.bin';
+// Cards appended per animation frame after the prerendered ones are hydrated
+const CARD_BATCH_SIZE = 50;
+// Bumped by every render so stale card batches stop appending
+let renderGeneration = 0;
+
+// Initialize
+document.addEventListener('DOMContentLoaded', function() {
+    filteredTraces = tracesData;
+    console.log('Loaded IH→RH traces:', tracesData.length);
+    hydrateTraces();
+    setupEventListeners();
+    if (TRACES_API) {
+        fetchTracePages('', 0, traces => {
+            tracesData = tracesData.concat(traces);
+            applyView();
+        });
+    }
+});
+
+function setupEventListeners() {
+    document.addEventListener('click', function(e) {
+        if (e.target.classList.contains('trace-modal')) {
+            closeModal();
+        }
+    });
+}
+
+function fetchTracePages(query, offset, onPage) {
+    // Walk the paginated trace listing, handing each page over as it arrives
+    const url = `${TRACES_API}/traces?q=${encodeURIComponent(query)}&offset=${offset}&limit=${TRACE_PAGE_SIZE}`;
+    return fetch(url)
+        .then(response => response.json())
+        .then(page => {
+            onPage(page.traces);
+            const next = page.offset + page.traces.length;
+            if (page.traces.length && next < page.total) {
+                return fetchTracePages(query, next, onPage);
+            }
+        });
+}
+
+function hydrateTraces() {
+    // Static builds prerender the first cards so they paint before tracesData is parsed;
+    // attach their handlers, then append the remaining cards a batch per frame
+    const container = document.getElementById('traces-container');
+    const cards = container.querySelectorAll('.trace-card[data-trace-id]');
+    const matches = cards.length > 0 && cards.length <= filteredTraces.length
+        && Array.from(cards).every((card, index) => card.dataset.traceId === filteredTraces[index].trace_id);
+    if (!matches) {
+        renderTraces();
+        return;
+    }
+    cards.forEach((card, index) => {
+        const trace = filteredTraces[index];
+        card.onclick = () => openTraceModal(trace);
+    });
+    appendCardBatches(container, cards.length, ++renderGeneration);
+}
+
+function appendCardBatches(container, start, generation) {
+    if (generation !== renderGeneration || start >= filteredTraces.length) return;
+    const fragment = document.createDocumentFragment();
+    const end = Math.min(start + CARD_BATCH_SIZE, filteredTraces.length);
+    for (let index = start; index < end; index++) {
+        fragment.appendChild(createTraceCard(filteredTraces[index], index));
+    }
+    container.appendChild(fragment);
+    requestAnimationFrame(() => appendCardBatches(container, end, generation));
+}
+
+function renderTraces() {
+    renderGeneration++;
+    if (currentView === 'table') {
+        renderSummaryTable();
+        return;
+    }
+    
+    const container = document.getElementById('traces-container');
+    container.innerHTML = '';
+
+    filteredTraces.forEach((trace, index) => {
+        const card = createTraceCard(trace, index);
+        container.appendChild(card);
+    });
+}
+
+function renderSummaryTable() {
+    const container = document.getElementById('summary-container');
+    const arrow = key => currentSort.key === key ? (currentSort.dir > 0 ? ' ▲' : ' ▼') : '';
+    const rows = filteredTraces.map((trace, index) => `
+        <tr data-index="${index}">
+            <td>${escapeHtml(trace.ih_section.title)}</td>
+            <td class="numeric">${statValue(trace, 'similarity')}%</td>
+            <td class="numeric">${statValue(trace, 'change_volume')}</td>
+            <td class="numeric">${statValue(trace, 'added')}</td>
+            <td class="numeric">${statValue(trace, 'removed')}</td>
+            <td class="numeric">${statValue(trace, 'modified')}</td>
+        </tr>
+    `).join('');
+    
+    container.innerHTML = `
+        <table class="summary-table">
+            <thead>
+                <tr>
+                    <th onclick="sortByColumn('document')">Section${arrow('document')}</th>
+                    <th class="numeric" onclick="sortByColumn('similarity')">Similarity${arrow('similarity')}</th>
+                    <th class="numeric" onclick="sortByColumn('change_volume')">Changes${arrow('change_volume')}</th>
+                    <th class="numeric" onclick="sortByColumn('added')">Added${arrow('added')}</th>
+                    <th class="numeric" onclick="sortByColumn('removed')">Removed${arrow('removed')}</th>
+                    <th class="numeric" onclick="sortByColumn('modified')">Modified${arrow('modified')}</th>
+                </tr>
+            </thead>
+            <tbody>${rows}</tbody>
+        </table>
+    `;
+    container.querySelectorAll('tbody tr').forEach(row => {
+        row.onclick = () => openTraceModal(filteredTraces[row.dataset.index]);
+    });
+}
+
+function statValue(trace, key) {
+    // Stats are precomputed for every trace at build time
+    return trace.stats ? (trace.stats[key] || 0) : 0;
+}
+
+function applyView() {
+    let traces = tracesData;
+    
+    if (currentFilter === 'changed') {
+        traces = traces.filter(trace => statValue(trace, 'similarity') < 100);
+    } else if (currentFilter === 'identical') {
+        traces = traces.filter(trace => statValue(trace, 'similarity') === 100);
+    }
+    
+    if (currentQuery && matchingTraceIds) {
+        traces = traces.filter(trace => matchingTraceIds.has(trace.trace_id));
+    } else if (currentQuery && !TRACES_API) {
+        traces = traces.filter(trace => {
+            const title = trace.ih_section.title.toLowerCase();
+            const text = trace.ih_section.text.toLowerCase();
+            return title.includes(currentQuery) || text.includes(currentQuery);
+        });
+    }
+    
+    if (currentSort.key !== 'document') {
+        const { key, dir } = currentSort;
+        traces = traces.slice().sort((a, b) => dir * (statValue(a, key) - statValue(b, key)));
+    } else if (currentSort.dir < 0) {
+        traces = traces.slice().reverse();
+    }
+    
+    filteredTraces = traces;
+    renderTraces();
+}
+
+function sortTraces(value) {
+    const [key, dir] = value.split('-');
+    currentSort = { key: key, dir: dir === 'desc' ? -1 : 1 };
+    applyView();
+}
+
+function sortByColumn(key) {
+    if (currentSort.key === key) {
+        currentSort = { key: key, dir: -currentSort.dir };
+    } else {
+        // Similarity reads best lowest-first; counts highest-first
+        currentSort = { key: key, dir: (key === 'similarity' || key === 'document') ? 1 : -1 };
+    }
+    const select = document.getElementById('sort-select');
+    const value = currentSort.key === 'document' ? 'document' : `${currentSort.key}-${currentSort.dir > 0 ? 'asc' : 'desc'}`;
+    if ([...select.options].some(option => option.value === value)) {
+        select.value = value;
+    }
+    applyView();
+}
+
+function toggleView() {
+    currentView = currentView === 'cards' ? 'table' : 'cards';
+    const showTable = currentView === 'table';
+    document.getElementById('traces-container').style.display = showTable ? 'none' : '';
+    document.getElementById('summary-container').style.display = showTable ? '' : 'none';
+    document.getElementById('view-toggle').innerHTML = showTable
+        ? '<i class="fas fa-th-large"></i> Card View'
+        : '<i class="fas fa-table"></i> Summary Table';
+    renderTraces();
+}
+
+function createTraceCard(trace, index) {
+    const card = document.createElement('div');
+    card.className = 'trace-card';
+    card.style.position = 'relative';
+    card.dataset.traceId = trace.trace_id;
+    card.onclick = () => openTraceModal(trace);
+    
+    const displayTitle = trace.ih_section.title;
+    
+    // Create path indicators (IH → RH only)
+    const pathHtml = `
+        <span class="stage-indicator stage-ih">IH</span>
+        <span class="trace-arrow">→</span>
+        <span class="stage-indicator stage-rh">RH</span>
+        ${trace.stats ? `<span class="similarity-badge">${trace.stats.similarity}% similar</span>` : ''}
+    `;
+    
+    // Get preview text (API summaries carry it precomputed)
+    let preview = trace.preview;
+    if (preview === undefined) {
+        const previewText = trace.ih_section.text;
+        preview = previewText.substring(0, 200) + (previewText.length > 200 ? '...' : '');
+    }
+    
+    card.innerHTML = `
+        <div class="trace-title">${displayTitle}</div>
+        <div class="trace-path">${pathHtml}</div>
+        <div class="trace-preview">${preview}</div>
+    `;
+
+    return card;
+}
+
+function filterTraces(filter) {
+    // Update active button
+    document.querySelectorAll('.filter-btn[onclick^="filterTraces"]').forEach(btn => btn.classList.remove('active'));
+    event.target.classList.add('active');
+    
+    currentFilter = filter;
+    applyView();
+}
+
+function searchTraces(query) {
+    currentQuery = query.trim().toLowerCase();
+    if (!TRACES_API || !currentQuery) {
+        matchingTraceIds = null;
+        applyView();
+        return;
+    }
+    
+    // Section texts stay on the server; ask it which traces match
+    const searchedQuery = currentQuery;
+    const ids = new Set();
+    fetchTracePages(searchedQuery, 0, traces => traces.forEach(trace => ids.add(trace.trace_id)))
+        .then(() => {
+            // Ignore results for a query the user has since changed
+            if (searchedQuery === currentQuery) {
+                matchingTraceIds = ids;
+                applyView();
+            }
+        });
+}
+
+function openTraceModal(trace) {
+    if (TRACES_API && trace.ih_section.text === undefined && !trace.ih_section.text_span) {
+        // Summaries carry no texts or diffs; fetch the full trace once
+        fetch(`${TRACES_API}/trace/${encodeURIComponent(trace.trace_id)}`)
+            .then(response => {
+                if (!response.ok) throw new Error(`Trace ${trace.trace_id}: HTTP ${response.status}`);
+                return response.json();
+            })
+            .then(fullTrace => {
+                Object.assign(trace, fullTrace);
+                openTraceModal(trace);
+            })
+            .catch(error => console.error(error));
+        return;
+    }
+    
+    currentTrace = trace;
+    
+    const displayTitle = trace.ih_section.title;
+    document.getElementById('modal-title').innerHTML = 
+        `<i class="fas fa-shield-alt"></i> ${displayTitle}`;
+    
+    showContentFocusedDiff();
+    document.getElementById('trace-modal').classList.add('active');
+}
+
+function showContentFocusedDiff() {
+    const trace = currentTrace;
+    
+    // Diffs are precomputed at build time; fall back to the browser otherwise
+    if (trace.diff) {
+        renderDiffResult(trace.diff.left_html, trace.diff.right_html, trace.stats, trace.stats.similarity);
+        return;
+    }
+    
+    Promise.all([fetchSectionText(trace.ih_section), fetchSectionText(trace.rh_section)])
+        .then(([leftText, rightText]) => generateContentFocusedDiff(leftText, rightText))
+        .catch(error => console.error(error));
+}
+
+// API-mode traces carry [offset, length] spans into the server's text blob
+// instead of bodies; fetch just those bytes, once per section
+function fetchSectionText(section) {
+    if (section.text !== undefined || !section.text_span) return Promise.resolve(section.text);
+    const [offset, length] = section.text_span;
+    if (!length) return Promise.resolve(section.text = '');
+    return fetch(SECTION_TEXTS, {headers: {Range: `bytes=${offset}-${offset + length - 1}`}})
+        .then(response => {
+            if (!response.ok) throw new Error(`${SECTION_TEXTS}: HTTP ${response.status}`);
+            // A server ignoring Range sends the whole blob
+            return response.arrayBuffer().then(buffer =>
+                response.status === 206 ? buffer : buffer.slice(offset, offset + length));
+        })
+        .then(buffer => section.text = new TextDecoder().decode(buffer));
+}
+
+function normalizeText(text) {
+    // Normalize text for content comparison
+    return text
+        // Normalize whitespace
+        .replace(/\s+/g, ' ')
+        // Normalize punctuation
+        .replace(/\s*([.,:;])\s*/g, '$1 ')
+        // Normalize parentheses and brackets
+        .replace(/\s*([\(\)\[\]])\s*/g, '$1')
+        // Remove extra spaces around dashes
+        .replace(/\s*[-—–]\s*/g, '—')
+        // Normalize quotes
+        .replace(/["'"']/g, '"')
+        // Remove multiple spaces
+        .replace(/\s+/g, ' ')
+        .trim();
+}
+
+function generateContentFocusedDiff(text1, text2) {
+    // Normalize texts for better comparison
+    const normalizedText1 = normalizeText(text1);
+    const normalizedText2 = normalizeText(text2);
+    
+    // Split into semantic chunks (sentences or clauses)
+    const chunks1 = splitIntoSemanticChunks(normalizedText1);
+    const chunks2 = splitIntoSemanticChunks(normalizedText2);
+    
+    // Use content-focused diff algorithm
+    const diffResult = computeContentDiff(chunks1, chunks2);
+    
+    // Calculate stats
+    const totalChunks = Math.max(chunks1.length, chunks2.length);
+    const similarity = totalChunks > 0 ? Math.round((diffResult.stats.unchanged / totalChunks) * 100) : 100;
+    
+    renderDiffResult(diffResult.leftHtml, diffResult.rightHtml, diffResult.stats, similarity);
+}
+
+function renderDiffResult(leftHtml, rightHtml, stats, similarity) {
+    document.getElementById('diff-left-content').innerHTML = leftHtml;
+    document.getElementById('diff-right-content').innerHTML = rightHtml;
+    
+    // Only the ordered alignment mode reports moved content
+    const movedBox = stats.moved === undefined ? '' : `
+        <div class="stat-box stat-moved">
+            <div class="stat-number">${stats.moved}</div>
+            <div class="stat-label">Moved Content</div>
+        </div>`;
+    
+    // Update stats
+    document.getElementById('diff-stats').innerHTML = `
+        <div class="stat-box stat-added">
+            <div class="stat-number">${stats.added}</div>
+            <div class="stat-label">Added Content</div>
+        </div>
+        <div class="stat-box stat-removed">
+            <div class="stat-number">${stats.removed}</div>
+            <div class="stat-label">Removed Content</div>
+        </div>
+        <div class="stat-box stat-unchanged">
+            <div class="stat-number">${stats.unchanged}</div>
+            <div class="stat-label">Unchanged Content</div>
+        </div>${movedBox}
+        <div class="stat-box stat-similarity">
+            <div class="stat-number">${similarity}%</div>
+            <div class="stat-label">Content Similarity</div>
+        </div>
+    `;
+}
+
+function splitIntoSemanticChunks(text) {
+    // Split text into meaningful chunks (clauses, phrases)
+    return text
+        .split(/[.;:]/)
+        .map(chunk => chunk.trim())
+        .filter(chunk => chunk.length > 0);
+}
+
+function computeContentDiff(chunks1, chunks2) {
+    let leftHtml = '';
+    let rightHtml = '';
+    let stats = { added: 0, removed: 0, unchanged: 0 };
+    
+    // Use a similarity-based matching approach
+    const used2 = new Set();
+    
+    for (let i = 0; i < chunks1.length; i++) {
+        const chunk1 = chunks1[i];
+        let bestMatch = -1;
+        let bestSimilarity = 0;
+        
+        // Find best matching chunk in text2
+        for (let j = 0; j < chunks2.length; j++) {
+            if (used2.has(j)) continue;
+            
+            const chunk2 = chunks2[j];
+            const similarity = calculateContentSimilarity(chunk1, chunk2);
+            
+            if (similarity > bestSimilarity && similarity > 0.7) {
+                bestSimilarity = similarity;
+                bestMatch = j;
+            }
+        }
+        
+        if (bestMatch !== -1) {
+            // Found a good match
+            used2.add(bestMatch);
+            const chunk2 = chunks2[bestMatch];
+            
+            if (bestSimilarity > 0.95) {
+                // Very similar - show as unchanged
+                leftHtml += `<span class="content-unchanged">${escapeHtml(chunk1)}.</span> `;
+                rightHtml += `<span class="content-unchanged">${escapeHtml(chunk2)}.</span> `;
+                stats.unchanged++;
+            } else {
+                // Similar but modified
+                leftHtml += `<span class="content-modified">${escapeHtml(chunk1)}.</span> `;
+                rightHtml += `<span class="content-modified">${escapeHtml(chunk2)}.</span> `;
+                stats.unchanged++;
+            }
+        } else {
+            // No match found - removed
+            leftHtml += `<span class="content-removed">${escapeHtml(chunk1)}.</span> `;
+            stats.removed++;
+        }
+    }
+    
+    // Add unmatched chunks from text2 as added
+    for (let j = 0; j < chunks2.length; j++) {
+        if (!used2.has(j)) {
+            rightHtml += `<span class="content-added">${escapeHtml(chunks2[j])}.</span> `;
+            stats.added++;
+        }
+    }
+    
+    return {
+        leftHtml: leftHtml,
+        rightHtml: rightHtml,
+        stats: stats
+    };
+}
+
+function calculateContentSimilarity(text1, text2) {
+    // Simple content similarity based on common words
+    const words1 = text1.toLowerCase().split(/\s+/);
+    const words2 = text2.toLowerCase().split(/\s+/);
+    
+    const set1 = new Set(words1);
+    const set2 = new Set(words2);
+    
+    const intersection = new Set([...set1].filter(x => set2.has(x)));
+    const union = new Set([...set1, ...set2]);
+    
+    return intersection.size / union.size;
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+function closeModal() {
+    document.getElementById('trace-modal').classList.remove('active');
+}
+
+// Offline cache for the published site (sw.js is generated by service_worker.py).
+// Not on the preview servers, whose API-mode and live-reload pages must never come from a cache
+if ('serviceWorker' in navigator && !['localhost', '127.0.0.1', '[::1]'].includes(location.hostname)) {
+    navigator.serviceWorker.register('sw.js')
+        .catch(error => console.warn('Service worker not registered:', error));
+}
@@ -0,0 +1,74 @@
+// Provenance graph queries over provenance_graph.json (written by provenance_graph.py).
+// The file holds interned node keys and forward CSR adjacency arrays; the
+// reverse arrays are rebuilt here once, so every query is slice lookups.
+
+const PROVENANCE_STAGES = ['IH', 'RH', 'RDS', 'NDAA'];
+let provenanceGraphPromise = null;
+
+function loadProvenanceGraph(url = 'provenance_graph.json') {
+    if (!provenanceGraphPromise) {
+        provenanceGraphPromise = fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error(`${url}: ${response.status}`);
+                return response.json();
+            })
+            .then(buildProvenanceGraph);
+    }
+    return provenanceGraphPromise;
+}
+
+function buildProvenanceGraph(data) {
+    const count = data.nodes.length;
+    const ids = new Map(data.nodes.map((key, id) => [key, id]));
+    const reverseOffsets = new Uint32Array(count + 1);
+    data.targets.forEach(target => reverseOffsets[target + 1]++);
+    for (let node = 0; node < count; node++) reverseOffsets[node + 1] += reverseOffsets[node];
+    const reverseTargets = new Uint32Array(data.targets.length);
+    const fill = reverseOffsets.slice(0, count);
+    for (let node = 0; node < count; node++) {
+        for (let edge = data.offsets[node]; edge < data.offsets[node + 1]; edge++) {
+            reverseTargets[fill[data.targets[edge]]++] = node;
+        }
+    }
+    const adopted = new Set(data.adopted);
+    const byTitle = new Map();
+    data.titles.forEach(([node, title]) => {
+        if (!byTitle.has(title)) byTitle.set(title, []);
+        byTitle.get(title).push(node);
+    });
+
+    const successors = node => data.targets.slice(data.offsets[node], data.offsets[node + 1]);
+    const predecessors = node => Array.from(reverseTargets.subarray(reverseOffsets[node], reverseOffsets[node + 1]));
+
+    // Stage -> section designations reachable from a sponsor or amendment key
+    function passedThrough(key) {
+        const start = ids.get(key);
+        if (start === undefined) return {};
+        const seen = new Set([start]);
+        const queue = [start];
+        const stages = {};
+        while (queue.length) {
+            successors(queue.shift()).forEach(node => {
+                if (seen.has(node)) return;
+                seen.add(node);
+                queue.push(node);
+                const section = data.nodes[node].match(/^section:([^:]*):(.*)$/);
+                if (section) (stages[section[1]] = stages[section[1]] || []).push(section[2]);
+            });
+        }
+        const ordered = {};
+        PROVENANCE_STAGES.forEach(stage => { if (stages[stage]) ordered[stage] = stages[stage]; });
+        return ordered;
+    }
+
+    function adoptedAmendmentsInTitle(title, stage = null) {
+        const found = new Set();
+        (byTitle.get(title) || []).forEach(section => {
+            if (stage && !data.nodes[section].startsWith(`section:${stage}:`)) return;
+            predecessors(section).forEach(node => { if (adopted.has(node)) found.add(data.nodes[node]); });
+        });
+        return Array.from(found).sort();
+    }
+
+    return {ids, nodes: data.nodes, successors, predecessors, passedThrough, adoptedAmendmentsInTitle};
+}
@@ -0,0 +1,83 @@
+// Service worker for the published tracing site, generated by service_worker.py.
+// Each build gets its own cache, named after the build hash. Files are cached
+// under their content hash, so installing a new build copies unchanged files
+// from the previous cache and downloads only what changed. Pages are served
+// stale-while-revalidate; everything else is served from the cache first.
+// Caches of superseded builds are deleted once the new worker activates.
+
+const BUILD_HASH = '{{ build_hash }}';
+const CACHE_PREFIX = 'hr5009-';
+const CACHE_NAME = CACHE_PREFIX + BUILD_HASH;
+// Site path (relative to this worker) -> content hash
+const SITE_FILES = {{ site_files }};
+
+const SCOPE = self.registration.scope;
+const SCOPE_PATH = new URL(SCOPE).pathname;
+
+function versionedKey(path) {
+    return new URL(`${path}?v=${SITE_FILES[path]}`, SCOPE).href;
+}
+
+function fetchFresh(path) {
+    return fetch(new URL(path, SCOPE), {cache: 'no-cache'}).then(response => {
+        if (!response.ok) throw new Error(`${path}: HTTP ${response.status}`);
+        return response;
+    });
+}
+
+// A previous build's copy is reused when the content hash is unchanged
+function precache(cache, path) {
+    const key = versionedKey(path);
+    return caches.match(key)
+        .then(cached => cached || fetchFresh(path))
+        .then(response => cache.put(key, response))
+        // Fetched on first use instead
+        .catch(() => {});
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(caches.open(CACHE_NAME)
+        .then(cache => Promise.all(Object.keys(SITE_FILES).map(path => precache(cache, path))))
+        .then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(caches.keys()
+        .then(names => Promise.all(names
+            .filter(name => name.startsWith(CACHE_PREFIX) && name !== CACHE_NAME)
+            .map(name => caches.delete(name))))
+        .then(() => self.clients.claim()));
+});
+
+function cacheFirst(path) {
+    const key = versionedKey(path);
+    return caches.open(CACHE_NAME).then(cache => cache.match(key).then(cached => cached ||
+        fetchFresh(path).then(response => {
+            cache.put(key, response.clone());
+            return response;
+        })));
+}
+
+function staleWhileRevalidate(event, path) {
+    const key = versionedKey(path);
+    return caches.open(CACHE_NAME).then(cache => cache.match(key).then(cached => {
+        const network = fetchFresh(path).then(response => {
+            cache.put(key, response.clone());
+            return response;
+        });
+        if (!cached) return network;
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+    }));
+}
+
+self.addEventListener('fetch', event => {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || url.origin !== self.location.origin || !url.pathname.startsWith(SCOPE_PATH)) {
+        return;
+    }
+    // Query strings (e.g. ?amendment=12) select within a page; the file is the same
+    const path = url.pathname.slice(SCOPE_PATH.length);
+    if (!(path in SITE_FILES)) return;
+    event.respondWith(path.endsWith('.html') ? staleWhileRevalidate(event, path) : cacheFirst(path));
+});
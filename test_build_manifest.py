@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Reuse of stored diffs across delta builds
+"""
+
+from build_manifest import DiffStore, code_version
+from diff_engine import attach_precomputed_diffs
+
+
+def make_traces():
+    return [{'trace_id': 'T1',
+             'ih_section': {'title': 'SEC. 101. Procurement', 'text': 'The Secretary shall buy ships.'},
+             'rh_section': {'title': 'SEC. 101. Procurement', 'text': 'The Secretary shall buy aircraft.'}}]
+
+
+def test_code_version_follows_file_contents(tmp_path):
+    engine = tmp_path / 'diff_engine.py'
+    engine.write_text('ALIGNMENT = 1\n')
+    before = code_version([str(engine)])
+    engine.write_text('ALIGNMENT = 22\n')
+    assert code_version([str(engine)]) != before
+
+
+def test_same_code_reuses_stored_diffs(tmp_path):
+    path = str(tmp_path / 'diff_results.json')
+    DiffStore(path, code='v1').save(attach_precomputed_diffs(make_traces()), 'greedy')
+    assert DiffStore(path, code='v1').reuse('greedy')(make_traces()[0]) is not None
+
+
+def test_code_change_forces_recomputation(tmp_path):
+    path = str(tmp_path / 'diff_results.json')
+    traces = attach_precomputed_diffs(make_traces())
+    stale = dict(traces[0]['diff'], left_html='stale')
+    traces[0]['diff'] = stale
+    DiffStore(path, code='v1').save(traces, 'greedy')
+
+    store = DiffStore(path, code='v2')
+    assert store.reuse('greedy')(make_traces()[0]) is None
+    rebuilt = attach_precomputed_diffs(make_traces(), reuse=store.reuse('greedy'))
+    assert rebuilt[0]['diff']['left_html'] != 'stale'
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Myers edit scripts and moved-chunk classification of the ordered alignment
+"""
+
+import difflib
+import random
+
+from diff_engine import compute_ordered_content_diff, myers_diff
+
+CHUNKS = [
+    'The Secretary of Defense shall submit a report on shipbuilding',
+    'Funds are authorized for the procurement of aircraft',
+    'The program shall terminate five years after enactment',
+    'Each military department shall designate a senior official',
+]
+
+
+def lcs_length(a, b):
+    previous = [0] * (len(b) + 1)
+    for token in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if token == other else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+def difflib_edits(a, b):
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return len(a) + len(b) - 2 * sum(block.size for block in matcher.get_matching_blocks())
+
+
+def test_myers_edit_scripts_are_correct_and_minimal():
+    rng = random.Random(5009)
+    for _ in range(300):
+        a = [rng.choice('abcde') for _ in range(rng.randint(0, 40))]
+        b = [rng.choice('abcde') for _ in range(rng.randint(0, 40))]
+        ops = myers_diff(a, b)
+        assert [token for op, token in ops if op != '+'] == a
+        assert [token for op, token in ops if op != '-'] == b
+        edits = sum(op != '=' for op, _ in ops)
+        assert edits == len(a) + len(b) - 2 * lcs_length(a, b)
+        assert edits <= difflib_edits(a, b)
+
+
+def test_myers_handles_empty_and_identical_sequences():
+    assert myers_diff([], []) == []
+    assert myers_diff(['x'], []) == [('-', 'x')]
+    assert myers_diff([], ['y']) == [('+', 'y')]
+    assert myers_diff(['x', 'y'], ['x', 'y']) == [('=', 'x'), ('=', 'y')]
+
+
+def test_chunk_out_of_order_is_moved():
+    diff = compute_ordered_content_diff(CHUNKS, CHUNKS[1:] + CHUNKS[:1])
+    assert diff['stats']['moved'] == 1
+    assert diff['stats']['unchanged'] == 3
+    assert diff['stats']['added'] == diff['stats']['removed'] == 0
+    assert diff['left_html'].count('content-moved') == diff['right_html'].count('content-moved') == 1
+    assert diff['left_html'].startswith(f'<span class="content-moved">{CHUNKS[0]}.</span>')
+
+
+def test_reworded_chunk_out_of_order_is_moved_with_word_changes():
+    reworded = CHUNKS[0].replace('shipbuilding', 'ships')
+    diff = compute_ordered_content_diff(CHUNKS, CHUNKS[1:] + [reworded])
+    assert diff['stats']['moved'] == 1
+    assert 'word-removed' in diff['left_html'] and 'word-added' in diff['right_html']
+
+
+def test_chunks_in_order_are_not_moved():
+    diff = compute_ordered_content_diff(CHUNKS, CHUNKS[:2] + ['A new requirement'] + CHUNKS[2:])
+    assert diff['stats']['moved'] == 0
+    assert diff['stats']['added'] == 1
+    assert 'content-moved' not in diff['left_html'] + diff['right_html']
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Anchors added to legacy pages and splicing at them
+"""
+
+import re
+
+import pytest
+
+from html_splice import (ACTIVATE_MODAL_MARKER, anchor_legacy_page, find_anchors, html_anchor, js_anchor,
+                         replace_marked, splice)
+
+LEGACY_PAGE = """<html><body>
+    <div class="diff-note">Static note</div>
+    <script>
+        let tracesData = [{"trace_id": "T1", "note": "function openTraceModal(trace) { };"}];
+        function openTraceModal(trace) {
+            document.getElementById('modal-title').textContent = trace.trace_id;
+            document.getElementById('trace-modal').classList.add('active');
+        }
+    </script>
+</body></html>"""
+ANCHORS = ('after-traces-data', 'open-trace-modal', 'diff-note', 'scripts-end', 'body-end')
+
+
+def test_legacy_page_gets_each_anchor_once():
+    page = anchor_legacy_page(LEGACY_PAGE)
+    assert set(find_anchors(page)) == set(ANCHORS)
+    for name in ANCHORS:
+        assert len(re.findall(rf'@(?:anchor|begin):{name} ', page)) == 1
+    assert anchor_legacy_page(page) == page
+
+
+def test_open_trace_modal_anchor_goes_before_the_activate_line():
+    page = anchor_legacy_page(LEGACY_PAGE)
+    assert anchor_legacy_page(LEGACY_PAGE) == page
+    anchor = page.index(js_anchor('open-trace-modal'))
+    # The marker text inside tracesData does not move it: the anchor sits just before the activate line
+    assert page.index('let tracesData') < page.index('];') < anchor < page.index(ACTIVATE_MODAL_MARKER)
+    assert page[anchor:page.index(ACTIVATE_MODAL_MARKER)].strip() == js_anchor('open-trace-modal')
+
+
+def test_open_trace_modal_anchor_needs_the_activate_line():
+    page = anchor_legacy_page(LEGACY_PAGE.replace(ACTIVATE_MODAL_MARKER, ''))
+    assert 'open-trace-modal' not in find_anchors(page)
+
+
+def test_each_payload_is_spliced_exactly_once():
+    page = anchor_legacy_page(LEGACY_PAGE)
+    payloads = {'open-trace-modal': 'updateDiffNote(trace);', 'body-end': '<script>late();</script>',
+                'diff-note': '<div id="dynamic-diff-note"></div>'}
+    result = splice(page, payloads)
+    for payload in payloads.values():
+        assert result.count(payload) == 1
+    assert 'Static note' not in result
+    assert set(find_anchors(result)) == set(ANCHORS)
+    assert result.index(js_anchor('open-trace-modal')) < result.index('updateDiffNote(trace);')
+    assert result.index('<script>late();</script>') < result.index('</body>')
+
+
+def test_splicing_a_missing_anchor_fails():
+    with pytest.raises(KeyError, match='open-trace-modal'):
+        splice(f'<body>{html_anchor("body-end")}</body>', {'open-trace-modal': 'x();'})
+
+
+def test_replace_marked_only_matches_at_markers():
+    pattern = re.compile(r'Sec\. (\d+)</b>')
+    content = '<b>Sec. 1</b> Sec. 2 <b>Sec. 3</b>'
+    assert replace_marked(content, 'Sec.', pattern, lambda match: f'#{match.group(1)}') == '<b>#1 Sec. 2 <b>#3'
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Header index lookups of the dynamic diff note fallback
+"""
+
+from integrate_ndaa_bill_full_text import build_header_index, lookup_section_by_header
+
+SECTION_MAPPING = {
+    '101': {'header': 'SEC. 101. Authorization of appropriations for procurement'},
+    '723': {'header': 'SEC. 723. Pilot program on things for the armed forces'},
+}
+
+
+def test_long_header_matches_on_first_characters():
+    index = build_header_index(SECTION_MAPPING)
+    assert lookup_section_by_header('Pilot program on things for the Navy', index) == '723'
+
+
+def test_short_header_matches_a_longer_mapping_header():
+    index = build_header_index(SECTION_MAPPING)
+    assert lookup_section_by_header('Pilot program', index) == '723'
+    assert lookup_section_by_header('SEC. 101. Authorization', index) == '101'
+
+
+def test_unrelated_header_has_no_section():
+    index = build_header_index(SECTION_MAPPING)
+    assert lookup_section_by_header('Military construction', index) is None
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Range headers for the section text blob, and the blob writer's temporary file
+"""
+
+import os
+
+import pytest
+
+from text_blob import TextBlob, TextBlobWriter, parse_range
+
+
+def test_closed_range_is_clipped_to_the_file():
+    assert parse_range('bytes=2-5', 10) == (2, 4)
+    assert parse_range('bytes=8-100', 10) == (8, 2)
+
+
+def test_open_ended_range_runs_to_the_end():
+    assert parse_range('bytes=7-', 10) == (7, 3)
+
+
+def test_suffix_range_is_the_last_bytes():
+    assert parse_range('bytes=-4', 10) == (6, 4)
+    assert parse_range('bytes=-40', 10) == (0, 10)
+
+
+@pytest.mark.parametrize('header', ['bytes=10-', 'bytes=12-20', 'bytes=5-2', 'bytes=-0'])
+def test_unsatisfiable_range_is_rejected(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 10)
+
+
+@pytest.mark.parametrize('header', [None, '', 'items=0-5', 'bytes=0-1,4-5', 'bytes=-', 'bytes=5', 'bytes=a-b',
+                                    'bytes=--3'])
+def test_other_headers_get_the_whole_file(header):
+    assert parse_range(header, 10) is None
+
+
+def test_writer_stores_identical_texts_once(tmp_path):
+    path, index_path = str(tmp_path / 'texts.bin'), str(tmp_path / 'texts.json')
+    writer = TextBlobWriter(path, index_path)
+    assert writer.add('RH:1', 'Sec. 101') == writer.add('IH:1', 'Sec. 101')
+    writer.add('RH:2', 'Sec. 102 §')
+    blob = writer.close()
+    assert blob.text('RH:2') == 'Sec. 102 §'
+    assert TextBlob(path, index_path).text('IH:1') == 'Sec. 101'
+    assert not os.path.exists(path + '.tmp')
+
+
+def test_failed_load_removes_the_temporary_file(tmp_path):
+    path, index_path = str(tmp_path / 'texts.bin'), str(tmp_path / 'texts.json')
+    with TextBlobWriter(path, index_path) as writer:
+        writer.add('RH:1', 'previous build')
+    previous = writer.close()
+
+    with pytest.raises(RuntimeError):
+        with TextBlobWriter(path, index_path) as writer:
+            writer.add('RH:1', 'half-loaded build')
+            assert os.path.exists(path + '.tmp')
+            raise RuntimeError('workbook failed to load')
+    assert not os.path.exists(path + '.tmp')
+    assert previous.text('RH:1') == 'previous build'
+    assert TextBlob(path, index_path).text('RH:1') == 'previous build'
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Range requests for the section text blob served by the API handler
+"""
+
+import http.client
+import http.server
+import threading
+
+import pytest
+
+from text_blob import BLOB_FILE, TextBlobWriter
+from trace_api import TraceAPI, make_api_handler
+
+BLOB_TEXT = 'SEC. 101. Authorization of appropriations.'
+
+
+@pytest.fixture
+def server(tmp_path):
+    writer = TextBlobWriter(str(tmp_path / BLOB_FILE), str(tmp_path / 'section_texts.json'))
+    writer.add('RH:0', BLOB_TEXT)
+    api = TraceAPI([], db_path=str(tmp_path / 'missing.db'))
+    api.blob = writer.close()
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), make_api_handler(api))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get_blob(port, range_header=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    connection.request('GET', '/' + BLOB_FILE, headers={'Range': range_header} if range_header else {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_whole_blob_without_range(server):
+    response, body = get_blob(server)
+    assert response.status == 200
+    assert body == BLOB_TEXT.encode('utf-8')
+    assert response.getheader('Accept-Ranges') == 'bytes'
+
+
+@pytest.mark.parametrize('header, start, end', [('bytes=0-3', 0, 3), ('bytes=10-', 10, len(BLOB_TEXT) - 1),
+                                                ('bytes=-12', len(BLOB_TEXT) - 12, len(BLOB_TEXT) - 1)])
+def test_range_gets_its_slice(server, header, start, end):
+    response, body = get_blob(server, header)
+    assert response.status == 206
+    assert body == BLOB_TEXT[start:end + 1].encode('utf-8')
+    assert response.getheader('Content-Range') == f'bytes {start}-{end}/{len(BLOB_TEXT)}'
+
+
+def test_unsatisfiable_range_is_416(server):
+    response, body = get_blob(server, f'bytes={len(BLOB_TEXT)}-')
+    assert response.status == 416
+    assert body == b''
+    assert response.getheader('Content-Range') == f'bytes */{len(BLOB_TEXT)}'
+
+
+def test_multiple_ranges_get_the_whole_blob(server):
+    response, body = get_blob(server, 'bytes=0-1,5-6')
+    assert response.status == 200
+    assert body == BLOB_TEXT.encode('utf-8')
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Text Blob
+Section bodies written once to an append-only blob file with an offset/length index, read back through mmap
+"""
+
+import argparse
+import json
+import mmap
+import os
+
+BLOB_FILE = 'section_texts.bin'
+INDEX_FILE = 'section_texts.json'
+
+
+def raw_key(stage, row_index):
+    return f'{stage}:{row_index}'
+
+
+def normalized_key(stage, row_index):
+    return f'{stage}:{row_index}:normalized'
+
+
+class TextBlobWriter:
+    """Appends UTF-8 texts to a blob file as they arrive; identical texts are stored once.
+
+    The file is written under a temporary name and renamed into place by
+    close(), so readers holding the previous blob mapped keep a complete
+    file. The temporary file is opened on the first write; used as a
+    context manager, the writer removes it again if loading fails.
+    """
+
+    def __init__(self, path=BLOB_FILE, index_path=INDEX_FILE):
+        self.path = path
+        self.index_path = index_path
+        self._file = None
+        self._size = 0
+        self._spans = {}
+        self.index = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is not None:
+            self.abort()
+
+    def append(self, text):
+        """(offset, length) of text in the blob, writing it if it is new"""
+        span = self._spans.get(text)
+        if span is None:
+            encoded = text.encode('utf-8')
+            span = self._spans[text] = (self._size, len(encoded))
+            if self._file is None:
+                self._file = open(self.path + '.tmp', 'wb')
+            self._file.write(encoded)
+            self._size += len(encoded)
+        return span
+
+    def add(self, key, text):
+        """Append text and record its span under key in the index"""
+        span = self.index[key] = self.append(text)
+        return span
+
+    def close(self):
+        """Finish the blob and its index; returns a TextBlob mapping it"""
+        if self._file is None:
+            # Nothing was written; still replace the previous build's blob
+            self._file = open(self.path + '.tmp', 'wb')
+        self._file.close()
+        self._file = None
+        self._spans = {}
+        os.replace(self.path + '.tmp', self.path)
+        with open(self.index_path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'blob': os.path.basename(self.path), 'size': self._size, 'texts': self.index}, f,
+                      separators=(',', ':'))
+        os.replace(self.index_path + '.tmp', self.index_path)
+        return TextBlob(self.path, self.index_path)
+
+    def abort(self):
+        """Close and delete the unfinished blob, leaving the previous build's in place"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self.path + '.tmp')
+        self._spans = {}
+
+
+class TextBlob:
+    """Read-only mmap of a blob file. Slices are memoryviews into the mapping, so
+    they can be written to sockets or decoded without an intermediate copy."""
+
+    def __init__(self, path=BLOB_FILE, index_path=INDEX_FILE):
+        self.path = path
+        with open(index_path, encoding='utf-8') as f:
+            self.index = {key: tuple(span) for key, span in json.load(f)['texts'].items()}
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap cannot map an empty file; the mapping outlives the descriptor
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.view = memoryview(self._map)
+
+    def __len__(self):
+        return len(self.view)
+
+    def slice(self, offset, length):
+        return self.view[offset:offset + length]
+
+    def span(self, key):
+        """(offset, length) of an indexed text, or None"""
+        return self.index.get(key)
+
+    def text(self, key):
+        offset, length = self.index[key]
+        return str(self.slice(offset, length), 'utf-8')
+
+
+def parse_range(header, size):
+    """(offset, length) for a single 'bytes=a-b' Range header, or None to send the whole file.
+
+    Raises ValueError when the range lies outside the file (a 416 response).
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, dash, last = header[len('bytes='):].strip().partition('-')
+    if not dash or not (first + last).isdecimal():
+        return None
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or end < start:
+        raise ValueError(f"Range {header} outside {size} bytes")
+    return start, end - start + 1
+
+
+def main(argv=None):
+    """Show the blob index, or print one indexed text"""
+    parser = argparse.ArgumentParser(description="Inspect the section text blob written by the build")
+    parser.add_argument('key', nargs='?', help="text to print (e.g. RH:12 or RH:12:normalized)")
+    args = parser.parse_args(argv)
+
+    blob = TextBlob()
+    if args.key:
+        print(blob.text(args.key))
+        return
+    print(f"📦 {BLOB_FILE}: {len(blob) / 1024:.1f} KB holding {len(blob.index)} indexed texts "
+          f"({len(set(blob.index.values()))} distinct)")
+
+
+if __name__ == "__main__":
+    main()
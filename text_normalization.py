@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Text Normalization
+Batched normalization of section bodies, shared by matching and diffing
+"""
+
+import re
+from collections import namedtuple
+
+# One normalized section: the normalized text, its clause chunks and the
+# lower-cased word set of each chunk
+NormalizedText = namedtuple('NormalizedText', ['normalized', 'chunks', 'chunk_tokens'])
+
+# Sections are joined with a separator no normalization pattern can match
+# or consume, so each regex runs once over the whole column
+_SEPARATOR = '\x00'
+
+# Same regex chain as normalizeText() in the generated page. The first
+# pass leaves only single spaces, so later passes match ' ?' instead of
+# '\s*' and avoid backtracking at every whitespace position
+_PIPELINE = (
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r' ?([.,:;]) ?'), r'\1 '),
+    (re.compile(r' ?([()\[\]]) ?'), r'\1'),
+    (re.compile(r' ?[-—–] ?'), '—'),
+    (re.compile(r'["\']'), '"'),
+    (re.compile(r'  +'), ' '),
+)
+_CHUNK_SEPARATORS = re.compile(r'[.;:]')
+
+_normalized_sections = {}
+
+
+def normalize_text(text):
+    """Normalize text for content comparison (mirrors the page's normalizeText)"""
+    for pattern, replacement in _PIPELINE:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def split_into_semantic_chunks(text):
+    """Split normalized text into clause-level chunks"""
+    chunks = (chunk.strip() for chunk in _CHUNK_SEPARATORS.split(text))
+    return [chunk for chunk in chunks if chunk]
+
+
+def text_column(df, column):
+    """Stringify a DataFrame column in one pass (missing cells become '')"""
+    if column not in df:
+        return [''] * len(df)
+    return df[column].fillna('').astype(str).tolist()
+
+
+def _make_record(normalized):
+    chunks = tuple(split_into_semantic_chunks(normalized))
+    chunk_tokens = tuple(frozenset(chunk.lower().split()) for chunk in chunks)
+    return NormalizedText(normalized, chunks, chunk_tokens)
+
+
+def normalize_texts(texts):
+    """Normalize many section bodies at once and remember the results.
+
+    Texts not seen before are concatenated into a single buffer and every
+    regex in the pipeline is applied once to that buffer rather than once
+    per section. Returns one NormalizedText per input, in order.
+    """
+    pending = [text for text in dict.fromkeys(texts) if text not in _normalized_sections]
+    if pending:
+        if any(_SEPARATOR in text for text in pending):
+            normalized_texts = [normalize_text(text) for text in pending]
+        else:
+            buffer = _SEPARATOR.join(pending)
+            for pattern, replacement in _PIPELINE:
+                buffer = pattern.sub(replacement, buffer)
+            normalized_texts = [part.strip() for part in buffer.split(_SEPARATOR)]
+
+        for text, normalized in zip(pending, normalized_texts):
+            _normalized_sections[text] = _make_record(normalized)
+
+    return [_normalized_sections[text] for text in texts]
+
+
+def clear_normalized_cache():
+    """Forget every remembered section; each build starts empty so a long-running server does not grow"""
+    _normalized_sections.clear()
+
+
+def normalized(text):
+    """Normalized form of one section body, computed on first use"""
+    record = _normalized_sections.get(text)
+    if record is None:
+        record = _normalized_sections[text] = _make_record(normalize_text(text))
+    return record
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Trace API
+JSON query endpoints for the preview server, backed by precomputed trace indexes
+"""
+
+import gzip
+import hashlib
+import http.server
+import json
+import os
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+from bill_structure import parse_section
+from page_templates import load_template
+from text_blob import BLOB_FILE, parse_range
+from tracing_db import DB_PATH, TracingDB
+
+API_PREFIX = '/api/'
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+PREVIEW_LENGTH = 200
+# Responses smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+RESPONSE_CACHE_SIZE = 256
+
+
+class TraceIndex:
+    """Per-trace summaries and search strings, computed once when the server starts"""
+
+    def __init__(self, traces):
+        self.order = []
+        self.traces = {}
+        self.summaries = {}
+        self.search_keys = {}
+        for record in traces:
+            trace = record.to_dict() if hasattr(record, 'to_dict') else record
+            trace_id = trace['trace_id']
+            ih_section = trace['ih_section']
+            rh_section = trace['rh_section']
+            self.order.append(trace_id)
+            self.traces[trace_id] = _served_trace(record, trace)
+            self.summaries[trace_id] = {
+                'trace_id': trace_id,
+                'origin': trace['origin'],
+                'ih_section': {'title': ih_section['title'], 'stage': ih_section['stage']},
+                'rh_section': {'title': rh_section['title'], 'stage': rh_section['stage'],
+                               'similarity_from_ih': rh_section['similarity_from_ih']},
+                'preview': ih_section['text'][:PREVIEW_LENGTH] + ('...' if len(ih_section['text']) > PREVIEW_LENGTH else ''),
+                'stats': trace.get('stats')
+            }
+            # Same fields the page searches: IH title and IH text
+            self.search_keys[trace_id] = (ih_section['title'].lower(), ih_section['text'].lower())
+
+    def page(self, query='', offset=0, limit=DEFAULT_PAGE_SIZE):
+        """Summaries matching query, in document order, one page at a time"""
+        query = query.strip().lower()
+        if query:
+            matches = [trace_id for trace_id in self.order
+                       if query in self.search_keys[trace_id][0] or query in self.search_keys[trace_id][1]]
+        else:
+            matches = self.order
+        return {
+            'total': len(matches),
+            'offset': offset,
+            'limit': limit,
+            'traces': [self.summaries[trace_id] for trace_id in matches[offset:offset + limit]]
+        }
+
+
+def _served_trace(record, trace):
+    """The trace as /api/trace/<id> returns it. Bodies of blob-backed traces are
+    sent as byte spans of the blob, which the page fetches with Range requests"""
+    if not hasattr(record, 'text_span') or record.text_span('ih') is None:
+        return trace
+    served = dict(trace)
+    for side in ('ih', 'rh'):
+        section = served[f'{side}_section'] = dict(trace[f'{side}_section'])
+        del section['text']
+        section['text_span'] = list(record.text_span(side))
+    return served
+
+
+class APIError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(params, name, default, maximum=None):
+    try:
+        value = int(params.get(name, [default])[0])
+    except ValueError:
+        raise APIError(400, f"{name} must be an integer")
+    if value < 0:
+        raise APIError(400, f"{name} must not be negative")
+    return min(value, maximum) if maximum is not None else value
+
+
+class TraceAPI:
+    """Routes /api/ requests and caches encoded responses"""
+
+    def __init__(self, traces, db_path=DB_PATH):
+        self.index = TraceIndex(traces)
+        # Mapped section text blob the trace spans point into (a TraceStore built with one)
+        self.blob = getattr(traces, 'blob', None)
+        # Opened here, queried from the server thread (one request at a time)
+        self.db = TracingDB(db_path, check_same_thread=False) if os.path.exists(db_path) else None
+        self._cache = OrderedDict()
+
+    def close(self):
+        """Close the tracing store connection"""
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def payload(self, path, params):
+        """JSON-ready payload for an API path, or APIError"""
+        parts = path[len(API_PREFIX):].strip('/').split('/')
+
+        if parts == ['traces']:
+            return self.index.page(params.get('q', [''])[0],
+                                   _int_param(params, 'offset', 0),
+                                   _int_param(params, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+
+        if len(parts) == 2 and parts[0] == 'trace':
+            trace = self.index.traces.get(parts[1])
+            if trace is None:
+                raise APIError(404, f"No trace {parts[1]}")
+            return trace
+
+        if len(parts) == 2 and parts[0] == 'amendment':
+            return self._amendment(parts[1])
+
+        if len(parts) == 3 and parts[0] == 'section' and parts[2] == 'fulltext':
+            return self._section_full_text(parts[1])
+
+        raise APIError(404, f"Unknown endpoint {path}")
+
+    def _require_db(self):
+        if self.db is None:
+            raise APIError(503, "Tracing store not built; run tracing_db.py first")
+        return self.db
+
+    def _amendment(self, number):
+        db = self._require_db()
+        house = db.amendment(int(number)) if number.isdigit() else None
+        original = db.original_amendment_lookup().get(number)
+        if house is None and original is None:
+            raise APIError(404, f"No amendment {number}")
+        return {'amendment_number': number, 'house': house, 'original': original}
+
+    def _section_full_text(self, designation):
+        parsed = parse_section(designation)
+        if parsed is None:
+            raise APIError(400, "Section must be a designation such as 101 or 101A")
+        designation = parsed.designation
+        db = self._require_db()
+        section = db.ndaa_section(designation)
+        if section is not None:
+            return {'section': designation, 'source': 'ndaa', 'header': section['header'],
+                    'full_text': section['full_text']}
+        # Fall back to the reported bill when the NDAA workbook lacks the section
+        rows = db.sections_by_designation('RH', designation)
+        if rows:
+            return {'section': designation, 'source': 'RH', 'header': rows[0]['title'],
+                    'full_text': rows[0]['body']}
+        raise APIError(404, f"No full text for section {designation}")
+
+    def response(self, path, query):
+        """(status, body, gzipped body or None, etag) for a request, cached by URL"""
+        key = (path, query)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        try:
+            status, payload = 200, self.payload(path, parse_qs(query))
+        except APIError as e:
+            status, payload = e.status, {'error': str(e)}
+        body = json.dumps(payload).encode('utf-8')
+        compressed = gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None
+        result = (status, body, compressed, '"' + hashlib.sha1(body).hexdigest()[:16] + '"')
+
+        # Only successful responses are cached; the data is fixed for the server's lifetime
+        if status == 200:
+            self._cache[key] = result
+            if len(self._cache) > RESPONSE_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+
+def render_api_page(template_name='content_focused_diff_website.html'):
+    """The page without inline traces; it fetches summaries and diffs from the API"""
+    page = load_template(template_name).render(prerendered_cards='', traces_data='[]', traces_api="'api'")
+    return page.encode('utf-8')
+
+
+def make_api_handler(api, page_path='/content_focused_diff_website.html'):
+    """Request handler serving the API, the API-mode page and static files"""
+    page = render_api_page()
+
+    class TraceAPIHandler(http.server.SimpleHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path.startswith(API_PREFIX):
+                self._send(*api.response(url.path, url.query), content_type='application/json',
+                           cache_control='max-age=300')
+            elif url.path in (page_path, '/'):
+                self._send(200, page, gzip.compress(page), '"' + hashlib.sha1(page).hexdigest()[:16] + '"',
+                           content_type='text/html; charset=utf-8', cache_control='no-cache')
+            elif url.path == '/' + BLOB_FILE and api.blob is not None:
+                self._send_blob(api.blob)
+            else:
+                super().do_GET()
+
+        def _send_blob(self, blob):
+            """The section text blob straight from its mapping; a Range request gets only its slice"""
+            try:
+                span = parse_range(self.headers.get('Range'), len(blob))
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(blob)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            offset, length = span or (0, len(blob))
+            self.send_response(206 if span else 200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('Cache-Control', 'no-cache')
+            if span:
+                self.send_header('Content-Range', f'bytes {offset}-{offset + length - 1}/{len(blob)}')
+            self.end_headers()
+            # A memoryview of the mapping: written to the socket without a bytes copy
+            self.wfile.write(blob.slice(offset, length))
+
+        def _send(self, status, body, compressed, etag, content_type, cache_control):
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            use_gzip = compressed is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+            data = compressed if use_gzip else body
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.send_header('Vary', 'Accept-Encoding')
+            if status == 200:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', cache_control)
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self.end_headers()
+            self.wfile.write(data)
+
+    return TraceAPIHandler
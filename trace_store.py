@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Trace Store
+Compact columnar storage for IH→RH traces with dict-style record views
+"""
+
+import json
+import sys
+from array import array
+
+
+class StringPool:
+    """Interns repeated strings (titles, stages, ids) as small integer ids"""
+
+    __slots__ = ('_ids', '_strings')
+
+    def __init__(self):
+        self._ids = {}
+        self._strings = []
+
+    def add(self, value):
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def get(self, value, default=None):
+        """Id of an already interned string, or default"""
+        return self._ids.get(value, default)
+
+    def __getitem__(self, string_id):
+        return self._strings[string_id]
+
+    def __len__(self):
+        return len(self._strings)
+
+
+class SectionView:
+    """Read-only view of one side of a trace, indexed like the old section dict"""
+
+    __slots__ = ('_store', '_index', '_side')
+
+    def __init__(self, store, index, side):
+        self._store = store
+        self._index = index
+        self._side = side
+
+    def __getitem__(self, key):
+        return self._store._section_field(self._index, self._side, key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return self._store._section_keys(self._side)
+
+    def to_dict(self):
+        return {key: self[key] for key in self.keys()}
+
+
+class TraceRecord:
+    """View of one trace; reads come from the store's columns.
+
+    Keys assigned after loading (e.g. 'diff', 'stats') are kept per trace
+    and returned after the fixed trace fields.
+    """
+
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        store = self._store
+        if key == 'trace_id':
+            return store.strings[store._trace_ids[self._index]]
+        if key == 'origin':
+            return store.strings[store._origins[self._index]]
+        if key == 'ih_section':
+            return SectionView(store, self._index, 'ih')
+        if key == 'rh_section':
+            return SectionView(store, self._index, 'rh')
+        return store._extras[self._index][key]
+
+    def __setitem__(self, key, value):
+        if key in TraceStore.TRACE_KEYS:
+            raise KeyError(f"{key} is stored in the trace columns and is read-only")
+        self._store._extras.setdefault(self._index, {})[key] = value
+
+    def __contains__(self, key):
+        return key in TraceStore.TRACE_KEYS or key in self._store._extras.get(self._index, ())
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return list(TraceStore.TRACE_KEYS) + list(self._store._extras.get(self._index, ()))
+
+    def text_span(self, side):
+        """(offset, length) of the 'ih' or 'rh' body in the store's blob file, or None without one"""
+        if self._store.blob is None:
+            return None
+        return self._store.text_span(self._index, side)
+
+    def to_dict(self):
+        """Plain nested dict in the same shape the loader used to build"""
+        trace = {
+            'trace_id': self['trace_id'],
+            'origin': self['origin'],
+            'ih_section': self['ih_section'].to_dict(),
+            'rh_section': self['rh_section'].to_dict(),
+        }
+        trace.update(self._store._extras.get(self._index, {}))
+        return trace
+
+
+class TraceStore:
+    """Columnar trace storage.
+
+    Titles, stages and ids are interned in one StringPool; section bodies
+    are UTF-8 encoded once into a shared buffer (identical bodies stored
+    once) and referenced by offset/length. Given a TextBlobWriter, the
+    buffer is the blob file instead, memory-mapped by compact(). Iterating
+    yields TraceRecord views that index like the original trace dicts, so
+    the website generator and diff engine work unchanged.
+    """
+
+    TRACE_KEYS = ('trace_id', 'origin', 'ih_section', 'rh_section')
+    IH_KEYS = ('title', 'text', 'stage')
+    RH_KEYS = ('title', 'text', 'stage', 'similarity_from_ih')
+
+    def __init__(self, blob_writer=None):
+        self.strings = StringPool()
+        self._blob_writer = blob_writer
+        self.blob = None
+        self._text = bytearray()
+        self._text_offsets = array('Q')
+        self._text_lengths = array('I')
+        self._text_ids = {}
+        self._trace_ids = array('I')
+        self._origins = array('I')
+        self._titles = {'ih': array('I'), 'rh': array('I')}
+        self._stages = {'ih': array('I'), 'rh': array('I')}
+        self._texts = {'ih': array('I'), 'rh': array('I')}
+        self._similarity = array('d')
+        self._extras = {}
+
+    def _add_text(self, text):
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = self._text_ids[text] = len(self._text_offsets)
+            if self._blob_writer is not None:
+                offset, length = self._blob_writer.append(text)
+            else:
+                encoded = text.encode('utf-8')
+                offset, length = len(self._text), len(encoded)
+                self._text.extend(encoded)
+            self._text_offsets.append(offset)
+            self._text_lengths.append(length)
+        return text_id
+
+    def add(self, trace_id, origin, ih_title, ih_text, rh_title, rh_text, similarity,
+            ih_stage='IH', rh_stage='RH'):
+        """Append one trace and return its record view"""
+        self._trace_ids.append(self.strings.add(trace_id))
+        self._origins.append(self.strings.add(origin))
+        self._titles['ih'].append(self.strings.add(ih_title))
+        self._titles['rh'].append(self.strings.add(rh_title))
+        self._stages['ih'].append(self.strings.add(ih_stage))
+        self._stages['rh'].append(self.strings.add(rh_stage))
+        self._texts['ih'].append(self._add_text(ih_text))
+        self._texts['rh'].append(self._add_text(rh_text))
+        self._similarity.append(similarity)
+        return TraceRecord(self, len(self._similarity) - 1)
+
+    def compact(self):
+        """Drop build-time dedup state once loading is finished (and map the blob, if writing one)"""
+        self._text_ids = {}
+        if self._blob_writer is not None:
+            self.blob = self._blob_writer.close()
+            self._blob_writer = None
+            self._text = self.blob.view
+        else:
+            self._text = bytes(self._text)
+        return self
+
+    def text(self, text_id):
+        return str(self.text_view(text_id), 'utf-8')
+
+    def text_view(self, text_id):
+        """A section body's UTF-8 bytes, without copying them out of the buffer"""
+        offset = self._text_offsets[text_id]
+        return memoryview(self._text)[offset:offset + self._text_lengths[text_id]]
+
+    def text_span(self, index, side):
+        """(offset, length) of one side's body in the buffer (the blob file, when there is one)"""
+        text_id = self._texts[side][index]
+        return self._text_offsets[text_id], self._text_lengths[text_id]
+
+    def _section_field(self, index, side, key):
+        if key == 'title':
+            return self.strings[self._titles[side][index]]
+        if key == 'text':
+            return self.text(self._texts[side][index])
+        if key == 'stage':
+            return self.strings[self._stages[side][index]]
+        if key == 'similarity_from_ih' and side == 'rh':
+            return self._similarity[index]
+        raise KeyError(key)
+
+    def _section_keys(self, side):
+        return self.IH_KEYS if side == 'ih' else self.RH_KEYS
+
+    def __len__(self):
+        return len(self._similarity)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return TraceRecord(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield TraceRecord(self, index)
+
+    def nbytes(self):
+        """Approximate retained size of the store in bytes"""
+        columns = [self._text_offsets, self._text_lengths, self._trace_ids, self._origins, self._similarity]
+        columns += list(self._titles.values()) + list(self._stages.values()) + list(self._texts.values())
+        size = sys.getsizeof(self._text) + sum(sys.getsizeof(column) for column in columns)
+        size += sys.getsizeof(self.strings._strings) + sys.getsizeof(self.strings._ids)
+        size += sum(sys.getsizeof(value) for value in self.strings._strings)
+        return size
+
+
+def iter_traces_json(traces, indent=2):
+    """Encode traces as a JSON array, yielding one record at a time.
+
+    The pieces join to the same text as json.dumps(list_of_trace_dicts,
+    indent=indent), so pages can stream the array without holding it whole.
+    """
+    pad = ' ' * indent
+    separator = '[\n'
+    for trace in traces:
+        trace = trace.to_dict() if hasattr(trace, 'to_dict') else trace
+        yield separator + pad + json.dumps(trace, indent=indent).replace('\n', '\n' + pad)
+        separator = ',\n'
+    yield '[]' if separator == '[\n' else '\n]'
+
+
+def traces_json(traces, indent=2):
+    """Encode traces as a JSON array (same text as json.dumps on the trace dicts)"""
+    return ''.join(iter_traces_json(traces, indent))
+
+
+def deep_sizeof(obj, seen=None):
+    """Retained size of nested dicts/lists/strings, counting shared objects once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+def measure_memory(traces):
+    """Compare nested-dict traces with the same traces in a TraceStore"""
+    dict_traces = [trace.to_dict() if hasattr(trace, 'to_dict') else trace for trace in traces]
+    store = TraceStore()
+    for trace in dict_traces:
+        store.add(trace['trace_id'], trace['origin'],
+                  trace['ih_section']['title'], trace['ih_section']['text'],
+                  trace['rh_section']['title'], trace['rh_section']['text'],
+                  trace['rh_section']['similarity_from_ih'],
+                  trace['ih_section']['stage'], trace['rh_section']['stage'])
+    store.compact()
+    return deep_sizeof(dict_traces), store.nbytes()
+
+
+def main():
+    """Report memory for the current traces and a full-bill-sized trace set"""
+    from content_focused_diff_website import load_ih_to_rh_traces
+    from tracing_db import open_db
+
+    traces = load_ih_to_rh_traces()
+    dict_size, store_size = measure_memory(traces)
+    print(f"\n📊 {len(traces)} IH→RH traces: dicts {dict_size / 1024:.1f} KB, "
+          f"store {store_size / 1024:.1f} KB ({100 - store_size * 100 / dict_size:.0f}% smaller)")
+
+    # Full-bill proxy: every RH section traced through three stages
+    with open_db(sources=('rh_sections',)) as db:
+        rh_sections = db.sections('RH')
+    full_bill = []
+    for stage_from, stage_to in (('IH', 'RH'), ('RH', 'EH'), ('EH', 'ENR')):
+        for index, title, text in rh_sections:
+            full_bill.append({
+                'trace_id': f"{stage_from.lower()}_{stage_to.lower()}_{index}",
+                'origin': stage_from,
+                'ih_section': {'title': title, 'text': text, 'stage': stage_from},
+                'rh_section': {'title': title, 'text': text, 'stage': stage_to, 'similarity_from_ih': 100.0}
+            })
+    dict_size, store_size = measure_memory(full_bill)
+    print(f"📊 {len(full_bill)} full-bill traces: dicts {dict_size / 1024:.1f} KB, "
+          f"store {store_size / 1024:.1f} KB ({100 - store_size * 100 / dict_size:.0f}% smaller)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Tracing DB
+Local SQLite store for the tracing workbooks, with indexed lookups and full-text search
+"""
+
+import argparse
+import os
+import sqlite3
+from collections import namedtuple
+
+from bill_structure import section_designation
+
+DB_PATH = 'hr5009_tracing.db'
+# Bumped when a table changes shape; an older store is dropped and reloaded from the workbooks
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY, workbook TEXT, mtime_ns INTEGER, size INTEGER, rows INTEGER
+);
+CREATE TABLE IF NOT EXISTS bill_sections (
+    stage TEXT, row_index INTEGER, designation TEXT, title TEXT, body TEXT,
+    PRIMARY KEY (stage, row_index)
+);
+CREATE INDEX IF NOT EXISTS bill_sections_designation ON bill_sections (stage, designation);
+CREATE INDEX IF NOT EXISTS bill_sections_title ON bill_sections (stage, title);
+CREATE TABLE IF NOT EXISTS title_matches (
+    row_index INTEGER PRIMARY KEY, ih_title TEXT, rh_title TEXT, similarity REAL,
+    ih_section_number INTEGER, rh_section_number INTEGER
+);
+CREATE INDEX IF NOT EXISTS title_matches_ih_title ON title_matches (ih_title);
+CREATE INDEX IF NOT EXISTS title_matches_rh_number ON title_matches (rh_section_number);
+CREATE TABLE IF NOT EXISTS house_matches (
+    row_index INTEGER PRIMARY KEY, designation TEXT, amendment_number,
+    hml_section_title TEXT, matched_bill_section_title TEXT, sponsors TEXT,
+    vote_type TEXT, yea TEXT, nay TEXT, agreed_or_not TEXT, similarity_score REAL
+);
+CREATE INDEX IF NOT EXISTS house_matches_designation ON house_matches (designation);
+CREATE INDEX IF NOT EXISTS house_matches_amendment ON house_matches (amendment_number);
+CREATE TABLE IF NOT EXISTS house_amendments (
+    row_index INTEGER PRIMARY KEY, amendment_number, sponsor TEXT,
+    hml_section_title TEXT, hml_full_content TEXT
+);
+CREATE INDEX IF NOT EXISTS house_amendments_number ON house_amendments (amendment_number);
+CREATE INDEX IF NOT EXISTS house_amendments_sponsor ON house_amendments (sponsor COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS original_amendments (
+    row_index INTEGER PRIMARY KEY, amendment_number TEXT, sponsor TEXT,
+    source_section_title TEXT, similarity_score REAL
+);
+CREATE INDEX IF NOT EXISTS original_amendments_number ON original_amendments (amendment_number);
+CREATE INDEX IF NOT EXISTS original_amendments_sponsor ON original_amendments (sponsor COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS ndaa_sections (
+    row_index INTEGER PRIMARY KEY, designation TEXT, header TEXT, full_text TEXT, section_index
+);
+CREATE INDEX IF NOT EXISTS ndaa_sections_designation ON ndaa_sections (designation);
+CREATE INDEX IF NOT EXISTS ndaa_sections_header ON ndaa_sections (header);
+CREATE VIRTUAL TABLE IF NOT EXISTS body_text USING fts5 (source UNINDEXED, ref UNINDEXED, title, body);
+"""
+
+# One workbook feeding one table (or the rows of a table matching scope);
+# loader(df) returns (table rows, full-text rows)
+Source = namedtuple('Source', ['name', 'workbook', 'sheet', 'table', 'scope', 'fts_sources', 'loader'])
+
+
+def _scalar(value):
+    """Plain Python value for a cell (numpy scalars unwrapped, NaN as None)"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _cell(row, column, default=''):
+    """Cell text the way the scripts always read it: str(value).strip()"""
+    return str(row.get(column, default)).strip()
+
+
+def _load_sections(stage):
+    def loader(df):
+        from text_normalization import text_column
+        titles = text_column(df, 'Section Title')
+        bodies = text_column(df, 'Body Text')
+        rows = [(stage, index, section_designation(title), title, body)
+                for index, title, body in zip(range(len(df)), titles, bodies)]
+        return rows, [(stage, index, title, body) for stage, index, _, title, body in rows]
+    return loader
+
+
+def _load_title_matches(df):
+    from text_normalization import text_column
+    rows = list(zip(range(len(df)), text_column(df, 'IH_Section_Title'), text_column(df, 'RH_Section_Title'),
+                    (float(score) for score in df['Similarity_Score']),
+                    (_scalar(number) for number in df.get('IH_Section_Number', [None] * len(df))),
+                    (_scalar(number) for number in df.get('RH_Section_Number', [None] * len(df)))))
+    return rows, []
+
+
+def _load_house_matches(df):
+    rows = []
+    for index, row in enumerate(df.to_dict('records')):
+        rows.append((
+            index,
+            section_designation(_scalar(row['matched_bill_section_number'])),
+            _scalar(row['amendment_number']),
+            _cell(row, 'hml_section_title'),
+            _cell(row, 'matched_bill_section_title'),
+            _cell(row, 'Sponsors', 'Unknown'),
+            _cell(row, 'vote_type'),
+            _cell(row, 'yea'),
+            _cell(row, 'nay'),
+            _cell(row, 'agrred_or_not'),
+            float(row.get('similarity_score', 0)),
+        ))
+    return rows, []
+
+
+def _load_house_amendments(df):
+    rows = []
+    for index, row in enumerate(df.to_dict('records')):
+        rows.append((index, _scalar(row['individual_amendment_number']), _cell(row, 'Sponsor', 'Unknown'),
+                     _cell(row, 'hml_section_title'), _cell(row, 'hml_full_content')))
+    return rows, [('house_amendment', number, title, content) for _, number, _, title, content in rows]
+
+
+def _load_original_amendments(df):
+    rows = []
+    for index, row in enumerate(df.to_dict('records')):
+        rows.append((index, _cell(row, 'target_amendment_number'), _cell(row, 'target_sponsor'),
+                     _cell(row, 'source_section_title'), float(row.get('similarity_score', 0))))
+    return rows, []
+
+
+def _load_ndaa_sections(df):
+    rows = []
+    for index, row in enumerate(df.to_dict('records')):
+        header = str(row.get('header', ''))
+        rows.append((index, section_designation(header), header, str(row.get('full_text', '')),
+                     _scalar(row.get('section_index', ''))))
+    return rows, [('ndaa', designation, header, text) for _, designation, header, text, _ in rows if text != 'nan']
+
+
+SOURCES = (
+    Source('ih_sections', 'HR8070-ih-sections.xlsx', 0, 'bill_sections', "stage = 'IH'", ('IH',),
+           _load_sections('IH')),
+    Source('rh_sections', 'HR8070-rh-sections.xlsx', 0, 'bill_sections', "stage = 'RH'", ('RH',),
+           _load_sections('RH')),
+    Source('title_matches', 'HR8070_Section_Title_Matches.xlsx', 0, 'title_matches', None, (),
+           _load_title_matches),
+    Source('house_matches', 'header_match_results_high_quality.xlsx', 'Matched', 'house_matches', None, (),
+           _load_house_matches),
+    Source('house_amendments', 'HR8070_amendments_with_sponsors_FINAL.xlsx', 0, 'house_amendments', None,
+           ('house_amendment',), _load_house_amendments),
+    Source('original_amendments', 'amendment_cross_match_results.xlsx', 0, 'original_amendments', None, (),
+           _load_original_amendments),
+    Source('ndaa_sections', 'NDAA_Bill_References_V5_with_text (6).xlsx', 0, 'ndaa_sections', None, ('ndaa',),
+           _load_ndaa_sections),
+)
+
+
+class TracingDB:
+    """Query API over the tracing store"""
+
+    def __init__(self, path=DB_PATH, check_same_thread=True):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=check_same_thread)
+        self.conn.row_factory = sqlite3.Row
+        if self.conn.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            self._drop_tables()
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _drop_tables(self):
+        """Drop a store written under another schema; refresh() then reloads every workbook"""
+        with self.conn:
+            names = [row[0] for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+                "AND name NOT LIKE 'body_text_%'")]
+            for name in names:
+                self.conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Loading
+
+    def refresh(self, force=False, sources=None):
+        """Reload workbooks that changed since they were last loaded.
+
+        Each workbook is tracked by modification time and size, so a build
+        re-parses only the spreadsheets that were edited, and only for the
+        named sources it uses (all sources by default). Missing workbooks
+        are skipped and keep whatever rows were loaded before.
+        """
+        reloaded = []
+        for source in SOURCES:
+            if sources is not None and source.name not in sources:
+                continue
+            if not os.path.exists(source.workbook):
+                continue
+            stat = os.stat(source.workbook)
+            loaded = self.conn.execute('SELECT mtime_ns, size FROM sources WHERE name = ?', (source.name,)).fetchone()
+            if not force and loaded is not None and tuple(loaded) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            self._load(source, stat)
+            reloaded.append(source.name)
+        return reloaded
+
+    def _load(self, source, stat):
+        import pandas as pd
+
+        df = pd.read_excel(source.workbook, sheet_name=source.sheet)
+        rows, fts_rows = source.loader(df)
+        with self.conn:
+            self.conn.execute(f'DELETE FROM {source.table}' + (f' WHERE {source.scope}' if source.scope else ''))
+            for fts_source in source.fts_sources:
+                self.conn.execute('DELETE FROM body_text WHERE source = ?', (fts_source,))
+            if rows:
+                placeholders = ', '.join('?' * len(rows[0]))
+                self.conn.executemany(f'INSERT INTO {source.table} VALUES ({placeholders})', rows)
+            self.conn.executemany('INSERT INTO body_text (source, ref, title, body) VALUES (?, ?, ?, ?)', fts_rows)
+            self.conn.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?)',
+                              (source.name, source.workbook, stat.st_mtime_ns, stat.st_size, len(rows)))
+        print(f"🗄️  Loaded {len(rows)} rows from {source.workbook} into {source.table}")
+
+    def counts(self):
+        """Rows loaded per source"""
+        return {row['name']: row['rows'] for row in self.conn.execute('SELECT name, rows FROM sources ORDER BY name')}
+
+    # Bill sections
+
+    def sections(self, stage):
+        """(row_index, title, body) for every section of a bill stage, in document order"""
+        return [tuple(row) for row in self.conn.execute(
+            'SELECT row_index, title, body FROM bill_sections WHERE stage = ? ORDER BY row_index', (stage,))]
+
+    def section_headers(self, bill):
+        """Every header of a bill ('ndaa' or a stage), in document order"""
+        if bill == 'ndaa':
+            return [row[0] for row in self.conn.execute('SELECT header FROM ndaa_sections ORDER BY row_index')]
+        return [row[0] for row in self.conn.execute(
+            'SELECT title FROM bill_sections WHERE stage = ? ORDER BY row_index', (bill,))]
+
+    def sections_by_designation(self, stage, designation):
+        """Sections of a bill stage with the given designation ("101", "101A")"""
+        return [dict(row) for row in self.conn.execute(
+            'SELECT * FROM bill_sections WHERE stage = ? AND designation = ? ORDER BY row_index',
+            (stage, designation))]
+
+    def title_matches(self, min_similarity=90.0):
+        """IH title -> {'rh_title', 'similarity'} for matches at or above min_similarity"""
+        lookup = {}
+        for row in self.conn.execute(
+                'SELECT ih_title, rh_title, similarity FROM title_matches WHERE similarity >= ? ORDER BY row_index',
+                (min_similarity,)):
+            lookup[row['ih_title']] = {'rh_title': row['rh_title'], 'similarity': row['similarity']}
+        return lookup
+
+    # House amendments
+
+    def house_rds_mapping(self):
+        """House RDS section designation ("101A") -> matched amendment details (last match per section wins)"""
+        mapping = {}
+        for row in self.conn.execute('''
+                SELECT m.*, a.sponsor AS amendment_sponsor, a.hml_full_content
+                FROM house_matches m
+                JOIN house_amendments a ON a.row_index = (
+                    SELECT MIN(row_index) FROM house_amendments WHERE amendment_number = m.amendment_number)
+                WHERE m.designation IS NOT NULL
+                ORDER BY m.row_index'''):
+            sponsors = row['sponsors']
+            if sponsors in ['', 'nan', 'None']:
+                sponsors = row['amendment_sponsor']
+            mapping[row['designation']] = {
+                'house_rds_section': row['designation'],
+                'amendment_number': row['amendment_number'],
+                'hml_section_title': row['hml_section_title'],
+                'matched_bill_section_title': row['matched_bill_section_title'],
+                'sponsors': sponsors,
+                'vote_type': row['vote_type'],
+                'yea': row['yea'],
+                'nay': row['nay'],
+                'agreed_or_not': row['agreed_or_not'],
+                'similarity_score': row['similarity_score'],
+                'hml_full_content': row['hml_full_content']
+            }
+        return mapping
+
+    def amendments(self):
+        """Every House amendment, in workbook order"""
+        return [dict(row) for row in self.conn.execute('SELECT * FROM house_amendments ORDER BY row_index')]
+
+    def amendment(self, amendment_number):
+        """One House amendment by number, or None"""
+        row = self.conn.execute('SELECT * FROM house_amendments WHERE amendment_number = ? ORDER BY row_index LIMIT 1',
+                                (amendment_number,)).fetchone()
+        return dict(row) if row else None
+
+    def amendments_by_sponsor(self, sponsor):
+        """House amendments whose sponsor mentions the given name"""
+        return [dict(row) for row in self.conn.execute(
+            'SELECT * FROM house_amendments WHERE sponsor LIKE ? ORDER BY row_index', (f'%{sponsor}%',))]
+
+    def original_amendment_lookup(self):
+        """Original amendment number -> cross-match details"""
+        lookup = {}
+        for row in self.conn.execute('SELECT * FROM original_amendments ORDER BY row_index'):
+            amendment_num = row['amendment_number']
+            if amendment_num and amendment_num != 'nan':
+                lookup[amendment_num] = {
+                    'amendment_number': amendment_num,
+                    'sponsor': row['sponsor'],
+                    'source_section_title': row['source_section_title'],
+                    'similarity_score': row['similarity_score'],
+                    'target_amendment_number': amendment_num
+                }
+        return lookup
+
+    # NDAA bill text
+
+    def ndaa_section_mapping(self):
+        """NDAA section designation ("101", "101A") -> {'header', 'full_text', 'section_index'}"""
+        mapping = {}
+        for row in self.conn.execute('''
+                SELECT designation, header, full_text, section_index FROM ndaa_sections
+                WHERE designation IS NOT NULL AND full_text NOT IN ('', 'nan')
+                ORDER BY row_index'''):
+            mapping[row['designation']] = {
+                'header': row['header'],
+                'full_text': row['full_text'].strip(),
+                'section_index': row['section_index'] if row['section_index'] is not None else ''
+            }
+        return mapping
+
+    def ndaa_section(self, designation):
+        """One NDAA section's header and full text by designation ("101A"), or None"""
+        row = self.conn.execute('''
+                SELECT header, full_text, section_index FROM ndaa_sections
+                WHERE designation = ? AND full_text NOT IN ('', 'nan')
+                ORDER BY row_index DESC LIMIT 1''', (designation,)).fetchone()
+        return dict(row, full_text=row['full_text'].strip()) if row else None
+
+    # Ad hoc queries
+
+    def search(self, query, limit=20, sources=None):
+        """Full-text search over section and amendment bodies, best matches first"""
+        sql = '''SELECT source, ref, title, snippet(body_text, 3, '[', ']', ' … ', 12) AS snippet
+                 FROM body_text WHERE body_text MATCH ?'''
+        params = [query]
+        if sources:
+            sql += f" AND source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        sql += ' ORDER BY bm25(body_text) LIMIT ?'
+        params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def query(self, sql, params=()):
+        """Run any read query and return rows as dicts"""
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+
+def read_only_query(sql, path=DB_PATH, params=()):
+    """Run sql on a read-only connection, so ad hoc statements cannot change the store"""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+
+def open_db(sources=None, path=DB_PATH):
+    """Open the store, loading the named sources' workbooks if they changed since the last run"""
+    db = TracingDB(path)
+    db.refresh(sources=sources)
+    return db
+
+
+def main(argv=None):
+    """Build or refresh the store and run ad hoc queries against it"""
+    parser = argparse.ArgumentParser(description="Load the tracing workbooks into SQLite and query them")
+    parser.add_argument('--db', default=DB_PATH, help=f"database file (default: {DB_PATH})")
+    parser.add_argument('--rebuild', action='store_true', help="reload every workbook even if unchanged")
+    parser.add_argument('--search', help="full-text search over section and amendment bodies")
+    parser.add_argument('--sql', help="run a read-only SQL query")
+    args = parser.parse_args(argv)
+
+    with TracingDB(args.db) as db:
+        reloaded = db.refresh(force=args.rebuild)
+        print(f"🗄️  {args.db}: {len(reloaded)} workbook(s) reloaded")
+        for name, rows in db.counts().items():
+            print(f"   {name:<22} {rows:>6} rows")
+
+        if args.search:
+            print(f"\n🔍 {args.search}")
+            for hit in db.search(args.search):
+                print(f"   [{hit['source']} {hit['ref']}] {hit['title'][:60]}")
+                print(f"      {hit['snippet']}")
+
+    if args.sql:
+        try:
+            rows = read_only_query(args.sql, args.db)
+        except sqlite3.Error as error:
+            print(f"❌ {error}")
+            return
+        for row in rows:
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
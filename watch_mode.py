@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Watch Mode
+Polls build inputs and rebuilds affected outputs while the async preview server keeps running
+"""
+
+import asyncio
+import os
+import time
+
+POLL_INTERVAL = 0.5
+
+
+class FileWatcher:
+    """Detects changed files by polling their modification time and size"""
+
+    def __init__(self, paths):
+        self.paths = list(dict.fromkeys(paths))
+        self.snapshot = self._snapshot()
+
+    def _snapshot(self):
+        snapshot = {}
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                snapshot[path] = None
+        return snapshot
+
+    def poll(self):
+        """Paths that changed, appeared or disappeared since the last poll"""
+        current = self._snapshot()
+        changed = [path for path in self.paths if current[path] != self.snapshot[path]]
+        self.snapshot = current
+        return changed
+
+    def forget(self, paths):
+        """Report these paths as changed again on the next poll (e.g. after a failed rebuild)"""
+        for path in paths:
+            self.snapshot[path] = None
+
+
+def watch_and_rebuild(watcher, rebuild, interval=POLL_INTERVAL):
+    """Coroutine function for async_server.serve(watch=...).
+
+    rebuild(changed_paths) runs in a worker thread so the server keeps
+    answering requests. It returns a new TraceAPI to serve, or None to keep
+    the current one; open pages are told to reload either way.
+    """
+    async def watch(server):
+        print(f"👀 Watching {len(watcher.paths)} input files for changes")
+        while True:
+            await asyncio.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+
+            names = ', '.join(os.path.basename(path) for path in changed)
+            start = time.perf_counter()
+            try:
+                api = await asyncio.to_thread(rebuild, changed)
+            except Exception as e:
+                # Spreadsheets are often caught mid-save; try again on the next poll
+                print(f"❌ Rebuild after {names} changed failed: {e}")
+                watcher.forget(changed)
+                continue
+            if api is not None:
+                server.set_api(api)
+            pages = server.notify_reload()
+            print(f"🔁 {names} changed: rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms, "
+                  f"reloaded {pages} open page(s)")
+
+    return watch